@@ -0,0 +1,218 @@
+"""
+Chain integrity audit for ClawdSure.
+
+Re-verifies stored history, which the API only checks loosely at submit
+time: every attestation's hash, its prev link to the previous stored
+attestation, and its signature.
+
+Agents with rows past their audit checkpoint are read in (fingerprint,
+seq) order, and their chains are cut into segments. Each segment carries
+the seq and hash of the row before it, so segments verify independently
+on a thread or process pool, in parallel across agents and within long
+chains. Results are applied in read order. Every few segments the
+per-agent checkpoints and findings are committed, so an interrupted or
+repeated audit only covers rows it has not verified yet.
+
+Findings (stored in audit_findings):
+
+    hash_mismatch  stored hash != hash of the stored fields
+    bad_genesis    first attestation's prev is not a genesis value
+    gap            seq skips ahead of the previous stored attestation
+    broken_link    consecutive seq, but prev != previous attestation's hash
+    bad_signature  signature does not verify (detail: crypto outcome)
+"""
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import db
+from crypto import VALID_OUTCOMES, hash_attestation, parse_public_key, public_key_der, verify_der_outcomes
+
+
+SEGMENT_SIZE = 256
+FLUSH_EVERY = 64  # segments per checkpoint commit
+
+PAYLOAD_FIELDS = ("seq", "prev", "ts", "result", "critical", "warn", "info", "version")
+
+
+def is_genesis_prev(prev: str) -> bool:
+    """prev values accepted on a genesis attestation (see main.enroll)."""
+    return prev in ("null", "") or prev.startswith("0000")
+
+
+def audit_segment(
+    fingerprint: str,
+    key_der: Optional[bytes],
+    rows: List[Dict[str, Any]],
+    prev_seq: Optional[int],
+    prev_hash: Optional[str]
+) -> Dict[str, Any]:
+    """
+    Verify consecutive rows of one agent's chain.
+
+    Args:
+        fingerprint: Agent fingerprint
+        key_der: Agent's public key as DER (crypto.public_key_der; None if it doesn't parse)
+        rows: Attestation rows in seq order (CHAIN_COLUMNS, findings as stored JSON)
+        prev_seq: seq of the row before rows[0], None if rows[0] starts the chain
+        prev_hash: hash of the row before rows[0]
+
+    Returns:
+        Findings plus the last row's seq and hash, to checkpoint
+    """
+    findings = []
+
+    def found(seq: int, kind: str, detail: str):
+        findings.append({"fingerprint": fingerprint, "seq": seq, "kind": kind, "detail": detail})
+
+    items = []
+    for row in rows:
+        seq = row['seq']
+        data = {field: row[field] for field in PAYLOAD_FIELDS}
+        data['findings'] = json.loads(row['findings'])
+        computed = hash_attestation(data)
+        if computed != row['hash']:
+            found(seq, "hash_mismatch", f"stored {row['hash'][:16]}, computed {computed[:16]}")
+        if prev_seq is None:
+            if not is_genesis_prev(row['prev']):
+                found(seq, "bad_genesis", f"prev {row['prev'][:16]}")
+        elif seq != prev_seq + 1:
+            found(seq, "gap", f"missing seq {prev_seq + 1}..{seq - 1}")
+        elif row['prev'] != prev_hash:
+            found(seq, "broken_link", f"prev {row['prev'][:16]}, expected {prev_hash[:16]}")
+        items.append((data, row['sig']))
+        prev_seq, prev_hash = seq, row['hash']
+
+    for row, outcome in zip(rows, verify_der_outcomes(items, key_der)):
+        if outcome not in VALID_OUTCOMES:
+            found(row['seq'], "bad_signature", outcome)
+
+    return {"fingerprint": fingerprint, "rows": len(rows), "last_seq": prev_seq, "last_hash": prev_hash,
+            "findings": findings}
+
+
+class ChainAuditor:
+    """
+    Incremental, parallel audit of every agent's chain.
+
+    mode="process" spreads hashing and ECDSA across cores; mode="thread"
+    avoids process start-up; workers=0 audits inline. At most max_pending
+    segments are in flight, so memory stays bounded on large ledgers.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        mode: str = "process",
+        segment_size: int = SEGMENT_SIZE,
+        max_pending: Optional[int] = None
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown audit mode: {mode}")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.mode = mode
+        self.segment_size = segment_size
+        self.max_pending = max_pending or max(4, self.workers * 4)
+
+    def run(self, full: bool = False, progress: Optional[Callable[[int], None]] = None) -> Dict[str, Any]:
+        """
+        Audit all rows past the checkpoints (every row with full=True).
+
+        Args:
+            full: Drop checkpoints and findings first
+            progress: Called with the running row count after each commit
+
+        Returns:
+            Report: counts, this run's findings, and all open findings by kind
+        """
+        if full:
+            db.reset_audit()
+        started = time.time()
+        start = time.perf_counter()
+        executor = None
+        if self.workers > 0:
+            pool_cls = ProcessPoolExecutor if self.mode == "process" else ThreadPoolExecutor
+            executor = pool_cls(max_workers=self.workers)
+
+        pending: "deque[Future]" = deque()
+        checkpoints: Dict[str, tuple] = {}
+        batch: List[Dict[str, Any]] = []
+        new_findings: List[Dict[str, Any]] = []
+        totals = {"rows": 0, "segments": 0}
+
+        def flush():
+            db.save_audit_progress(list(checkpoints.values()), batch, int(time.time()))
+            new_findings.extend(batch)
+            checkpoints.clear()
+            batch.clear()
+            if progress:
+                progress(totals["rows"])
+
+        def collect(result: Dict[str, Any]):
+            # Results arrive in read order, so a checkpoint never skips an unverified segment
+            checkpoints[result['fingerprint']] = (result['fingerprint'], result['last_seq'], result['last_hash'])
+            batch.extend(result['findings'])
+            totals["rows"] += result['rows']
+            totals["segments"] += 1
+            if totals["segments"] % FLUSH_EVERY == 0:
+                flush()
+
+        def submit(*job):
+            if executor is None:
+                collect(audit_segment(*job))
+                return
+            pending.append(executor.submit(audit_segment, *job))
+            while len(pending) >= self.max_pending or (pending and pending[0].done()):
+                collect(pending.popleft().result())
+
+        targets = db.get_audit_targets()
+        try:
+            for target in targets:
+                fingerprint = target['fingerprint']
+                # Parse the key once here (through the key cache) rather than in every worker
+                key_der = public_key_der(parse_public_key(target['public_key_pem'], fingerprint))
+                prev_seq, prev_hash = target['last_seq'], target['last_hash']
+                segment = []
+                after = -1 if prev_seq is None else prev_seq
+                for row in db.iter_attestation_chain(fingerprint, after, raw_findings=True):
+                    segment.append(dict(row))
+                    if len(segment) == self.segment_size:
+                        submit(fingerprint, key_der, segment, prev_seq, prev_hash)
+                        prev_seq, prev_hash = segment[-1]['seq'], segment[-1]['hash']
+                        segment = []
+                if segment:
+                    submit(fingerprint, key_der, segment, prev_seq, prev_hash)
+            while pending:
+                collect(pending.popleft().result())
+            flush()
+        finally:
+            for future in pending:
+                future.cancel()
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        elapsed = time.perf_counter() - start
+        open_findings = db.get_audit_findings()
+        by_kind: Dict[str, int] = {}
+        for finding in open_findings:
+            by_kind[finding['kind']] = by_kind.get(finding['kind'], 0) + 1
+        report = {
+            "started_at": int(started),
+            "elapsed_s": round(elapsed, 3),
+            "mode": self.mode if executor else "inline",
+            "workers": self.workers,
+            "agents_audited": len(targets),
+            "rows_audited": totals["rows"],
+            "rows_per_s": round(totals["rows"] / elapsed, 1) if elapsed else 0.0,
+            "new_findings": new_findings,
+            "open_findings": by_kind,
+            "broken_chains": sorted({f['fingerprint'] for f in open_findings if f['kind'] != "gap"}),
+            "gaps": [f for f in open_findings if f['kind'] == "gap"],
+        }
+        if new_findings:
+            logging.warning(f"Chain audit: {len(new_findings)} new findings in {totals['rows']} rows")
+        return report
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Load test: sync (main.py) vs asyncio (main_async.py) server.
+
+Starts each server under uvicorn on a fresh database, enrolls N agents
+with real P-256 keys, then has every agent submit attestations and read
+its status concurrently. Reports p50/p99 latency per request type and
+overall throughput for both modes.
+
+Needs httpx (pip install httpx).
+
+Usage:
+    python bench_async.py --agents 1000 --attestations 5
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from crypto import canonical_message, hash_attestation
+
+
+HERE = Path(__file__).parent
+MODES = {"sync": "main:app", "async": "main_async:app"}
+VERSION = "1.0.0+c14n.1"
+
+
+def make_agent(index: int) -> dict:
+    """Key pair and identity for one synthetic agent."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    public_pem = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+    return {"id": f"load-{index:05d}", "fingerprint": f"load{index:05d}", "key": private_key, "pem": public_pem}
+
+
+def signed(agent: dict, data: dict) -> dict:
+    """Attestation with a canonical-mode signature."""
+    sig = agent["key"].sign(canonical_message(data), ec.ECDSA(hashes.SHA256()))
+    return {**data, "sig": base64.b64encode(sig).decode()}
+
+
+def attestation(seq: int, prev: str) -> dict:
+    """Unsigned attestation payload."""
+    return {
+        "seq": seq, "prev": prev, "ts": int(time.time()), "result": "pass",
+        "critical": 0, "warn": 0, "info": 1, "version": VERSION,
+        "findings": ["Memory check: OK"]
+    }
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class Recorder:
+    """Latency samples (ms) per request type, plus error counts."""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    async def call(self, name: str, request):
+        start = time.perf_counter()
+        response = await request
+        self.samples.setdefault(name, []).append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return response
+
+
+async def run_agent(client: httpx.AsyncClient, rec: Recorder, agent: dict, count: int):
+    """Enroll, then submit `count` attestations with a status read after each."""
+    genesis = attestation(0, "0" * 64)
+    await rec.call("enroll", client.post("/v1/enroll", json={
+        "agent_id": agent["id"],
+        "fingerprint": agent["fingerprint"],
+        "public_key_pem": agent["pem"],
+        "genesis_attestation": signed(agent, genesis)
+    }))
+    prev = genesis
+    for seq in range(1, count + 1):
+        data = attestation(seq, hash_attestation(prev))
+        await rec.call("attestation", client.post("/v1/attestation", json={
+            "agent": {"id": agent["id"], "fingerprint": agent["fingerprint"]},
+            "attestation": signed(agent, data),
+            "chain": {"length": seq, "prevHash": data["prev"]}
+        }))
+        await rec.call("status", client.get(f"/v1/agent/{agent['fingerprint']}/status"))
+        prev = data
+
+
+async def drive(base_url: str, agents: List[dict], count: int) -> dict:
+    """Run every agent concurrently against one server and summarise latencies."""
+    rec = Recorder()
+    limits = httpx.Limits(max_connections=len(agents), max_keepalive_connections=len(agents))
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(run_agent(client, rec, agent, count) for agent in agents))
+        elapsed = time.perf_counter() - start
+    total = sum(len(s) for s in rec.samples.values())
+    return {
+        "elapsed_s": elapsed,
+        "requests": total,
+        "rps": total / elapsed,
+        "latency_ms": {
+            name: {"p50": percentile(s, 50), "p99": percentile(s, 99)}
+            for name, s in rec.samples.items()
+        },
+        "all_ms": {
+            "p50": percentile([x for s in rec.samples.values() for x in s], 50),
+            "p99": percentile([x for s in rec.samples.values() for x in s], 99),
+        },
+        "errors": rec.errors,
+    }
+
+
+def start_server(app: str, port: int, db_path: Path) -> subprocess.Popen:
+    """Run uvicorn in a subprocess so client and server don't share a GIL."""
+    env = {**os.environ, "CLAWDSURE_DB_PATH": str(db_path)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "error",
+         "--backlog", "4096"],
+        cwd=HERE, env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/v1/health").status_code == 200:
+                return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{app} did not start on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdSure sync vs async server load test")
+    parser.add_argument("--agents", type=int, default=1000, help="Concurrent agents")
+    parser.add_argument("--attestations", type=int, default=5, help="Attestations per agent")
+    parser.add_argument("--port", type=int, default=8431)
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["sync", "async"])
+    args = parser.parse_args()
+
+    print(f"Generating {args.agents} P-256 keys...")
+    agents = [make_agent(i) for i in range(args.agents)]
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            proc = start_server(MODES[mode], args.port, Path(tmp) / f"{mode}.db")
+            try:
+                results[mode] = asyncio.run(drive(f"http://127.0.0.1:{args.port}", agents, args.attestations))
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    print(f"\n{args.agents} agents x {args.attestations} attestations\n")
+    print(f"{'mode':<6} {'type':<12} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode, res in results.items():
+        for name, lat in res["latency_ms"].items():
+            print(f"{mode:<6} {name:<12} {lat['p50']:9.1f} {lat['p99']:9.1f}")
+        print(f"{mode:<6} {'all':<12} {res['all_ms']['p50']:9.1f} {res['all_ms']['p99']:9.1f}"
+              f"   {res['rps']:.0f} req/s, errors: {res['errors'] or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark the attestation write path against SQLite.
+
+Replays the queries POST /v1/attestation makes (get_agent,
+get_last_attestation, store_attestation) with the legacy
+connect-per-query setup and with the pooled WAL connections,
+and reports attestations/sec for each.
+
+Usage:
+    python bench_db.py --agents 20 --attestations 50 --threads 8
+"""
+
+import argparse
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import db
+
+
+def run_agent(fingerprint: str, count: int):
+    """Submit `count` attestations for one agent through the db helpers."""
+    for _ in range(count):
+        agent = db.get_agent(fingerprint)
+        assert agent is not None
+        last = db.get_last_attestation(fingerprint)
+        seq = last['seq'] + 1 if last else 0
+        prev = last['hash'] if last else "0" * 64
+        db.store_attestation(
+            fingerprint, seq, prev, 1735689600 + seq * 3600, "pass",
+            0, 1, 2, "1.0.0", ["Memory check: OK"], "sig",
+            f"{fingerprint}-{seq:08d}".ljust(64, "0"), int(time.time())
+        )
+
+
+def run_mode(label: str, path: Path, args, **pool_options) -> float:
+    """Run one benchmark pass and return attestations/sec."""
+    pool = db.configure_db(path, **pool_options)
+    db.init_db()
+    fingerprints = [f"bench{i:04d}" for i in range(args.agents)]
+    for fp in fingerprints:
+        db.enroll_agent(fp, fp, "-----BEGIN PUBLIC KEY-----", 0)
+
+    # Spread agents across worker threads like the FastAPI threadpool does
+    buckets = [fingerprints[i::args.threads] for i in range(args.threads)]
+    threads = [
+        threading.Thread(target=lambda fps=fps: [run_agent(fp, args.attestations) for fp in fps])
+        for fps in buckets
+    ]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = args.agents * args.attestations
+    rate = total / elapsed
+    print(f"{label:<8} {total:>7} attestations in {elapsed:7.2f}s  "
+          f"{rate:9.1f} att/s  ({pool.stats()['connections_opened']} connections opened)")
+    db.close_db()
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdSure SQLite write-path benchmark")
+    parser.add_argument("--agents", type=int, default=20)
+    parser.add_argument("--attestations", type=int, default=50, help="Attestations per agent")
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        # Legacy: fresh connection per query, default rollback journal
+        before = run_mode("before", tmp / "legacy.db", args, persistent=False, pragmas={})
+        after = run_mode("after", tmp / "pooled.db", args)
+
+    print(f"\nspeedup: {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Load generator and benchmark for the ClawdSure API.
+
+Scales test_client.py up to N synthetic agents with real P-256 keys.
+Starts a uvicorn server on a fresh database (or targets --url), enrolls
+every agent, then drives an open-loop mix of traffic at fixed rates:
+
+  attestation  POST /v1/attestation, next seq for an idle agent
+  chain        GET /v1/agent/{fp}/chain for a random agent
+  status       GET /v1/agent/{fp}/status for a random agent
+  manifest     GET /v1/manifest/{today} (generated once before the run)
+
+Requests are issued on schedule whether or not earlier ones finished, up
+to --max-inflight; arrivals beyond that are counted as dropped. Reports
+throughput and p50/p90/p99/max latency per type, plus SQLite write-lock
+waits and timeouts taken from the server's /v1/health counters (these
+cover the one server process, so run uvicorn with a single worker).
+
+Results are written as JSON (--output) for comparison across releases.
+
+Needs httpx (pip install httpx).
+
+Usage:
+    python bench_load.py --agents 200 --duration 30 \\
+        --rates attestation=50,chain=20,status=50,manifest=2 --output load.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from bench_async import HERE, MODES, Recorder, attestation, percentile, signed, start_server
+from test_client import generate_key_pair, hash_attestation
+
+
+TRAFFIC = ("attestation", "chain", "status", "manifest")
+DEFAULT_RATES = "attestation=50,chain=20,status=50,manifest=2"
+
+
+def parse_rates(spec: str) -> Dict[str, float]:
+    """'attestation=50,chain=20' -> {"attestation": 50.0, "chain": 20.0} (requests/s)."""
+    rates = {}
+    for part in filter(None, spec.split(",")):
+        name, _, value = part.partition("=")
+        if name not in TRAFFIC:
+            raise argparse.ArgumentTypeError(f"unknown traffic type {name!r} (choose from {', '.join(TRAFFIC)})")
+        rates[name] = float(value)
+    return rates
+
+
+def make_agents(count: int) -> List[dict]:
+    """Synthetic agents, keyed the way test_client.py keys its one agent."""
+    agents = []
+    for index in range(count):
+        private_key, public_pem = generate_key_pair()
+        agents.append({
+            "id": f"load-{index:05d}", "fingerprint": f"load{index:05d}",
+            "key": private_key, "pem": public_pem, "prev": None
+        })
+    return agents
+
+
+class LoadRun:
+    """One benchmark run against a server: enrollment, then the timed traffic mix."""
+
+    def __init__(self, client: httpx.AsyncClient, agents: List[dict], max_inflight: int):
+        self.client = client
+        self.agents = agents
+        self.rec = Recorder()
+        self.dropped: Dict[str, int] = {}
+        self.idle = list(agents)
+        self.today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._tasks = set()
+
+    async def enroll(self, agent: dict):
+        genesis = attestation(0, "0" * 64)
+        response = await self.rec.call("enroll", self.client.post("/v1/enroll", json={
+            "agent_id": agent["id"],
+            "fingerprint": agent["fingerprint"],
+            "public_key_pem": agent["pem"],
+            "genesis_attestation": signed(agent, genesis)
+        }))
+        if response.status_code == 200:
+            agent["prev"] = genesis
+
+    async def attestation(self):
+        if not self.idle:
+            self.dropped["attestation"] = self.dropped.get("attestation", 0) + 1
+            return
+        # one request in flight per agent keeps every chain in order
+        agent = self.idle.pop(random.randrange(len(self.idle)))
+        try:
+            prev = agent["prev"]
+            data = attestation(prev["seq"] + 1, hash_attestation(prev))
+            response = await self.rec.call("attestation", self.client.post("/v1/attestation", json={
+                "agent": {"id": agent["id"], "fingerprint": agent["fingerprint"]},
+                "attestation": signed(agent, data),
+                "chain": {"length": data["seq"], "prevHash": data["prev"]}
+            }))
+            if response.status_code == 200:
+                agent["prev"] = data
+        finally:
+            self.idle.append(agent)
+
+    async def chain(self):
+        agent = random.choice(self.agents)
+        await self.rec.call("chain", self.client.get(f"/v1/agent/{agent['fingerprint']}/chain"))
+
+    async def status(self):
+        agent = random.choice(self.agents)
+        await self.rec.call("status", self.client.get(f"/v1/agent/{agent['fingerprint']}/status"))
+
+    async def manifest(self):
+        await self.rec.call("manifest", self.client.get(f"/v1/manifest/{self.today}"))
+
+    def _launch(self, name: str, job) -> bool:
+        """Start a request if a slot is free; otherwise count it as dropped."""
+        if self._slots.locked():
+            self.dropped[name] = self.dropped.get(name, 0) + 1
+            return False
+
+        async def run():
+            async with self._slots:
+                try:
+                    await job()
+                except httpx.HTTPError:
+                    self.rec.errors[name] = self.rec.errors.get(name, 0) + 1
+
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    async def _paced(self, name: str, rate: float, until: float, jobs):
+        """Issue jobs at `rate` per second until the deadline (or the jobs run out)."""
+        interval = 1.0 / rate
+        next_at = time.perf_counter()
+        for job in jobs:
+            now = time.perf_counter()
+            if now >= until:
+                break
+            if next_at > now:
+                await asyncio.sleep(next_at - now)
+            self._launch(name, job)
+            next_at += interval
+
+    async def drain(self):
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    async def enroll_all(self, rate: float) -> float:
+        """Enroll every agent (rate 0: as fast as max-inflight allows). Returns seconds taken."""
+        start = time.perf_counter()
+        jobs = [lambda agent=agent: self.enroll(agent) for agent in self.agents]
+        if rate > 0:
+            await self._paced("enroll", rate, float("inf"), jobs)
+        else:
+            for job in jobs:
+                while self._slots.locked():
+                    await asyncio.sleep(0.001)
+                self._launch("enroll", job)
+        await self.drain()
+        self.agents = [agent for agent in self.agents if agent["prev"] is not None]
+        self.idle = list(self.agents)
+        return time.perf_counter() - start
+
+    async def traffic(self, rates: Dict[str, float], duration: float) -> float:
+        """Run the timed traffic mix. Returns seconds taken, including the drain."""
+        await self.client.post("/v1/manifest/generate", params={"date": self.today})
+        start = time.perf_counter()
+        until = start + duration
+        await asyncio.gather(*(
+            self._paced(name, rate, until, itertools.repeat(getattr(self, name)))
+            for name, rate in rates.items() if rate > 0
+        ))
+        await self.drain()
+        return time.perf_counter() - start
+
+
+def summarise(samples: List[float], errors: int, dropped: int, elapsed: float) -> dict:
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "dropped": dropped,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(samples, 50), 2),
+            "p90": round(percentile(samples, 90), 2),
+            "p99": round(percentile(samples, 99), 2),
+            "max": round(max(samples), 2),
+        } if samples else None,
+    }
+
+
+def lock_delta(before: Optional[dict], after: Optional[dict]) -> Optional[dict]:
+    """Lock counters accumulated during the run (None if the server doesn't report them)."""
+    if not before or not after:
+        return None
+    return {key: round(after[key] - before[key], 3) for key in after}
+
+
+async def benchmark(base_url: str, agents: List[dict], rates: Dict[str, float], args) -> dict:
+    limits = httpx.Limits(max_connections=args.max_inflight, max_keepalive_connections=args.max_inflight)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        run = LoadRun(client, agents, args.max_inflight)
+        before = (await client.get("/v1/health")).json().get("db")
+        enroll_s = await run.enroll_all(args.enroll_rate)
+        traffic_s = await run.traffic(rates, args.duration)
+        health = (await client.get("/v1/health")).json()
+
+    results = {}
+    for name in ["enroll", *rates]:
+        elapsed = enroll_s if name == "enroll" else traffic_s
+        results[name] = summarise(
+            run.rec.samples.get(name, []), run.rec.errors.get(name, 0), run.dropped.get(name, 0), elapsed
+        )
+    traffic_samples = [x for name in rates for x in run.rec.samples.get(name, [])]
+    return {
+        "enroll_s": round(enroll_s, 3),
+        "traffic_s": round(traffic_s, 3),
+        "requests": results,
+        "traffic": summarise(
+            traffic_samples,
+            sum(run.rec.errors.get(name, 0) for name in rates),
+            sum(run.dropped.get(name, 0) for name in rates),
+            traffic_s
+        ),
+        "sqlite_locks": lock_delta(before, health.get("db")),
+        "server": {key: health.get(key) for key in ("version", "agents_enrolled", "attestations_total")},
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdSure load generator and benchmark")
+    parser.add_argument("--agents", type=int, default=200, help="Synthetic agents to enroll")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of traffic after enrollment")
+    parser.add_argument("--rates", type=parse_rates, default=parse_rates(DEFAULT_RATES),
+                        help=f"Requests/s per type (default {DEFAULT_RATES})")
+    parser.add_argument("--enroll-rate", type=float, default=0, help="Enrollments/s (0: unthrottled)")
+    parser.add_argument("--max-inflight", type=int, default=256, help="Concurrent request cap")
+    parser.add_argument("--mode", choices=sorted(MODES), default="sync", help="Server to start")
+    parser.add_argument("--port", type=int, default=8432)
+    parser.add_argument("--url", help="Benchmark a running server instead of starting one")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    args = parser.parse_args()
+    random.seed(args.seed)
+
+    print(f"Generating {args.agents} P-256 keys...")
+    agents = make_agents(args.agents)
+
+    if args.url:
+        results = asyncio.run(benchmark(args.url, agents, args.rates, args))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = start_server(MODES[args.mode], args.port, Path(tmp) / "load.db")
+            try:
+                results = asyncio.run(benchmark(f"http://127.0.0.1:{args.port}", agents, args.rates, args))
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    report = {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "params": {
+            "agents": args.agents, "duration_s": args.duration, "rates": args.rates,
+            "enroll_rate": args.enroll_rate, "max_inflight": args.max_inflight,
+            "server": args.url or MODES[args.mode], "seed": args.seed,
+        },
+        **results,
+    }
+
+    print(f"\n{args.agents} agents, {args.duration:g}s at {args.rates}\n")
+    print(f"{'type':<12} {'count':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'err':>5} {'drop':>5}")
+    for name, res in [*results["requests"].items(), ("traffic", results["traffic"])]:
+        lat = res["latency_ms"] or dict.fromkeys(("p50", "p90", "p99", "max"), 0.0)
+        print(f"{name:<12} {res['count']:7d} {res['throughput_rps']:8.1f} {lat['p50']:8.1f} {lat['p90']:8.1f}"
+              f" {lat['p99']:8.1f} {lat['max']:8.1f} {res['errors']:5d} {res['dropped']:5d}")
+    locks = results["sqlite_locks"]
+    if locks:
+        print(f"\nSQLite: {locks['write_transactions']} write transactions, {locks['lock_waits']} waited "
+              f"({locks['lock_wait_ms']:.1f} ms total), {locks['lock_timeouts']} timed out")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
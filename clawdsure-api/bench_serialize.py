@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark chain page serialization.
+
+Fills a temporary database with one agent's chain, then times building
+the JSON body for 1000-row pages three ways:
+
+  pydantic   dict rows + json.loads(findings) -> AttestationRecord models ->
+             ChainResponse, validated again and encoded the way FastAPI
+             handles response_model
+  fast       raw rows -> serialize.records_json (orjson if installed),
+             findings spliced in as stored JSON
+  stdlib     the same fast path with orjson disabled
+
+Each is reported as serialization only and including the SQLite read.
+
+Usage:
+    python bench_serialize.py --rows 1000 --repeat 50
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+import db
+import serialize
+from models import AttestationRecord, ChainResponse
+
+
+FINDINGS = [
+    "Memory check: OK",
+    "Config check: OK",
+    {"check": "disk", "status": "warn", "detail": "82% used on /var"},
+    {"check": "skills", "status": "ok", "count": 14},
+    "Gateway token rotated 3 days ago",
+]
+
+RECORD_FIELDS = ("seq", "prev", "ts", "result", "critical", "warn", "info", "version", "findings", "sig", "hash")
+
+
+def pydantic_body(rows) -> bytes:
+    records = [AttestationRecord(**{field: row[field] for field in RECORD_FIELDS}) for row in rows]
+    response = ChainResponse(agent_id="bench", fingerprint="bench", attestations=records, total=len(rows))
+    # FastAPI re-validates the returned model against response_model, then encodes it
+    validated = ChainResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated), separators=(",", ":")).encode()
+
+
+def fast_body(rows) -> bytes:
+    return serialize.records_json(rows)
+
+
+def timed(fn, repeat: int) -> float:
+    """Best-of-repeat milliseconds per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdSure chain serialization benchmark")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.configure_db(Path(tmp) / "bench.db")
+        db.init_db()
+        db.enroll_agent("bench", "bench", "-----BEGIN PUBLIC KEY-----", 0)
+        db.ingest_attestation_batch("bench", [
+            {
+                "seq": seq, "prev": f"{seq - 1:064x}", "ts": 1735689600 + seq * 3600,
+                "result": "pass", "critical": 0, "warn": 1, "info": 4, "version": "1.4.0+c14n.1",
+                "findings": FINDINGS, "sig": "MEUCIQ" + "A" * 90, "hash": f"{seq:064x}"
+            }
+            for seq in range(args.rows)
+        ], 1735689600)
+
+        dict_rows = db.get_attestation_chain("bench", args.rows)
+        raw_rows = db.get_attestation_chain("bench", args.rows, raw_findings=True)
+        assert json.loads(fast_body(raw_rows)) == json.loads(pydantic_body(dict_rows))["attestations"]
+
+        orjson = serialize.orjson
+        results = {
+            "pydantic": (
+                timed(lambda: pydantic_body(dict_rows), args.repeat),
+                timed(lambda: pydantic_body(db.get_attestation_chain("bench", args.rows)), args.repeat),
+            ),
+            "fast": (
+                timed(lambda: fast_body(raw_rows), args.repeat),
+                timed(lambda: fast_body(db.get_attestation_chain("bench", args.rows, raw_findings=True)), args.repeat),
+            ),
+        }
+        serialize.orjson = None
+        try:
+            results["stdlib"] = (
+                timed(lambda: fast_body(raw_rows), args.repeat),
+                timed(lambda: fast_body(db.get_attestation_chain("bench", args.rows, raw_findings=True)), args.repeat),
+            )
+        finally:
+            serialize.orjson = orjson
+        db.close_db()
+
+    print(f"{args.rows}-row page (orjson {'enabled' if orjson else 'not installed'}), best of {args.repeat}\n")
+    print(f"{'path':<10} {'serialize ms':>13} {'read+serialize ms':>18}")
+    base = results["pydantic"]
+    for name, (ser, total) in results.items():
+        print(f"{name:<10} {ser:13.2f} {total:18.2f}   ({base[0] / ser:.1f}x / {base[1] / total:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
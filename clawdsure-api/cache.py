@@ -0,0 +1,124 @@
+"""In-process response cache with ETags for ClawdSure."""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Optional, Set, Tuple
+
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+
+@dataclass
+class CachedBody:
+    """A serialized response body with its strong ETag."""
+    body: bytes
+    etag: str
+    immutable: bool = False
+    meta: Any = None  # caller data kept with the body (e.g. a version stamp)
+
+    @property
+    def cache_control(self) -> str:
+        return IMMUTABLE if self.immutable else REVALIDATE
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag: content hash of the exact body bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 specifies for it)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU of response bodies.
+
+    Keys are tuples whose first two items name a group (e.g.
+    ("manifest", date)); invalidate_group drops every cached page of it.
+    Bodies are evicted least recently used first once their total size
+    exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, CachedBody]" = OrderedDict()
+        self._groups: Dict[Hashable, Set[Tuple]] = {}
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[CachedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple, body: bytes, immutable: bool = False, meta: Any = None) -> CachedBody:
+        """Cache a body (if it fits) and return it with its ETag."""
+        entry = CachedBody(body, make_etag(body), immutable, meta)
+        if len(body) > self.max_bytes:
+            return entry
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._groups.setdefault(key[:2], set()).add(key)
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+            group = self._groups.get(key[:2])
+            if group is not None:
+                group.discard(key)
+                if not group:
+                    del self._groups[key[:2]]
+
+    def invalidate_group(self, *group) -> int:
+        """Drop all cached pages of a group, e.g. invalidate_group("manifest", date)."""
+        with self._lock:
+            keys = list(self._groups.get(group, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._groups.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+response_cache = ResponseCache(int(os.environ.get("CLAWDSURE_CACHE_MB", "64")) * 1024 * 1024)
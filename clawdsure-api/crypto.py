@@ -2,28 +2,282 @@
 import base64
 import hashlib
 import json
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import ec, utils
 from cryptography.exceptions import InvalidSignature
 
 
+class PublicKeyCache:
+    """
+    Bounded LRU cache of parsed public keys.
+    
+    Entries are keyed by SHA-256 of the PEM, so a cached object is never
+    served for a different key. A fingerprint -> PEM-hash index allows
+    dropping an agent's key explicitly (e.g. on revocation).
+    """
+    
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._keys: "OrderedDict[str, ec.EllipticCurvePublicKey]" = OrderedDict()
+        self._by_fingerprint: Dict[str, str] = {}
+        self._fingerprints: Dict[str, set] = {}  # PEM hash -> fingerprints
+        self._lock = threading.Lock()
+    
+    def _index(self, pem_hash: str, fingerprint: Optional[str]):
+        if fingerprint and self._by_fingerprint.get(fingerprint) != pem_hash:
+            self._by_fingerprint[fingerprint] = pem_hash
+            self._fingerprints.setdefault(pem_hash, set()).add(fingerprint)
+    
+    def _forget(self, pem_hash: str) -> bool:
+        for fp in self._fingerprints.pop(pem_hash, ()):
+            if self._by_fingerprint.get(fp) == pem_hash:
+                del self._by_fingerprint[fp]
+        return self._keys.pop(pem_hash, None) is not None
+    
+    def get(self, public_key_pem: str, fingerprint: Optional[str] = None) -> ec.EllipticCurvePublicKey:
+        """Return the parsed key, loading and caching it on a miss."""
+        pem_hash = hashlib.sha256(public_key_pem.encode()).hexdigest()
+        with self._lock:
+            key = self._keys.get(pem_hash)
+            if key is not None:
+                self._keys.move_to_end(pem_hash)
+                self._index(pem_hash, fingerprint)
+                self.hits += 1
+                return key
+            self.misses += 1
+        
+        # Parse outside the lock; concurrent misses for one key just parse twice
+        key = serialization.load_pem_public_key(public_key_pem.encode())
+        with self._lock:
+            self._keys[pem_hash] = key
+            self._index(pem_hash, fingerprint)
+            while len(self._keys) > self.maxsize:
+                self._forget(next(iter(self._keys)))
+                self.evictions += 1
+        return key
+    
+    def invalidate(self, fingerprint: Optional[str] = None, public_key_pem: Optional[str] = None) -> bool:
+        """Drop a cached key by agent fingerprint or PEM. Returns True if removed."""
+        with self._lock:
+            pem_hash = self._by_fingerprint.get(fingerprint) if fingerprint else None
+            if pem_hash is None and public_key_pem:
+                pem_hash = hashlib.sha256(public_key_pem.encode()).hexdigest()
+            if pem_hash is None:
+                return False
+            return self._forget(pem_hash)
+    
+    def clear(self):
+        """Drop all cached keys (counters are kept)."""
+        with self._lock:
+            self._keys.clear()
+            self._by_fingerprint.clear()
+            self._fingerprints.clear()
+    
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "size": len(self._keys),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_key_cache = PublicKeyCache()
+
+
+def load_public_key(public_key_pem: str, fingerprint: Optional[str] = None) -> ec.EllipticCurvePublicKey:
+    """Load a PEM public key through the shared cache."""
+    return _key_cache.get(public_key_pem, fingerprint)
+
+
+def invalidate_public_key(fingerprint: Optional[str] = None, public_key_pem: Optional[str] = None) -> bool:
+    """Evict an agent's cached key, e.g. when the agent is revoked."""
+    return _key_cache.invalidate(fingerprint, public_key_pem)
+
+
+def public_key_cache_stats() -> Dict[str, int]:
+    """Counters for the shared public-key cache."""
+    return _key_cache.stats()
+
+
+# Agents opt into deterministic signing by tagging their version with
+# semver build metadata, e.g. "1.4.0+c14n.1". The server then verifies
+# exactly one byte string: canonical_message(data, 1).
+CANONICAL_TAG = "c14n"
+CANONICAL_VERSIONS = (1,)
+
+# Verification outcomes: canonical mode vs legacy multi-candidate fallback
+VALID_OUTCOMES = ("canonical_valid", "fallback_valid")
+_sig_counts = {
+    "canonical_valid": 0, "canonical_invalid": 0,
+    "fallback_valid": 0, "fallback_invalid": 0,
+    "bad_key": 0,
+}
+_sig_counts_lock = threading.Lock()
+
+
+def record_signature_outcome(outcome: str):
+    """Count one verification outcome (see signature_stats)."""
+    with _sig_counts_lock:
+        _sig_counts[outcome] += 1
+
+
+def signature_stats() -> Dict[str, int]:
+    """How often signatures verified via canonical mode vs legacy fallback."""
+    with _sig_counts_lock:
+        return dict(_sig_counts)
+
+
+def canonical_version(version: Optional[str]) -> Optional[int]:
+    """
+    Return the canonical-serialization version an attestation declares.
+    
+    Looks for a 'c14n.N' identifier in the build metadata of the version
+    string ("1.4.0+c14n.1" -> 1). Returns None for legacy agents or unknown
+    canonical versions.
+    """
+    if not version or "+" not in version:
+        return None
+    build = version.split("+", 1)[1].split(".")
+    for i, ident in enumerate(build[:-1]):
+        if ident == CANONICAL_TAG and build[i + 1].isdigit():
+            n = int(build[i + 1])
+            return n if n in CANONICAL_VERSIONS else None
+    return None
+
+
+def canonical_message(attestation_data: dict, c14n_version: int = 1) -> bytes:
+    """
+    Exact bytes an agent signs in canonical mode.
+    
+    v1: attestation without 'sig' as JSON with sorted keys, no whitespace,
+    ASCII-escaped, UTF-8 encoded (the same form hash_attestation uses).
+    """
+    if c14n_version != 1:
+        raise ValueError(f"Unsupported canonical version: {c14n_version}")
+    data_without_sig = {k: v for k, v in attestation_data.items() if k != 'sig'}
+    return json.dumps(data_without_sig, sort_keys=True, separators=(',', ':')).encode()
+
+
 def verify_attestation_signature(
     attestation_data: dict,
     signature_b64: str,
-    public_key_pem: str
+    public_key_pem: str,
+    fingerprint: Optional[str] = None
 ) -> bool:
     """
-    Verify ECDSA P-256 signature on attestation data.
+    Verify one ECDSA P-256 signature on attestation data and record the outcome.
+
+    Kept for callers outside the API; the request handlers go through
+    verifier.VerificationService. See verify_signature_outcomes.
+    """
+    outcome = verify_signature_outcomes([(attestation_data, signature_b64)], public_key_pem, fingerprint)[0]
+    record_signature_outcome(outcome)
+    return outcome in VALID_OUTCOMES
+
+
+def verify_signature_outcomes(
+    items: List[Tuple[dict, str]],
+    public_key_pem: str,
+    fingerprint: Optional[str] = None
+) -> List[str]:
+    """
+    Verify ECDSA P-256 signatures on (attestation_data, signature_b64) pairs from one agent.
     
     Agents sign the raw JSON string of the attestation (without sig field)
     using: echo -n "$JSON" | openssl dgst -sha256 -sign key | base64
     
-    We reconstruct the signed message by re-serializing without 'sig'.
-    Since agents use non-canonical JSON, we try multiple serializations.
+    If the attestation's version declares canonical mode (see
+    canonical_version) exactly one serialization is verified. Otherwise
+    we reconstruct the signed message by re-serializing without 'sig';
+    since legacy agents use non-canonical JSON, we try multiple
+    serializations.
+    
+    The key is parsed once, through the shared PublicKeyCache; pass the
+    agent's fingerprint so the entry can be invalidated on revocation.
+    
+    Returns one outcome name per item (canonical_valid, fallback_invalid,
+    ...) without touching the counters; the caller records the results
+    (see verifier.VerificationService).
     """
+    return verify_key_outcomes(items, parse_public_key(public_key_pem, fingerprint))
+
+
+def parse_public_key(public_key_pem: str, fingerprint: Optional[str] = None) -> Optional[ec.EllipticCurvePublicKey]:
+    """Parsed key from the shared cache, or None if the PEM doesn't load."""
+    try:
+        return load_public_key(public_key_pem, fingerprint)
+    except Exception:
+        return None
+
+
+def public_key_der(public_key: Optional[ec.EllipticCurvePublicKey]) -> Optional[bytes]:
+    """
+    A parsed key as DER, for worker processes.
+    
+    Parsed keys don't pickle, so process pools get the DER of a key the
+    parent already parsed (and cached) instead of the PEM: the key cache,
+    its metrics and invalidate_public_key all stay in the parent.
+    """
+    if public_key is None:
+        return None
+    return public_key.public_bytes(serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo)
+
+
+def verify_key_outcomes(items: List[Tuple[dict, str]], public_key: Optional[ec.EllipticCurvePublicKey]) -> List[str]:
+    """verify_signature_outcomes() against an already-parsed key (None: every item is bad_key)."""
+    if public_key is None:
+        return ["bad_key"] * len(items)
+    return [_verify_outcome(data, sig, public_key) for data, sig in items]
+
+
+def verify_der_outcomes(items: List[Tuple[dict, str]], public_key_der: Optional[bytes]) -> List[str]:
+    """verify_key_outcomes() in a worker process, from the DER public_key_der() made in the parent."""
+    public_key = None
+    if public_key_der is not None:
+        try:
+            public_key = serialization.load_der_public_key(public_key_der)
+        except Exception:
+            pass
+    return verify_key_outcomes(items, public_key)
+
+
+def _verify_outcome(attestation_data: dict, signature_b64: str, public_key) -> str:
+    """Verify a signature against an already-loaded public key."""
+    c14n = canonical_version(attestation_data.get('version'))
+    if c14n is not None:
+        valid = _verify_canonical(attestation_data, signature_b64, public_key, c14n)
+        return "canonical_valid" if valid else "canonical_invalid"
+    valid = _verify_fallback(attestation_data, signature_b64, public_key)
+    return "fallback_valid" if valid else "fallback_invalid"
+
+
+def _verify_canonical(attestation_data: dict, signature_b64: str, public_key, c14n_version: int) -> bool:
+    """Single verify over the canonical message; signature must be base64."""
+    try:
+        signature_bytes = base64.b64decode(signature_b64, validate=True)
+        public_key.verify(
+            signature_bytes,
+            canonical_message(attestation_data, c14n_version),
+            ec.ECDSA(hashes.SHA256())
+        )
+        return True
+    except Exception:
+        return False
+
+
+def _verify_fallback(attestation_data: dict, signature_b64: str, public_key) -> bool:
+    """Legacy agents: try each plausible serialization in turn."""
     try:
-        public_key = serialization.load_pem_public_key(public_key_pem.encode())
-        
         # Decode base64 signature (agents encode with base64, not hex)
         try:
             signature_bytes = base64.b64decode(signature_b64)
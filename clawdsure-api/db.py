@@ -1,19 +1,167 @@
 """SQLite database setup and queries for ClawdSure."""
+import os
 import sqlite3
 import json
+import functools
+import inspect
+import threading
+import time
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator, Union
 from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
 
+from pool import ConnectionPool
+from merkle import EMPTY_ROOT, append_leaf, inclusion_path, leaf_digest, manifest_leaf
+from manifest_codec import PackedManifest, encode_entries, is_packed
 
-DB_PATH = Path(__file__).parent / "data" / "clawdsure.db"
 
+DB_PATH = Path(os.environ.get("CLAWDSURE_DB_PATH", Path(__file__).parent / "data" / "clawdsure.db"))
 
-def init_db():
-    """Initialize database schema."""
+_pool = ConnectionPool(DB_PATH)
+
+
+def configure_db(path: Path, **pool_options) -> ConnectionPool:
+    """
+    Point the module at a different database file.
+    
+    Closes the current pool and returns the new one. Extra keyword
+    arguments are passed through to ConnectionPool.
+    """
+    global DB_PATH, _pool
+    _pool.close_all()
+    DB_PATH = Path(path)
+    _pool = ConnectionPool(DB_PATH, **pool_options)
+    return _pool
+
+
+# Write-lock contention counters (see begin_write). An uncontended
+# BEGIN IMMEDIATE takes microseconds, so anything slower waited for the lock.
+LOCK_WAIT_THRESHOLD = 0.001  # seconds
+
+_lock_stats = {"write_transactions": 0, "lock_waits": 0, "lock_wait_ms": 0.0, "lock_timeouts": 0}
+_lock_stats_lock = threading.Lock()
+
+
+def begin_write(conn: sqlite3.Connection):
+    """Start a write transaction (BEGIN IMMEDIATE), recording lock waits."""
+    start = time.perf_counter()
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError:
+        # busy timeout expired: "database is locked"
+        with _lock_stats_lock:
+            _lock_stats["lock_timeouts"] += 1
+        raise
+    waited = time.perf_counter() - start
+    with _lock_stats_lock:
+        _lock_stats["write_transactions"] += 1
+        if waited >= LOCK_WAIT_THRESHOLD:
+            _lock_stats["lock_waits"] += 1
+            _lock_stats["lock_wait_ms"] += waited * 1000
+
+
+def lock_stats() -> Dict[str, Any]:
+    """Write transactions started, how many waited for the lock, and for how long."""
+    with _lock_stats_lock:
+        stats = dict(_lock_stats)
+    stats["lock_wait_ms"] = round(stats["lock_wait_ms"], 3)
+    return stats
+
+
+def close_db():
+    """Close all pooled connections."""
+    _pool.close_all()
+    if _shards is not None:
+        _shards.close()
+
+
+# Sharded mode (shards.py): agents live in one of several SQLite files chosen
+# by fingerprint hash, and DB_PATH only holds manifests. Functions taking a
+# fingerprint run on that agent's shard (@_per_agent); the others are
+# answered by the shard set's merge layer when _merge_layer() returns it.
+_shards = None
+_bound_pool: ContextVar[Optional[ConnectionPool]] = ContextVar("clawdsure_bound_pool", default=None)
+
+
+def configure_shards(directory: Optional[Path], **pool_options):
+    """
+    Switch sharded storage on (directory holding shards.json) or off (None).
+    
+    Returns:
+        The ShardSet, or None
+    """
+    global _shards
+    from shards import ShardSet
+    if _shards is not None:
+        _shards.close()
+    _shards = ShardSet(Path(directory), **pool_options) if directory else None
+    return _shards
+
+
+@contextmanager
+def bind_pool(pool: ConnectionPool):
+    """Run db functions in the with-block against `pool` (one shard) instead of DB_PATH."""
+    token = _bound_pool.set(pool)
+    try:
+        yield
+    finally:
+        _bound_pool.reset(token)
+
+
+def _merge_layer():
+    """The shard set, unless sharding is off or a shard is already bound."""
+    return _shards if _shards is not None and _bound_pool.get() is None else None
+
+
+def _per_agent(fn):
+    """Run fn on the shard that holds its `fingerprint` argument."""
+    position = list(inspect.signature(fn).parameters).index("fingerprint")
+    
+    @functools.wraps(fn)
+    def routed(*args, **kwargs):
+        shards = _merge_layer()
+        if shards is None:
+            return fn(*args, **kwargs)
+        fingerprint = kwargs["fingerprint"] if "fingerprint" in kwargs else args[position]
+        with bind_pool(shards.pool_for(fingerprint)):
+            return fn(*args, **kwargs)
+    return routed
+
+
+def shard_count() -> int:
+    """Number of shards (1 when sharding is off)."""
+    return len(_shards.pools) if _shards is not None else 1
+
+
+def shard_index(fingerprint: str) -> int:
+    """Shard holding an agent (0 when sharding is off)."""
+    return _shards.index_for(fingerprint) if _shards is not None else 0
+
+
+def init_db() -> int:
+    """
+    Initialize database schema and bring older databases up to date.
+    
+    Returns:
+        Number of attestations whose timestamps were normalized
+    """
     DB_PATH.parent.mkdir(exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
+    with get_db() as conn:
+        _create_schema(conn)
+        migrated = migrate_timestamps(conn)
+        _backfill_merkle(conn)
+        _backfill_agent_heads(conn)
+    shards = _merge_layer()
+    if shards is not None:
+        migrated += shards.init_db()
+    return migrated
+
+
+def _create_schema(conn: sqlite3.Connection):
+    """Create tables and indexes if missing."""
     cursor = conn.cursor()
     
     # Agents table
@@ -49,7 +197,8 @@ def init_db():
         )
     """)
     
-    # Manifests table
+    # Manifests table. entries holds a packed blob (manifest_codec); rows
+    # written before packing keep JSON text until `manage.py pack-manifests`
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS manifests (
             date TEXT PRIMARY KEY,
@@ -62,25 +211,357 @@ def init_db():
         )
     """)
     
+    # Incremental daily merkle trees: every stored level, so appending a
+    # leaf rewrites one node per level and the root is always current
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS merkle_trees (
+            day TEXT PRIMARY KEY,
+            leaf_count INTEGER NOT NULL,
+            root BLOB NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS merkle_nodes (
+            day TEXT NOT NULL,
+            level INTEGER NOT NULL,
+            idx INTEGER NOT NULL,
+            hash BLOB NOT NULL,
+            PRIMARY KEY(day, level, idx)
+        ) WITHOUT ROWID
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS merkle_leaves (
+            day TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            attestation_id INTEGER NOT NULL UNIQUE,
+            PRIMARY KEY(day, idx)
+        ) WITHOUT ROWID
+    """)
+    
+    # Per-agent chain head, maintained in every insert transaction so status,
+    # chain totals and seq checks are single-row lookups
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS agent_heads (
+            fingerprint TEXT PRIMARY KEY,
+            chain_length INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    _add_column(cursor, "agent_heads", "last_seq", "INTEGER")
+    _add_column(cursor, "agent_heads", "last_hash", "TEXT")
+    _add_column(cursor, "agent_heads", "last_ts", "INTEGER")  # unix epoch
+    _add_column(cursor, "agent_heads", "last_result", "TEXT")
+    
+    # Global totals for /v1/health (single row, id = 1)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS global_counters (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            agents_enrolled INTEGER NOT NULL,
+            attestations_total INTEGER NOT NULL
+        )
+    """)
+    
+    # Timestamps normalized at ingest: ts keeps what the agent sent (unix int
+    # or ISO string), ts_epoch/day are canonical UTC values
+    _add_column(cursor, "attestations", "ts_epoch", "INTEGER")
+    _add_column(cursor, "attestations", "day", "TEXT")
+    
+    # Set once a closed day is sealed; sealed manifests are never rewritten
+    _add_column(cursor, "manifests", "sealed_at", "INTEGER")
+    
+    # Chain audit (audit.py): how far each agent's chain has been verified,
+    # and what the audits found
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS audit_checkpoints (
+            fingerprint TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL,
+            last_hash TEXT NOT NULL,
+            audited_at INTEGER NOT NULL
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS audit_findings (
+            fingerprint TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            detail TEXT,
+            found_at INTEGER NOT NULL,
+            PRIMARY KEY(fingerprint, seq, kind)
+        ) WITHOUT ROWID
+    """)
+    
     # Indexes
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_attestations_fingerprint ON attestations(fingerprint)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_attestations_ts ON attestations(ts)")
+    # Covers manifest reads: a day's entries never touch the table rows
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attestations_day_cover
+        ON attestations(day, fingerprint, seq, result, ts_epoch)
+    """)
+    cursor.execute("DROP INDEX IF EXISTS idx_attestations_ts")
+    
+    conn.commit()
+
+
+INSERT_ATTESTATION_SQL = """INSERT INTO attestations 
+    (fingerprint, seq, prev, ts, result, critical, warn, info, version, findings, sig, hash, received_at,
+     ts_epoch, day)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _attestation_row(
+    fingerprint: str, seq: int, prev: str, ts, result: str, critical: int, warn: int,
+    info: int, version: str, findings: List[str], sig: str, att_hash: str, received_at: int
+) -> tuple:
+    """Parameters for INSERT_ATTESTATION_SQL, with ts normalized to epoch and UTC day."""
+    ts_epoch = attestation_epoch(ts, received_at)
+    return (fingerprint, seq, prev, ts, result, critical, warn, info, version,
+            json.dumps(findings), sig, att_hash, received_at,
+            ts_epoch, epoch_day(ts_epoch, received_at))
+
+
+def _add_column(cursor: sqlite3.Cursor, table: str, column: str, decl: str):
+    """ALTER TABLE ADD COLUMN unless the column already exists."""
+    columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({table})")]
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def attestation_epoch(ts, received_at: int) -> int:
+    """
+    Unix timestamp of an attestation.
+    
+    Uses the attestation's own ts (unix int or ISO string); falls back to
+    the server receive time when ts cannot be parsed.
+    """
+    try:
+        if isinstance(ts, str):
+            dt = datetime.fromisoformat(ts.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return int(dt.timestamp())
+        return int(ts)
+    except (ValueError, TypeError, OverflowError):
+        return received_at
+
+
+def epoch_day(ts_epoch: int, received_at: int) -> str:
+    """UTC day (YYYY-MM-DD) of a unix timestamp (receive day if out of range)."""
+    try:
+        dt = datetime.fromtimestamp(ts_epoch, tz=timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        dt = datetime.fromtimestamp(received_at, tz=timezone.utc)
+    return dt.strftime("%Y-%m-%d")
+
+
+def attestation_day(ts, received_at: int) -> str:
+    """UTC day (YYYY-MM-DD) an attestation belongs to."""
+    return epoch_day(attestation_epoch(ts, received_at), received_at)
+
+
+def migrate_timestamps(conn: sqlite3.Connection) -> int:
+    """
+    One-shot normalization of rows stored before ts_epoch/day existed.
+    
+    Fills ts_epoch and day, then drops the merkle trees so they are rebuilt
+    over the normalized timestamps that leaves are now hashed with.
+    
+    Returns:
+        Number of rows migrated
+    """
+    cursor = conn.cursor()
+    rows = cursor.execute(
+        "SELECT id, ts, received_at FROM attestations WHERE day IS NULL"
+    ).fetchall()
+    if not rows:
+        return 0
+    updates = []
+    for row in rows:
+        ts_epoch = attestation_epoch(row['ts'], row['received_at'])
+        updates.append((ts_epoch, epoch_day(ts_epoch, row['received_at']), row['id']))
+    cursor.executemany("UPDATE attestations SET ts_epoch = ?, day = ? WHERE id = ?", updates)
+    _reset_merkle(cursor)
+    conn.commit()
+    return len(updates)
+
+
+def _append_to_merkle(cursor: sqlite3.Cursor, where: str, params: tuple, reroute_sealed: bool = True):
+    """
+    Append attestations matching `where` to their day's merkle tree.
     
+    Rows are appended in id (arrival) order. Must run inside the same
+    transaction as the insert so the tree never disagrees with the table.
+    
+    A sealed day's tree is frozen: with reroute_sealed, a late arrival for
+    a sealed day is moved (its `day` column too) to the UTC day it was
+    received. Rebuilds pass False, since `day` already records the move.
+    """
+    rows = cursor.execute(
+        f"""SELECT id, fingerprint, seq, result, ts_epoch AS ts, day, received_at
+            FROM attestations WHERE {where} ORDER BY id""",
+        params
+    ).fetchall()
+    for row in rows:
+        day = row['day']
+        if reroute_sealed and _is_sealed(cursor, day):
+            day = epoch_day(row['received_at'], row['received_at'])
+            cursor.execute("UPDATE attestations SET day = ? WHERE id = ?", (day, row['id']))
+        tree = cursor.execute("SELECT leaf_count FROM merkle_trees WHERE day = ?", (day,)).fetchone()
+        index = tree[0] if tree else 0
+        
+        def get_node(level: int, idx: int) -> bytes:
+            return cursor.execute(
+                "SELECT hash FROM merkle_nodes WHERE day = ? AND level = ? AND idx = ?",
+                (day, level, idx)
+            ).fetchone()[0]
+        
+        updates = append_leaf(leaf_digest(manifest_leaf(dict(row))), index, get_node)
+        cursor.executemany(
+            "INSERT OR REPLACE INTO merkle_nodes (day, level, idx, hash) VALUES (?, ?, ?, ?)",
+            [(day, level, idx, node) for level, idx, node in updates]
+        )
+        cursor.execute(
+            "INSERT INTO merkle_leaves (day, idx, attestation_id) VALUES (?, ?, ?)",
+            (day, index, row['id'])
+        )
+        cursor.execute(
+            "INSERT OR REPLACE INTO merkle_trees (day, leaf_count, root) VALUES (?, ?, ?)",
+            (day, index + 1, updates[-1][2])
+        )
+
+
+def _is_sealed(cursor: sqlite3.Cursor, day: str) -> bool:
+    return cursor.execute(
+        "SELECT 1 FROM manifests WHERE date = ? AND sealed_at IS NOT NULL", (day,)
+    ).fetchone() is not None
+
+
+def _reset_merkle(cursor: sqlite3.Cursor):
+    """Drop all merkle trees so _backfill_merkle rebuilds them from attestations."""
+    for table in ("merkle_trees", "merkle_nodes", "merkle_leaves"):
+        cursor.execute(f"DELETE FROM {table}")
+
+
+def _backfill_merkle(conn: sqlite3.Connection):
+    """Add attestations stored before merkle tracking existed to the trees."""
+    cursor = conn.cursor()
+    _append_to_merkle(
+        cursor,
+        "id NOT IN (SELECT attestation_id FROM merkle_leaves)",
+        (),
+        reroute_sealed=False
+    )
+    conn.commit()
+
+
+def _advance_head(
+    cursor: sqlite3.Cursor,
+    fingerprint: str,
+    added: int,
+    last: Dict[str, Any],
+    received_at: int
+):
+    """
+    Record newly stored attestations in agent_heads and global_counters.
+    
+    Args:
+        added: Number of attestations just inserted for this agent
+        last: The highest-seq one of them (seq, hash, ts, result); it only
+            replaces the head if it advances the chain
+    """
+    cursor.execute(
+        """INSERT INTO agent_heads (fingerprint, chain_length) VALUES (?, ?)
+           ON CONFLICT(fingerprint) DO UPDATE SET chain_length = chain_length + excluded.chain_length""",
+        (fingerprint, added)
+    )
+    cursor.execute(
+        """UPDATE agent_heads SET last_seq = ?, last_hash = ?, last_ts = ?, last_result = ?
+           WHERE fingerprint = ? AND (last_seq IS NULL OR last_seq < ?)""",
+        (last["seq"], last["hash"], attestation_epoch(last["ts"], received_at), last["result"],
+         fingerprint, last["seq"])
+    )
+    cursor.execute(
+        "UPDATE global_counters SET attestations_total = attestations_total + ? WHERE id = 1",
+        (added,)
+    )
+
+
+def rebuild_agent_heads(fingerprints: Optional[List[str]] = None) -> int:
+    """
+    Recompute agent_heads (and global_counters) from the attestations table.
+    
+    Args:
+        fingerprints: Only rebuild these agents; None rebuilds every agent
+    
+    Returns:
+        Number of agent heads written
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.rebuild_agent_heads(fingerprints)
+    with get_db() as conn:
+        count = _rebuild_heads(conn, fingerprints)
+        conn.commit()
+        return count
+
+
+def _rebuild_heads(conn: sqlite3.Connection, fingerprints: Optional[List[str]] = None) -> int:
+    """Recompute heads in the caller's transaction (see rebuild_agent_heads)."""
+    cursor = conn.cursor()
+    if fingerprints is None:
+        where, params = "", ()
+        cursor.execute("DELETE FROM agent_heads")
+    else:
+        marks = ','.join('?' * len(fingerprints))
+        where, params = f"WHERE a.fingerprint IN ({marks})", tuple(fingerprints)
+        cursor.execute(f"DELETE FROM agent_heads WHERE fingerprint IN ({marks})", params)
+    
+    rows = cursor.execute(
+        f"""SELECT a.fingerprint, c.n, a.seq, a.hash, a.ts, a.result, a.received_at
+            FROM attestations a
+            JOIN (SELECT fingerprint, COUNT(*) AS n, MAX(seq) AS max_seq
+                  FROM attestations GROUP BY fingerprint) c
+              ON c.fingerprint = a.fingerprint AND c.max_seq = a.seq
+            {where}""",
+        params
+    ).fetchall()
+    cursor.executemany(
+        """INSERT INTO agent_heads (fingerprint, chain_length, last_seq, last_hash, last_ts, last_result)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        [(r["fingerprint"], r["n"], r["seq"], r["hash"], attestation_epoch(r["ts"], r["received_at"]), r["result"])
+         for r in rows]
+    )
+    _recount_globals(cursor)
+    return len(rows)
+
+
+def _recount_globals(cursor: sqlite3.Cursor):
+    """Reset global_counters from full counts."""
+    cursor.execute(
+        """INSERT OR REPLACE INTO global_counters (id, agents_enrolled, attestations_total)
+           VALUES (1, (SELECT COUNT(*) FROM agents), (SELECT COUNT(*) FROM attestations))"""
+    )
+
+
+def _backfill_agent_heads(conn: sqlite3.Connection):
+    """Build heads for agents whose attestations predate agent_heads."""
+    missing = [row[0] for row in conn.execute(
+        """SELECT DISTINCT fingerprint FROM attestations
+           WHERE fingerprint NOT IN (SELECT fingerprint FROM agent_heads WHERE last_seq IS NOT NULL)"""
+    )]
+    if missing:
+        _rebuild_heads(conn, missing)
+    elif conn.execute("SELECT 1 FROM global_counters WHERE id = 1").fetchone() is None:
+        _recount_globals(conn.cursor())
     conn.commit()
-    conn.close()
 
 
 @contextmanager
 def get_db():
-    """Context manager for database connection."""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
+    """Context manager for this thread's pooled database connection (of the bound shard, if any)."""
+    with (_bound_pool.get() or _pool).connection() as conn:
         yield conn
-    finally:
-        conn.close()
 
 
+@_per_agent
 def enroll_agent(agent_id: str, fingerprint: str, public_key_pem: str, enrolled_at: int) -> bool:
     """
     Enroll a new agent.
@@ -90,17 +571,20 @@ def enroll_agent(agent_id: str, fingerprint: str, public_key_pem: str, enrolled_
     """
     with get_db() as conn:
         cursor = conn.cursor()
+        begin_write(conn)
         try:
             cursor.execute(
                 "INSERT INTO agents (fingerprint, agent_id, public_key_pem, enrolled_at) VALUES (?, ?, ?, ?)",
                 (fingerprint, agent_id, public_key_pem, enrolled_at)
             )
+            cursor.execute("UPDATE global_counters SET agents_enrolled = agents_enrolled + 1 WHERE id = 1")
             conn.commit()
             return True
         except sqlite3.IntegrityError:
             return False
 
 
+@_per_agent
 def get_agent(fingerprint: str) -> Optional[Dict[str, Any]]:
     """Get agent by fingerprint."""
     with get_db() as conn:
@@ -110,6 +594,7 @@ def get_agent(fingerprint: str) -> Optional[Dict[str, Any]]:
         return dict(row) if row else None
 
 
+@_per_agent
 def store_attestation(
     fingerprint: str,
     seq: int,
@@ -128,20 +613,177 @@ def store_attestation(
     """Store attestation."""
     with get_db() as conn:
         cursor = conn.cursor()
+        begin_write(conn)
         try:
             cursor.execute(
-                """INSERT INTO attestations 
-                   (fingerprint, seq, prev, ts, result, critical, warn, info, version, findings, sig, hash, received_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (fingerprint, seq, prev, ts, result, critical, warn, info, version, 
-                 json.dumps(findings), sig, att_hash, received_at)
+                INSERT_ATTESTATION_SQL,
+                _attestation_row(fingerprint, seq, prev, ts, result, critical, warn, info, version,
+                                 findings, sig, att_hash, received_at)
             )
+            _append_to_merkle(cursor, "id = ?", (cursor.lastrowid,))
+            _advance_head(cursor, fingerprint, 1, {"seq": seq, "hash": att_hash, "ts": ts, "result": result}, received_at)
             conn.commit()
             return True
         except sqlite3.IntegrityError:
             return False
 
 
+@_per_agent
+def ingest_attestation(
+    fingerprint: str,
+    seq: int,
+    prev: str,
+    ts: int,
+    result: str,
+    critical: int,
+    warn: int,
+    info: int,
+    version: str,
+    findings: List[str],
+    sig: str,
+    att_hash: str,
+    received_at: int
+) -> Dict[str, Any]:
+    """
+    Validate and store an attestation in a single write transaction.
+    
+    The agent lookup, the sequence check against the current chain head and
+    the insert all run under BEGIN IMMEDIATE, so two concurrent submits for
+    the same fingerprint cannot both pass the sequence check.
+    
+    Returns:
+        Dict with:
+          status: 'stored', 'unknown_agent', 'stale_seq' or 'duplicate'
+          agent: agent row (None if unknown)
+          last_seq / last_hash: previous chain head (None for empty chain)
+          head: new chain head {'seq', 'hash'} when stored
+    """
+    outcome = {"status": "unknown_agent", "agent": None, "last_seq": None, "last_hash": None, "head": None}
+    with get_db() as conn:
+        cursor = conn.cursor()
+        begin_write(conn)
+        try:
+            cursor.execute("SELECT * FROM agents WHERE fingerprint = ?", (fingerprint,))
+            agent = cursor.fetchone()
+            if agent is None:
+                return outcome
+            outcome["agent"] = dict(agent)
+            
+            cursor.execute(
+                "SELECT last_seq AS seq, last_hash AS hash FROM agent_heads WHERE fingerprint = ? AND last_seq IS NOT NULL",
+                (fingerprint,)
+            )
+            last = cursor.fetchone()
+            if last:
+                outcome["last_seq"], outcome["last_hash"] = last["seq"], last["hash"]
+                if seq <= last["seq"]:
+                    outcome["status"] = "stale_seq"
+                    return outcome
+            
+            try:
+                cursor.execute(
+                    INSERT_ATTESTATION_SQL,
+                    _attestation_row(fingerprint, seq, prev, ts, result, critical, warn, info, version,
+                                     findings, sig, att_hash, received_at)
+                )
+            except sqlite3.IntegrityError:
+                outcome["status"] = "duplicate"
+                return outcome
+            _append_to_merkle(cursor, "id = ?", (cursor.lastrowid,))
+            _advance_head(cursor, fingerprint, 1, {"seq": seq, "hash": att_hash, "ts": ts, "result": result}, received_at)
+            
+            conn.commit()
+            outcome["status"] = "stored"
+            outcome["head"] = {"seq": seq, "hash": att_hash}
+            return outcome
+        finally:
+            # Early returns leave the transaction open; release the lock
+            if conn.in_transaction:
+                conn.rollback()
+
+
+@_per_agent
+def ingest_attestation_batch(fingerprint: str, attestations: List[Dict[str, Any]], received_at: int) -> Dict[str, Any]:
+    """
+    Validate and store an ordered batch of attestations for one agent.
+    
+    Runs in a single BEGIN IMMEDIATE transaction: the agent and chain head
+    are read once, each item is checked against the running head (seq must
+    increase; prev mismatches are flagged, not rejected) and all accepted
+    rows are written with one executemany.
+    
+    Args:
+        fingerprint: Agent fingerprint
+        attestations: Dicts with seq, prev, ts, result, critical, warn, info,
+            version, findings, sig and hash, in submission order
+        received_at: Server receive timestamp
+    
+    Returns:
+        Dict with:
+          status: 'stored', 'unknown_agent' or 'conflict'
+          agent: agent row (None if unknown)
+          items: per-item {'seq', 'status' ('stored'/'stale_seq'),
+                 'prev_mismatch'} in input order
+          head: chain head {'seq', 'hash'} after the batch (None for empty chain)
+    """
+    outcome = {"status": "unknown_agent", "agent": None, "items": [], "head": None}
+    with get_db() as conn:
+        cursor = conn.cursor()
+        begin_write(conn)
+        try:
+            cursor.execute("SELECT * FROM agents WHERE fingerprint = ?", (fingerprint,))
+            agent = cursor.fetchone()
+            if agent is None:
+                return outcome
+            outcome["agent"] = dict(agent)
+            
+            cursor.execute(
+                "SELECT last_seq AS seq, last_hash AS hash FROM agent_heads WHERE fingerprint = ? AND last_seq IS NOT NULL",
+                (fingerprint,)
+            )
+            last = cursor.fetchone()
+            head = {"seq": last["seq"], "hash": last["hash"]} if last else None
+            newest = None
+            
+            rows = []
+            for att in attestations:
+                item = {"seq": att["seq"], "status": "stored", "prev_mismatch": False}
+                if head and att["seq"] <= head["seq"]:
+                    item["status"] = "stale_seq"
+                else:
+                    item["prev_mismatch"] = head is not None and att["prev"] != head["hash"]
+                    rows.append(_attestation_row(
+                        fingerprint, att["seq"], att["prev"], att["ts"], att["result"],
+                        att["critical"], att["warn"], att["info"], att["version"],
+                        att["findings"], att["sig"], att["hash"], received_at
+                    ))
+                    head = {"seq": att["seq"], "hash": att["hash"]}
+                    newest = att
+                outcome["items"].append(item)
+            
+            try:
+                cursor.executemany(INSERT_ATTESTATION_SQL, rows)
+            except sqlite3.IntegrityError:
+                outcome["status"] = "conflict"
+                return outcome
+            if rows:
+                # Accepted rows are exactly those past the previous head
+                _append_to_merkle(
+                    cursor, "fingerprint = ? AND seq > ?",
+                    (fingerprint, last["seq"] if last else -1)
+                )
+                _advance_head(cursor, fingerprint, len(rows), newest, received_at)
+            
+            conn.commit()
+            outcome["status"] = "stored"
+            outcome["head"] = head
+            return outcome
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+
+@_per_agent
 def get_last_attestation(fingerprint: str) -> Optional[Dict[str, Any]]:
     """Get the most recent attestation for an agent."""
     with get_db() as conn:
@@ -158,15 +800,64 @@ def get_last_attestation(fingerprint: str) -> Optional[Dict[str, Any]]:
         return None
 
 
-def get_attestation_chain(fingerprint: str, limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-    """Get attestation chain for an agent."""
+@_per_agent
+def get_agent_head(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """
+    Agent row joined with its chain head in one lookup.
+    
+    Returns:
+        Agent fields plus chain_length, last_seq, last_hash, last_ts (unix)
+        and last_result (None for agents with no attestations), or None if
+        the agent is not enrolled
+    """
+    with get_db() as conn:
+        row = conn.execute(
+            """SELECT a.*, COALESCE(h.chain_length, 0) AS chain_length,
+                      h.last_seq, h.last_hash, h.last_ts, h.last_result
+               FROM agents a LEFT JOIN agent_heads h ON h.fingerprint = a.fingerprint
+               WHERE a.fingerprint = ?""",
+            (fingerprint,)
+        ).fetchone()
+        return dict(row) if row else None
+
+
+CHAIN_COLUMNS = "seq, prev, ts, result, critical, warn, info, version, findings, sig, hash"
+
+
+@_per_agent
+def get_attestation_chain(
+    fingerprint: str,
+    limit: int = 100,
+    offset: int = 0,
+    after_seq: Optional[int] = None,
+    raw_findings: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Get attestation chain for an agent.
+    
+    With after_seq, pages by keyset on (fingerprint, seq) — cost does not
+    grow with position in the chain. offset is kept for older clients.
+    
+    With raw_findings, returns sqlite3.Row objects holding only the
+    AttestationRecord columns, with findings left as the stored JSON text
+    (for serialize.records_json).
+    """
+    columns = CHAIN_COLUMNS if raw_findings else "*"
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute(
-            "SELECT * FROM attestations WHERE fingerprint = ? ORDER BY seq ASC LIMIT ? OFFSET ?",
-            (fingerprint, limit, offset)
-        )
+        if after_seq is not None:
+            cursor.execute(
+                f"SELECT {columns} FROM attestations WHERE fingerprint = ? AND seq > ? ORDER BY seq ASC LIMIT ?",
+                (fingerprint, after_seq, limit)
+            )
+        else:
+            cursor.execute(
+                f"SELECT {columns} FROM attestations WHERE fingerprint = ? ORDER BY seq ASC LIMIT ? OFFSET ?",
+                (fingerprint, limit, offset)
+            )
         rows = cursor.fetchall()
+        if raw_findings:
+            return rows
         results = []
         for row in rows:
             result = dict(row)
@@ -175,27 +866,50 @@ def get_attestation_chain(fingerprint: str, limit: int = 100, offset: int = 0) -
         return results
 
 
+def iter_attestation_chain(
+    fingerprint: str,
+    after_seq: int = -1,
+    page_size: int = 500,
+    raw_findings: bool = False
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield an agent's whole chain in seq order, one keyset page at a time.
+    
+    Each page is a separate connection checkout, so a slow consumer (e.g. a
+    streaming response resumed on another thread) never pins a connection.
+    """
+    while True:
+        page = get_attestation_chain(fingerprint, page_size, after_seq=after_seq, raw_findings=raw_findings)
+        yield from page
+        if len(page) < page_size:
+            return
+        after_seq = page[-1]['seq']
+
+
+@_per_agent
 def get_chain_count(fingerprint: str) -> int:
-    """Get total attestation count for an agent."""
+    """Get total attestation count for an agent (maintained on insert)."""
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM attestations WHERE fingerprint = ?", (fingerprint,))
-        return cursor.fetchone()[0]
+        cursor.execute("SELECT chain_length FROM agent_heads WHERE fingerprint = ?", (fingerprint,))
+        row = cursor.fetchone()
+        return row[0] if row else 0
 
 
 def get_attestations_by_date(date: str) -> List[Dict[str, Any]]:
-    """Get all attestations for a given date (YYYY-MM-DD)."""
-    # Convert date to unix timestamp range
-    from datetime import datetime, timezone
-    dt = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
-    start_ts = int(dt.timestamp())
-    end_ts = start_ts + 86400  # +24 hours
+    """
+    Get all attestations for a given date (YYYY-MM-DD, UTC).
     
+    Matches on the normalized day column, so ISO-timestamp rows are included.
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_attestations_by_date(date)
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT * FROM attestations WHERE ts >= ? AND ts < ? ORDER BY ts ASC",
-            (start_ts, end_ts)
+            "SELECT * FROM attestations WHERE day = ? ORDER BY ts_epoch ASC",
+            (date,)
         )
         rows = cursor.fetchall()
         results = []
@@ -206,6 +920,135 @@ def get_attestations_by_date(date: str) -> List[Dict[str, Any]]:
         return results
 
 
+def get_merkle_root(date: str) -> Optional[Dict[str, Any]]:
+    """Current merkle root and leaf count for a day (YYYY-MM-DD)."""
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_merkle_root(date)
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT leaf_count, root FROM merkle_trees WHERE day = ?", (date,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"date": date, "leaf_count": row["leaf_count"], "merkle_root": row["root"].hex()}
+
+
+def _read_merkle_day(conn: sqlite3.Connection, date: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        "SELECT leaf_count, root FROM merkle_trees WHERE day = ?", (date,)
+    ).fetchone()
+    if row is None:
+        return None
+    # Index-only scan of idx_attestations_day_cover. Leaves are appended
+    # in id order, and the rowid is part of every index entry, so sorting
+    # by id restores leaf order without visiting the table.
+    entries = conn.execute(
+        """SELECT id, fingerprint, seq, result, ts_epoch
+           FROM attestations INDEXED BY idx_attestations_day_cover
+           WHERE day = ?""",
+        (date,)
+    ).fetchall()
+    entries.sort(key=lambda entry: entry[0])
+    return {
+        "date": date,
+        "merkle_root": row["root"].hex(),
+        "leaf_count": row["leaf_count"],
+        "entries": [
+            {"fingerprint": fp, "seq": seq, "result": result, "ts": ts_epoch}
+            for _, fp, seq, result, ts_epoch in entries
+        ]
+    }
+
+
+def get_merkle_day(date: str) -> Optional[Dict[str, Any]]:
+    """
+    Merkle root plus manifest leaves for a day, read from one snapshot.
+    
+    Returns:
+        Dict with merkle_root (hex), leaf_count and entries (fingerprint,
+        seq, result, ts) in leaf order, or None if the day has no tree
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_merkle_day(date)
+    with get_db() as conn:
+        conn.execute("BEGIN")
+        return _read_merkle_day(conn, date)
+
+
+def get_merkle_leaves(date: str, start: int = 0) -> List[Dict[str, Any]]:
+    """
+    Manifest leaves of this database's tree for a day, from position `start` on.
+    
+    Per database, not merged: the shard merge layer uses it to read only
+    the leaves each shard appended since it last looked.
+    """
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT a.fingerprint, a.seq, a.result, a.ts_epoch AS ts
+               FROM merkle_leaves l JOIN attestations a ON a.id = l.attestation_id
+               WHERE l.day = ? AND l.idx >= ?
+               ORDER BY l.idx""",
+            (date, start)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def get_inclusion_proof(date: str, fingerprint: str, seq: int) -> Optional[Dict[str, Any]]:
+    """
+    Merkle audit path for one attestation in a day's tree.
+    
+    Served from stored tree levels: one indexed lookup per level.
+    
+    Returns:
+        Dict with entry, leaf_index, leaf_hash, tree_size, merkle_root and
+        proof steps {'hash', 'position'}, or None if the attestation is not
+        in that day's tree
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_inclusion_proof(date, fingerprint, seq)
+    with get_db() as conn:
+        conn.execute("BEGIN")
+        row = conn.execute(
+            """SELECT a.fingerprint, a.seq, a.result, a.ts_epoch AS ts, l.idx
+               FROM attestations a JOIN merkle_leaves l ON l.attestation_id = a.id
+               WHERE a.fingerprint = ? AND a.seq = ? AND l.day = ?""",
+            (fingerprint, seq, date)
+        ).fetchone()
+        if row is None:
+            return None
+        tree = conn.execute(
+            "SELECT leaf_count, root FROM merkle_trees WHERE day = ?", (date,)
+        ).fetchone()
+        
+        def get_node(level: int, idx: int) -> bytes:
+            return conn.execute(
+                "SELECT hash FROM merkle_nodes WHERE day = ? AND level = ? AND idx = ?",
+                (date, level, idx)
+            ).fetchone()[0]
+        
+        path = inclusion_path(row['idx'], tree['leaf_count'], get_node)
+        return {
+            "date": date,
+            "entry": manifest_leaf(dict(row)),
+            "leaf_index": row['idx'],
+            "leaf_hash": get_node(0, row['idx']).hex(),
+            "tree_size": tree['leaf_count'],
+            "merkle_root": tree['root'].hex(),
+            "proof": [
+                {"hash": sibling.hex(), "position": "left" if is_left else "right"}
+                for sibling, is_left in path
+            ]
+        }
+
+
+def placeholder_cid(date: str, merkle_root: str) -> str:
+    """Content identifier for a manifest (placeholder until IPFS pinning)."""
+    return f"placeholder_{date}_{merkle_root[:16]}"
+
+
 def store_manifest(
     date: str,
     merkle_root: str,
@@ -213,25 +1056,125 @@ def store_manifest(
     agent_count: int,
     attestation_count: int,
     entries: List[Dict],
-    generated_at: int
+    generated_at: int,
+    sealed_at: Optional[int] = None
 ) -> bool:
-    """Store daily manifest."""
+    """
+    Store a provisional manifest for a day that is still open.
+    
+    With sealed_at the manifest is stored sealed (the shard merge layer
+    seals this way, having built the day's tree itself).
+    
+    Returns:
+        False if the day is already sealed (sealed manifests are immutable)
+    """
     with get_db() as conn:
         cursor = conn.cursor()
         try:
+            begin_write(conn)
             cursor.execute(
-                """INSERT OR REPLACE INTO manifests 
-                   (date, merkle_root, manifest_cid, agent_count, attestation_count, entries, generated_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                """INSERT INTO manifests 
+                   (date, merkle_root, manifest_cid, agent_count, attestation_count, entries, generated_at,
+                    sealed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(date) DO UPDATE SET
+                       merkle_root = excluded.merkle_root, manifest_cid = excluded.manifest_cid,
+                       agent_count = excluded.agent_count, attestation_count = excluded.attestation_count,
+                       entries = excluded.entries, generated_at = excluded.generated_at,
+                       sealed_at = excluded.sealed_at
+                   WHERE sealed_at IS NULL""",
                 (date, merkle_root, manifest_cid, agent_count, attestation_count, 
-                 json.dumps(entries), generated_at)
+                 manifest_entries_column(entries), generated_at, sealed_at)
             )
             conn.commit()
-            return True
+            return cursor.rowcount > 0
         except Exception:
             return False
 
 
+def manifest_entries_column(entries: List[Dict[str, Any]]) -> Union[bytes, str]:
+    """
+    Manifest entries as stored: packed if they fit the layout, else JSON text.
+    
+    result and fingerprint are agent input, so a day can hold more distinct
+    results (or longer strings) than the packed layout allows; readers take
+    both.
+    """
+    try:
+        return encode_entries(entries)
+    except ValueError:
+        return json.dumps(entries)
+
+
+def seal_manifest(date: str, sealed_at: int, empty_ok: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Seal a closed day: persist its final manifest, once.
+    
+    Runs under BEGIN IMMEDIATE, so no attestation can join the day's tree
+    between reading it and sealing; afterwards late arrivals for the day
+    go to the day they were received (see _append_to_merkle). Sealing an
+    already sealed day changes nothing.
+    
+    Args:
+        empty_ok: Seal a day without attestations as an empty manifest
+            (each shard does, so late arrivals are rerouted on every shard)
+    
+    Returns:
+        The sealed manifest (as get_manifest), or None if the day has no
+        attestations
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.seal_manifest(date, sealed_at)
+    with get_db() as conn:
+        cursor = conn.cursor()
+        begin_write(conn)
+        try:
+            if not _is_sealed(cursor, date):
+                tree = _read_merkle_day(conn, date)
+                if tree is None and not empty_ok:
+                    return None
+                if tree is None:
+                    tree = {"merkle_root": EMPTY_ROOT.hex(), "entries": []}
+                entries = [manifest_leaf(entry) for entry in tree['entries']]
+                cursor.execute(
+                    """INSERT OR REPLACE INTO manifests 
+                       (date, merkle_root, manifest_cid, agent_count, attestation_count, entries,
+                        generated_at, sealed_at)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (date, tree['merkle_root'], placeholder_cid(date, tree['merkle_root']),
+                     len({entry['fingerprint'] for entry in entries}), len(entries),
+                     manifest_entries_column(entries), sealed_at, sealed_at)
+                )
+                conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+    return get_manifest(date)
+
+
+def get_unsealed_days(before: str) -> List[str]:
+    """Days earlier than `before` (YYYY-MM-DD) that have attestations but no sealed manifest."""
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_unsealed_days(before)
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT day FROM merkle_trees
+               WHERE day < ? AND day NOT IN (SELECT date FROM manifests WHERE sealed_at IS NOT NULL)
+               ORDER BY day""",
+            (before,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+
+def _manifest_entries(stored) -> Union[PackedManifest, List[Dict[str, Any]]]:
+    """Entries column: packed blob (see manifest_codec) or legacy JSON text."""
+    if is_packed(stored):
+        return PackedManifest(stored)
+    return json.loads(stored)
+
+
 def get_manifest(date: str) -> Optional[Dict[str, Any]]:
     """Get manifest for a given date."""
     with get_db() as conn:
@@ -240,20 +1183,178 @@ def get_manifest(date: str) -> Optional[Dict[str, Any]]:
         row = cursor.fetchone()
         if row:
             result = dict(row)
-            result['entries'] = json.loads(result['entries'])
+            entries = _manifest_entries(result['entries'])
+            result['entries'] = list(entries.entries()) if isinstance(entries, PackedManifest) else entries
             return result
         return None
 
 
+def get_manifest_version(date: str) -> Optional[tuple]:
+    """
+    (merkle_root, attestation_count, sealed_at) of a day's manifest, or None.
+    
+    Changes whenever its content does: the root covers every entry, so two
+    rewrites within the same second still differ (generated_at would not).
+    """
+    with get_db() as conn:
+        row = conn.execute(
+            "SELECT merkle_root, attestation_count, sealed_at FROM manifests WHERE date = ?", (date,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+
+def get_manifest_page(date: str, offset: int = 0, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Manifest with only entries [offset, offset + limit).
+    
+    Packed manifests decode just the blocks the page covers.
+    """
+    entries = iter_manifest_entries(date, offset, limit)
+    if entries is None:
+        return None
+    manifest, page = entries
+    manifest['entries'] = list(page)
+    return manifest
+
+
+def iter_manifest_entries(date: str, offset: int = 0, limit: Optional[int] = None):
+    """
+    Manifest metadata plus a lazy iterator over its entries.
+    
+    Returns:
+        (manifest without entries, entry iterator), or None if no manifest
+    """
+    with get_db() as conn:
+        row = conn.execute("SELECT * FROM manifests WHERE date = ?", (date,)).fetchone()
+    if row is None:
+        return None
+    manifest = dict(row)
+    entries = _manifest_entries(manifest.pop('entries'))
+    if isinstance(entries, PackedManifest):
+        return manifest, entries.entries(offset, limit)
+    end = None if limit is None else offset + limit
+    return manifest, iter(entries[offset:end])
+
+
+def pack_manifests() -> Dict[str, int]:
+    """
+    Convert legacy JSON manifests to the packed layout.
+    
+    Manifests whose entries carry non-epoch ts (generated before timestamps
+    were normalized) are left as JSON: their roots hash the original ts.
+    
+    Returns:
+        Counts of 'packed' and 'skipped' manifests
+    """
+    counts = {"packed": 0, "skipped": 0}
+    with get_db() as conn:
+        rows = conn.execute("SELECT date, entries FROM manifests").fetchall()
+        for row in rows:
+            if is_packed(row['entries']):
+                continue
+            try:
+                blob = encode_entries(json.loads(row['entries']))
+            except ValueError:
+                counts["skipped"] += 1
+                continue
+            conn.execute("UPDATE manifests SET entries = ? WHERE date = ?", (blob, row['date']))
+            counts["packed"] += 1
+        conn.commit()
+    return counts
+
+
+def get_audit_targets() -> List[Dict[str, Any]]:
+    """
+    Agents with attestations past their audit checkpoint, in fingerprint order.
+    
+    Seqs only grow, so comparing agent_heads.last_seq with the checkpoint
+    finds new rows without scanning attestations. last_seq/last_hash are
+    None for agents never audited.
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_audit_targets()
+    with get_db() as conn:
+        rows = conn.execute(
+            """SELECT h.fingerprint, ag.public_key_pem, c.last_seq, c.last_hash
+               FROM agent_heads h
+               JOIN agents ag ON ag.fingerprint = h.fingerprint
+               LEFT JOIN audit_checkpoints c ON c.fingerprint = h.fingerprint
+               WHERE h.last_seq > COALESCE(c.last_seq, -1)
+               ORDER BY h.fingerprint"""
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def save_audit_progress(checkpoints: List[tuple], findings: List[Dict[str, Any]], audited_at: int):
+    """
+    Record audit results in one transaction.
+    
+    Args:
+        checkpoints: (fingerprint, last_seq, last_hash) verified up to
+        findings: Dicts with fingerprint, seq, kind, detail
+        audited_at: Unix timestamp
+    """
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.save_audit_progress(checkpoints, findings, audited_at)
+    with get_db() as conn:
+        begin_write(conn)
+        try:
+            conn.executemany(
+                """INSERT OR REPLACE INTO audit_checkpoints (fingerprint, last_seq, last_hash, audited_at)
+                   VALUES (?, ?, ?, ?)""",
+                [(fp, seq, last_hash, audited_at) for fp, seq, last_hash in checkpoints]
+            )
+            conn.executemany(
+                """INSERT OR REPLACE INTO audit_findings (fingerprint, seq, kind, detail, found_at)
+                   VALUES (?, ?, ?, ?, ?)""",
+                [(f['fingerprint'], f['seq'], f['kind'], f['detail'], audited_at) for f in findings]
+            )
+            conn.commit()
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+
+def get_audit_findings() -> List[Dict[str, Any]]:
+    """Everything the audits have found so far, in (fingerprint, seq) order."""
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_audit_findings()
+    with get_db() as conn:
+        rows = conn.execute(
+            "SELECT fingerprint, seq, kind, detail, found_at FROM audit_findings ORDER BY fingerprint, seq, kind"
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+
+def reset_audit():
+    """Forget audit checkpoints and findings, so the next audit covers every row."""
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.reset_audit()
+    with get_db() as conn:
+        begin_write(conn)
+        conn.execute("DELETE FROM audit_checkpoints")
+        conn.execute("DELETE FROM audit_findings")
+        conn.commit()
+
+
 def get_stats() -> Dict[str, int]:
-    """Get global stats."""
+    """Get global stats (maintained counters, no table scans)."""
+    shards = _merge_layer()
+    if shards is not None:
+        return shards.get_stats()
     with get_db() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM agents")
-        agents_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM attestations")
-        attestations_count = cursor.fetchone()[0]
+        cursor.execute("SELECT agents_enrolled, attestations_total FROM global_counters WHERE id = 1")
+        row = cursor.fetchone()
         return {
-            "agents_enrolled": agents_count,
-            "attestations_total": attestations_count
+            "agents_enrolled": row[0] if row else 0,
+            "attestations_total": row[1] if row else 0
         }
+
+
+if os.environ.get("CLAWDSURE_SHARD_DIR"):
+    configure_shards(Path(os.environ["CLAWDSURE_SHARD_DIR"]))
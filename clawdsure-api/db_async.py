@@ -0,0 +1,176 @@
+"""Async access to the ClawdSure database for the asyncio server (main_async.py)."""
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import db
+
+
+# Each executor thread keeps its own pooled connection (see pool.py), so
+# the event loop never touches sqlite3 directly. Writes go through one
+# thread: SQLite has a single writer anyway, and queuing them in-process is
+# cheaper than threads spinning on the database lock. With sharded storage
+# each shard has its own writer, and per-agent writes go to their shard's.
+DEFAULT_READERS = 8
+
+_readers: Optional[ThreadPoolExecutor] = None
+_writers: List[ThreadPoolExecutor] = []
+
+
+def configure(readers: Optional[int] = None):
+    """
+    Start the reader and writer threads.
+
+    Args:
+        readers: Reader threads (default CLAWDSURE_DB_READERS or 8)
+    """
+    global _readers, _writers
+    close()
+    if readers is None:
+        readers = int(os.environ.get("CLAWDSURE_DB_READERS", DEFAULT_READERS))
+    _readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-read")
+    _writers = [
+        ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-write-{index}")
+        for index in range(db.shard_count())
+    ]
+
+
+def close():
+    """Stop the DB threads after queued queries finish."""
+    global _readers, _writers
+    for executor in (_readers, *_writers):
+        if executor is not None:
+            executor.shutdown(wait=True)
+    _readers, _writers = None, []
+
+
+async def _read(fn: Callable, *args, **kwargs):
+    if _readers is None:
+        configure()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_readers, functools.partial(fn, *args, **kwargs))
+
+
+async def _write(fn: Callable, *args, fingerprint: Optional[str] = None, **kwargs):
+    """Run a write on the writer of the fingerprint's shard (the first writer if None)."""
+    if not _writers:
+        configure()
+    writer = _writers[db.shard_index(fingerprint) if fingerprint is not None else 0]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(writer, functools.partial(fn, *args, **kwargs))
+
+
+async def init_db() -> int:
+    """Async db.init_db."""
+    return await _write(db.init_db)
+
+
+async def enroll_agent(agent_id: str, fingerprint: str, public_key_pem: str, enrolled_at: int) -> bool:
+    """Async db.enroll_agent."""
+    return await _write(db.enroll_agent, agent_id, fingerprint, public_key_pem, enrolled_at, fingerprint=fingerprint)
+
+
+async def store_attestation(*args) -> bool:
+    """Async db.store_attestation (same positional arguments)."""
+    return await _write(db.store_attestation, *args, fingerprint=args[0])
+
+
+async def ingest_attestation(*args) -> Dict[str, Any]:
+    """Async db.ingest_attestation (same positional arguments)."""
+    return await _write(db.ingest_attestation, *args, fingerprint=args[0])
+
+
+async def ingest_attestation_batch(fingerprint: str, attestations: List[Dict[str, Any]], received_at: int) -> Dict[str, Any]:
+    """Async db.ingest_attestation_batch."""
+    return await _write(db.ingest_attestation_batch, fingerprint, attestations, received_at, fingerprint=fingerprint)
+
+
+async def store_manifest(*args) -> bool:
+    """Async db.store_manifest (same positional arguments)."""
+    return await _write(db.store_manifest, *args)
+
+
+async def seal_manifest(date: str, sealed_at: int) -> Optional[Dict[str, Any]]:
+    """Async db.seal_manifest."""
+    return await _write(db.seal_manifest, date, sealed_at)
+
+
+async def get_agent(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Async db.get_agent."""
+    return await _read(db.get_agent, fingerprint)
+
+
+async def get_agent_head(fingerprint: str) -> Optional[Dict[str, Any]]:
+    """Async db.get_agent_head."""
+    return await _read(db.get_agent_head, fingerprint)
+
+
+async def get_attestation_chain(
+    fingerprint: str,
+    limit: int = 100,
+    offset: int = 0,
+    after_seq: Optional[int] = None,
+    raw_findings: bool = False
+) -> List[Dict[str, Any]]:
+    """Async db.get_attestation_chain."""
+    return await _read(
+        db.get_attestation_chain, fingerprint, limit, offset, after_seq=after_seq, raw_findings=raw_findings
+    )
+
+
+async def iter_attestation_chain(
+    fingerprint: str,
+    after_seq: int = -1,
+    page_size: int = 500,
+    raw_findings: bool = False
+) -> AsyncIterator[Dict[str, Any]]:
+    """Async db.iter_attestation_chain: one reader round-trip per keyset page."""
+    while True:
+        page = await get_attestation_chain(fingerprint, page_size, after_seq=after_seq, raw_findings=raw_findings)
+        for att in page:
+            yield att
+        if len(page) < page_size:
+            return
+        after_seq = page[-1]['seq']
+
+
+async def get_chain_count(fingerprint: str) -> int:
+    """Async db.get_chain_count."""
+    return await _read(db.get_chain_count, fingerprint)
+
+
+async def get_merkle_day(date: str) -> Optional[Dict[str, Any]]:
+    """Async db.get_merkle_day."""
+    return await _read(db.get_merkle_day, date)
+
+
+async def get_inclusion_proof(date: str, fingerprint: str, seq: int) -> Optional[Dict[str, Any]]:
+    """Async db.get_inclusion_proof."""
+    return await _read(db.get_inclusion_proof, date, fingerprint, seq)
+
+
+async def get_manifest(date: str) -> Optional[Dict[str, Any]]:
+    """Async db.get_manifest."""
+    return await _read(db.get_manifest, date)
+
+
+async def get_manifest_version(date: str) -> Optional[tuple]:
+    """Async db.get_manifest_version."""
+    return await _read(db.get_manifest_version, date)
+
+
+async def get_manifest_page(date: str, offset: int = 0, limit: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """Async db.get_manifest_page."""
+    return await _read(db.get_manifest_page, date, offset, limit)
+
+
+async def iter_manifest_entries(date: str, offset: int = 0, limit: Optional[int] = None):
+    """Async db.iter_manifest_entries (the returned iterator decodes lazily)."""
+    return await _read(db.iter_manifest_entries, date, offset, limit)
+
+
+async def get_stats() -> Dict[str, int]:
+    """Async db.get_stats."""
+    return await _read(db.get_stats)
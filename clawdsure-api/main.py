@@ -1,49 +1,117 @@
 """ClawdSure MVP API Server - FastAPI application."""
+import itertools
+import json
 import time
 from datetime import datetime, timezone
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Query, Header
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 
 from models import (
     EnrollRequest, EnrollResponse, AttestationRequest, AttestationResponse,
-    ChainResponse, AgentStatus, ManifestResponse, HealthResponse, AttestationRecord,
-    ManifestEntry
+    ChainResponse, AgentStatus, ManifestResponse, HealthResponse,
+    ManifestEntry, AttestationData, BatchAttestationRequest, BatchAttestationResponse,
+    BatchItemResult, InclusionProofResponse
 )
 from db import (
-    init_db, enroll_agent, get_agent, store_attestation, get_last_attestation,
-    get_attestation_chain, get_chain_count, get_attestations_by_date,
-    store_manifest, get_manifest, get_stats
+    init_db, close_db, enroll_agent, get_agent, get_agent_head, store_attestation,
+    ingest_attestation, ingest_attestation_batch, get_attestation_chain,
+    iter_attestation_chain, get_chain_count, get_merkle_day, get_inclusion_proof,
+    store_manifest, seal_manifest, get_manifest_page, get_manifest_version,
+    iter_manifest_entries, get_stats, lock_stats, placeholder_cid
 )
-from crypto import verify_attestation_signature, hash_attestation
-from merkle import compute_merkle_root
+from crypto import hash_attestation
+from verifier import get_verifier, shutdown_verifier, BatchTooLarge, VerifierBusy
+from merkle import manifest_leaf
+from scheduler import seal_cutoff, seal_grace, start_scheduler, stop_scheduler
+from cache import REVALIDATE, etag_matches, make_etag, response_cache
+from serialize import record_json, records_json
+from metrics import get_profile, manifest_build, metrics_middleware, phase, render_metrics
 
 
+NDJSON = "application/x-ndjson"
+
 app = FastAPI(
     title="ClawdSure API",
     description="Agent attestation and transparency ledger",
     version="0.1.0"
 )
+app.middleware("http")(metrics_middleware)
+
+
+def attestation_payload(attestation: AttestationData) -> dict:
+    """Signed attestation fields (everything except sig)."""
+    return {
+        "seq": attestation.seq,
+        "prev": attestation.prev,
+        "ts": attestation.ts,
+        "result": attestation.result,
+        "critical": attestation.critical,
+        "warn": attestation.warn,
+        "info": attestation.info,
+        "version": attestation.version,
+        "findings": attestation.findings
+    }
 
 
 @app.on_event("startup")
 def startup():
     """Initialize database on startup."""
     init_db()
+    get_verifier()
+    start_scheduler()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    """Stop manifest sealing, close pooled connections and stop verification workers."""
+    stop_scheduler()
+    close_db()
+    shutdown_verifier()
+
+
+def verifier_busy(exc: VerifierBusy) -> HTTPException:
+    """503 telling the agent to retry once the verification queue drains."""
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
+
+def batch_too_large(exc: BatchTooLarge) -> HTTPException:
+    """413: the batch can never fit the verification queue; split it."""
+    return HTTPException(status_code=413, detail=str(exc))
 
 
 @app.get("/v1/health", response_model=HealthResponse)
 def health():
-    """Health check endpoint."""
+    """Health check endpoint (reads maintained counters, constant time)."""
     stats = get_stats()
     return HealthResponse(
         status="ok",
         version="0.1.0",
         agents_enrolled=stats["agents_enrolled"],
-        attestations_total=stats["attestations_total"]
+        attestations_total=stats["attestations_total"],
+        db=lock_stats()
     )
 
 
+@app.get("/v1/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Prometheus metrics for this server process: per-route latency
+    histograms, db/crypto/serialize time per route, signature outcomes,
+    manifest build durations, SQLite lock waits and cache counters.
+    """
+    return PlainTextResponse(render_metrics(get_verifier().stats()), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/v1/metrics/profile/{profile_id}", response_class=PlainTextResponse)
+def metrics_profile(profile_id: str):
+    """Collapsed stacks of a request sent with X-ClawdSure-Profile (CLAWDSURE_PROFILING=1)."""
+    stacks = get_profile(profile_id)
+    if stacks is None:
+        raise HTTPException(status_code=404, detail="Profile not found (expired or profiling disabled)")
+    return PlainTextResponse(stacks)
+
+
 @app.post("/v1/enroll", response_model=EnrollResponse)
 def enroll(request: EnrollRequest):
     """
@@ -52,28 +120,24 @@ def enroll(request: EnrollRequest):
     Validates genesis attestation signature and stores agent record.
     """
     # Check if already enrolled
-    existing = get_agent(request.fingerprint)
+    with phase("db"):
+        existing = get_agent(request.fingerprint)
     if existing:
         raise HTTPException(status_code=409, detail="Agent already enrolled")
     
     # Validate genesis attestation signature
-    attestation_data = {
-        "seq": request.genesis_attestation.seq,
-        "prev": request.genesis_attestation.prev,
-        "ts": request.genesis_attestation.ts,
-        "result": request.genesis_attestation.result,
-        "critical": request.genesis_attestation.critical,
-        "warn": request.genesis_attestation.warn,
-        "info": request.genesis_attestation.info,
-        "version": request.genesis_attestation.version,
-        "findings": request.genesis_attestation.findings
-    }
+    attestation_data = attestation_payload(request.genesis_attestation)
     
-    sig_valid = verify_attestation_signature(
-        attestation_data,
-        request.genesis_attestation.sig,
-        request.public_key_pem
-    )
+    try:
+        with phase("crypto"):
+            sig_valid = get_verifier().verify(
+                attestation_data,
+                request.genesis_attestation.sig,
+                request.public_key_pem,
+                request.fingerprint
+            )
+    except VerifierBusy as exc:
+        raise verifier_busy(exc)
     # MVP: warn but don't block — agents sign bash heredoc strings that
     # we can't perfectly reconstruct from parsed JSON. Future agents will
     # sign canonical JSON for verifiable signatures.
@@ -90,28 +154,31 @@ def enroll(request: EnrollRequest):
     
     # Enroll agent
     enrolled_at = int(time.time())
-    success = enroll_agent(request.agent_id, request.fingerprint, request.public_key_pem, enrolled_at)
+    with phase("db"):
+        success = enroll_agent(request.agent_id, request.fingerprint, request.public_key_pem, enrolled_at)
     
     if not success:
         raise HTTPException(status_code=500, detail="Failed to enroll agent")
     
     # Store genesis attestation
-    att_hash = hash_attestation(attestation_data)
-    store_attestation(
-        request.fingerprint,
-        request.genesis_attestation.seq,
-        request.genesis_attestation.prev,
-        request.genesis_attestation.ts,
-        request.genesis_attestation.result,
-        request.genesis_attestation.critical,
-        request.genesis_attestation.warn,
-        request.genesis_attestation.info,
-        request.genesis_attestation.version,
-        request.genesis_attestation.findings,
-        request.genesis_attestation.sig,
-        att_hash,
-        enrolled_at
-    )
+    with phase("crypto"):
+        att_hash = hash_attestation(attestation_data)
+    with phase("db"):
+        store_attestation(
+            request.fingerprint,
+            request.genesis_attestation.seq,
+            request.genesis_attestation.prev,
+            request.genesis_attestation.ts,
+            request.genesis_attestation.result,
+            request.genesis_attestation.critical,
+            request.genesis_attestation.warn,
+            request.genesis_attestation.info,
+            request.genesis_attestation.version,
+            request.genesis_attestation.findings,
+            request.genesis_attestation.sig,
+            att_hash,
+            enrolled_at
+        )
     
     return EnrollResponse(
         agent_id=request.agent_id,
@@ -126,142 +193,244 @@ def submit_attestation(request: AttestationRequest):
     Submit an attestation.
     
     Validates chain integrity and signature, then stores attestation.
+    Agent lookup, sequence check and insert run in one DB transaction.
     """
-    # Check agent exists
-    agent = get_agent(request.agent.fingerprint)
-    if not agent:
-        raise HTTPException(status_code=404, detail="Agent not enrolled")
-    
-    # Get last attestation
-    last = get_last_attestation(request.agent.fingerprint)
-    
-    # Validate sequence — must be greater than last seen (allow gaps for MVP,
-    # since agents may have local attestations not yet submitted to API)
-    if last and request.attestation.seq <= last['seq']:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid sequence: must be > {last['seq']}, got {request.attestation.seq}"
-        )
+    attestation_data = attestation_payload(request.attestation)
+    with phase("crypto"):
+        att_hash = hash_attestation(attestation_data)
+    received_at = int(time.time())
     
-    # MVP: relax prev hash check — allow gaps since agent may have
-    # local attestations not yet synced to API
-    if last:
-        import logging
-        expected_prev = last['hash']
-        if request.attestation.prev != expected_prev:
+    # Backpressure before commit: reserve the verifier slots the post-commit check runs on
+    try:
+        reservation = get_verifier().admit()
+    except VerifierBusy as exc:
+        raise verifier_busy(exc)
+    
+    with reservation:
+        # Sequence must be greater than last seen (allow gaps for MVP,
+        # since agents may have local attestations not yet submitted to API)
+        with phase("db"):
+            outcome = ingest_attestation(
+                request.agent.fingerprint,
+                request.attestation.seq,
+                request.attestation.prev,
+                request.attestation.ts,
+                request.attestation.result,
+                request.attestation.critical,
+                request.attestation.warn,
+                request.attestation.info,
+                request.attestation.version,
+                request.attestation.findings,
+                request.attestation.sig,
+                att_hash,
+                received_at
+            )
+        
+        if outcome['status'] == 'unknown_agent':
+            raise HTTPException(status_code=404, detail="Agent not enrolled")
+        if outcome['status'] == 'stale_seq':
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sequence: must be > {outcome['last_seq']}, got {request.attestation.seq}"
+            )
+        if outcome['status'] != 'stored':
+            raise HTTPException(status_code=500, detail="Failed to store attestation")
+        
+        # MVP: relax prev hash check — allow gaps since agent may have
+        # local attestations not yet synced to API
+        if outcome['last_hash'] is not None and request.attestation.prev != outcome['last_hash']:
+            import logging
             logging.warning(f"Prev hash mismatch for {request.agent.id} seq {request.attestation.seq} — accepting (gap sync)")
+        
+        # Validate signature (best-effort for MVP). Failures are only logged,
+        # so this runs after commit to keep crypto out of the write lock.
+        try:
+            with phase("crypto"):
+                sig_valid = get_verifier().verify(
+                    attestation_data,
+                    request.attestation.sig,
+                    outcome['agent']['public_key_pem'],
+                    request.agent.fingerprint,
+                    reservation=reservation
+                )
+        except VerifierBusy:
+            import logging
+            logging.warning(f"Signature check skipped for {request.agent.id} seq {request.attestation.seq} — verifier busy")
+            sig_valid = None
+        if sig_valid is False:
+            import logging
+            logging.warning(f"Signature verification failed for {request.agent.id} seq {request.attestation.seq} — accepting for MVP")
+        
+        return AttestationResponse(
+            received=True,
+            seq=outcome['head']['seq'],
+            manifest_pending=True,
+            hash=outcome['head']['hash']
+        )
+
+
+@app.post("/v1/attestations:batch", response_model=BatchAttestationResponse)
+def submit_attestation_batch(request: BatchAttestationRequest):
+    """
+    Submit an ordered batch of attestations for one agent.
     
-    # Validate signature (best-effort for MVP)
-    attestation_data = {
-        "seq": request.attestation.seq,
-        "prev": request.attestation.prev,
-        "ts": request.attestation.ts,
-        "result": request.attestation.result,
-        "critical": request.attestation.critical,
-        "warn": request.attestation.warn,
-        "info": request.attestation.info,
-        "version": request.attestation.version,
-        "findings": request.attestation.findings
-    }
-    
-    sig_valid = verify_attestation_signature(
-        attestation_data,
-        request.attestation.sig,
-        agent['public_key_pem']
-    )
-    if not sig_valid:
+    Used for catch-up syncs after an agent has been offline. The whole
+    batch is validated against the chain and stored in one transaction;
+    items whose seq does not advance the chain are rejected individually.
+    """
+    try:
+        reservation = get_verifier().admit(len(request.attestations))
+    except BatchTooLarge as exc:
+        raise batch_too_large(exc)
+    except VerifierBusy as exc:
+        raise verifier_busy(exc)
+    
+    with reservation:
+        payloads = [attestation_payload(att) for att in request.attestations]
+        with phase("crypto"):
+            rows = [
+                {**data, "sig": att.sig, "hash": hash_attestation(data)}
+                for data, att in zip(payloads, request.attestations)
+            ]
+        
+        with phase("db"):
+            outcome = ingest_attestation_batch(request.agent.fingerprint, rows, int(time.time()))
+        
+        if outcome['status'] == 'unknown_agent':
+            raise HTTPException(status_code=404, detail="Agent not enrolled")
+        if outcome['status'] != 'stored':
+            raise HTTPException(status_code=500, detail="Failed to store attestation batch")
+        
+        # Verify stored items against one parsed key (best-effort for MVP)
+        stored = [i for i, item in enumerate(outcome['items']) if item['status'] == 'stored']
+        try:
+            with phase("crypto"):
+                sig_results = get_verifier().verify_many(
+                    [(payloads[i], request.attestations[i].sig) for i in stored],
+                    outcome['agent']['public_key_pem'],
+                    request.agent.fingerprint,
+                    reservation=reservation
+                )
+        except VerifierBusy:
+            sig_results = [None] * len(stored)
+        sig_valid = dict(zip(stored, sig_results))
+        
         import logging
-        logging.warning(f"Signature verification failed for {request.agent.id} seq {request.attestation.seq} — accepting for MVP")
-    
-    # Store attestation
-    att_hash = hash_attestation(attestation_data)
-    received_at = int(time.time())
-    
-    success = store_attestation(
-        request.agent.fingerprint,
-        request.attestation.seq,
-        request.attestation.prev,
-        request.attestation.ts,
-        request.attestation.result,
-        request.attestation.critical,
-        request.attestation.warn,
-        request.attestation.info,
-        request.attestation.version,
-        request.attestation.findings,
-        request.attestation.sig,
-        att_hash,
-        received_at
-    )
-    
-    if not success:
-        raise HTTPException(status_code=500, detail="Failed to store attestation")
-    
-    return AttestationResponse(
-        received=True,
-        seq=request.attestation.seq,
-        manifest_pending=True
-    )
+        results = []
+        for i, item in enumerate(outcome['items']):
+            if item['status'] != 'stored':
+                results.append(BatchItemResult(
+                    seq=item['seq'],
+                    received=False,
+                    error="Invalid sequence: must advance the chain"
+                ))
+                continue
+            if item['prev_mismatch']:
+                logging.warning(f"Prev hash mismatch for {request.agent.id} seq {item['seq']} — accepting (gap sync)")
+            if sig_valid[i] is None:
+                logging.warning(f"Signature check skipped for {request.agent.id} seq {item['seq']} — verifier busy")
+            elif not sig_valid[i]:
+                logging.warning(f"Signature verification failed for {request.agent.id} seq {item['seq']} — accepting for MVP")
+            results.append(BatchItemResult(
+                seq=item['seq'],
+                received=True,
+                prev_mismatch=item['prev_mismatch'],
+                sig_valid=sig_valid[i]
+            ))
+        
+        head = outcome['head']
+        received = len(stored)
+        return BatchAttestationResponse(
+            received=received,
+            rejected=len(results) - received,
+            results=results,
+            head_seq=head['seq'] if head else None,
+            head_hash=head['hash'] if head else None,
+            manifest_pending=received > 0
+        )
+
+
+def conditional_response(body: bytes, etag: str, cache_control: str, if_none_match: Optional[str]) -> Response:
+    """JSON body with validators, or 304 when the client's copy is current."""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def chain_body(agent_id: str, fingerprint: str, records: bytes, total: int, next_cursor: Optional[int]) -> bytes:
+    """ChainResponse JSON around pre-serialized records."""
+    head = json.dumps({"agent_id": agent_id, "fingerprint": fingerprint}, separators=(",", ":"))
+    tail = json.dumps({"total": total, "next_cursor": next_cursor}, separators=(",", ":"))
+    return f'{head[:-1]},"attestations":'.encode() + records + f',{tail[1:]}'.encode()
 
 
 @app.get("/v1/agent/{fingerprint}/chain", response_model=ChainResponse)
 def get_chain(
     fingerprint: str,
     limit: int = Query(100, ge=1, le=1000),
-    offset: int = Query(0, ge=0)
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, description="Keyset cursor: return attestations with seq > after"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
 ):
-    """Get full attestation chain for an agent."""
-    agent = get_agent(fingerprint)
+    """
+    Get full attestation chain for an agent.
+    
+    Page with `after` (pass the previous page's next_cursor) rather than
+    `offset`. With `Accept: application/x-ndjson` the whole chain from
+    `after` onwards is streamed as one JSON record per line.
+    
+    Rows are serialized straight from SQLite (serialize.py), with the
+    stored findings JSON passed through. Full pages are cached: the chain
+    only grows past them, so their records never change. Responses carry
+    an ETag (`total` is part of the body) and honour If-None-Match.
+    """
+    with phase("db"):
+        agent = get_agent(fingerprint)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    attestations = get_attestation_chain(fingerprint, limit, offset)
-    total = get_chain_count(fingerprint)
-    
-    records = [
-        AttestationRecord(
-            seq=att['seq'],
-            prev=att['prev'],
-            ts=att['ts'],
-            result=att['result'],
-            critical=att['critical'],
-            warn=att['warn'],
-            info=att['info'],
-            version=att['version'],
-            findings=att['findings'],
-            sig=att['sig'],
-            hash=att['hash']
+    if accept and NDJSON in accept:
+        lines = (
+            record_json(att) + b"\n"
+            for att in iter_attestation_chain(fingerprint, -1 if after is None else after, raw_findings=True)
         )
-        for att in attestations
-    ]
+        return StreamingResponse(lines, media_type=NDJSON)
     
-    return ChainResponse(
-        agent_id=agent['agent_id'],
-        fingerprint=fingerprint,
-        attestations=records,
-        total=total
-    )
+    key = ("chain", fingerprint, after, offset, limit)
+    cached = response_cache.get(key)
+    if cached:
+        records, next_cursor = cached.body, cached.meta
+    else:
+        with phase("db"):
+            attestations = get_attestation_chain(fingerprint, limit, offset, after_seq=after, raw_findings=True)
+        with phase("serialize"):
+            records = records_json(attestations)
+        next_cursor = attestations[-1]['seq'] if len(attestations) == limit else None
+        if next_cursor is not None:
+            response_cache.put(key, records, immutable=True, meta=next_cursor)
+    with phase("db"):
+        total = get_chain_count(fingerprint)
+    
+    with phase("serialize"):
+        body = chain_body(agent['agent_id'], fingerprint, records, total, next_cursor)
+    return conditional_response(body, make_etag(body), REVALIDATE, if_none_match)
 
 
 @app.get("/v1/agent/{fingerprint}/status", response_model=AgentStatus)
 def get_status(fingerprint: str):
-    """Get agent status and chain health."""
-    agent = get_agent(fingerprint)
+    """Get agent status and chain health (one lookup on agent_heads)."""
+    with phase("db"):
+        agent = get_agent_head(fingerprint)
     if not agent:
         raise HTTPException(status_code=404, detail="Agent not found")
     
-    last = get_last_attestation(fingerprint)
-    chain_length = get_chain_count(fingerprint)
+    chain_length = agent['chain_length']
     
-    if last:
+    if agent['last_seq'] is not None:
         now = int(time.time())
-        last_ts = last['ts']
-        if isinstance(last_ts, str):
-            from datetime import datetime, timezone
-            try:
-                last_ts = int(datetime.fromisoformat(last_ts.replace('Z', '+00:00')).timestamp())
-            except:
-                last_ts = now  # fallback
-        gap_hours = (now - last_ts) / 3600.0
+        gap_hours = (now - agent['last_ts']) / 3600.0
         is_valid = gap_hours < 48  # Chain breaks after 48 hours
     else:
         gap_hours = None
@@ -272,23 +441,42 @@ def get_status(fingerprint: str):
         fingerprint=fingerprint,
         enrolled_at=agent['enrolled_at'],
         chain_length=chain_length,
-        last_ts=last['ts'] if last else None,
+        last_ts=agent['last_ts'],
         gap_hours=gap_hours,
-        latest_result=last['result'] if last else None,
+        latest_result=agent['last_result'],
         is_valid=is_valid
     )
 
 
+def manifest_response(manifest: dict, offset: int = 0) -> ManifestResponse:
+    """ManifestResponse for a stored manifest row (or a page of its entries)."""
+    end = offset + len(manifest['entries'])
+    return ManifestResponse(
+        date=manifest['date'],
+        manifest_cid=manifest['manifest_cid'],
+        merkle_root=manifest['merkle_root'],
+        agent_count=manifest['agent_count'],
+        attestation_count=manifest['attestation_count'],
+        entries=[ManifestEntry(**entry) for entry in manifest['entries']],
+        sealed_at=manifest['sealed_at'],
+        next_offset=end if end < manifest['attestation_count'] else None
+    )
+
+
 @app.post("/v1/manifest/generate", response_model=ManifestResponse)
 def generate_manifest(date: Optional[str] = None):
     """
     Generate daily manifest.
     
-    Collects all attestations for the given date and builds a merkle tree.
+    Days past the seal grace period (CLAWDSURE_SEAL_GRACE, as the
+    scheduler uses) are sealed, and a sealed manifest is returned as stored.
+    For today, or a day still inside its grace period, a provisional
+    manifest is built from the day's incrementally maintained merkle tree.
     If no date provided, uses today (UTC).
     """
+    now = int(time.time())
     if not date:
-        date = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        date = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y-%m-%d")
     
     # Validate date format
     try:
@@ -296,85 +484,134 @@ def generate_manifest(date: Optional[str] = None):
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format (use YYYY-MM-DD)")
     
-    # Get attestations for this date
-    attestations = get_attestations_by_date(date)
+    if date < seal_cutoff(now, seal_grace()):
+        with manifest_build.time("sealed"), phase("db"):
+            manifest = seal_manifest(date, now)
+        response_cache.invalidate_group("manifest", date)
+        if not manifest:
+            raise HTTPException(status_code=404, detail=f"No attestations found for {date}")
+        return manifest_response(manifest)
     
-    if not attestations:
+    build_start = time.perf_counter()
+    
+    # Root and leaves come from the incrementally maintained tree
+    with phase("db"):
+        tree = get_merkle_day(date)
+    
+    if not tree:
         raise HTTPException(status_code=404, detail=f"No attestations found for {date}")
     
     # Build entries
-    entries = [
-        ManifestEntry(
-            fingerprint=att['fingerprint'],
-            seq=att['seq'],
-            result=att['result'],
-            ts=att['ts']
-        )
-        for att in attestations
-    ]
-    
-    # Compute merkle root
-    attestation_dicts = [
-        {
-            "fingerprint": att['fingerprint'],
-            "seq": att['seq'],
-            "result": att['result'],
-            "ts": att['ts']
-        }
-        for att in attestations
-    ]
-    merkle_root = compute_merkle_root(attestation_dicts)
+    entries = [ManifestEntry(**manifest_leaf(att)) for att in tree['entries']]
+    merkle_root = tree['merkle_root']
     
     # Count unique agents
-    unique_agents = len(set(att['fingerprint'] for att in attestations))
+    unique_agents = len(set(entry.fingerprint for entry in entries))
     
-    # Store manifest
-    manifest_cid = f"placeholder_{date}_{merkle_root[:16]}"
+    # Store provisional manifest
+    manifest_cid = placeholder_cid(date, merkle_root)
     generated_at = int(time.time())
     
-    store_manifest(
-        date,
-        merkle_root,
-        manifest_cid,
-        unique_agents,
-        len(attestations),
-        [entry.model_dump() for entry in entries],
-        generated_at
-    )
+    with phase("db"):
+        store_manifest(
+            date,
+            merkle_root,
+            manifest_cid,
+            unique_agents,
+            len(entries),
+            [entry.model_dump() for entry in entries],
+            generated_at
+        )
+    manifest_build.observe(time.perf_counter() - build_start, "provisional")
+    response_cache.invalidate_group("manifest", date)
     
     return ManifestResponse(
         date=date,
         manifest_cid=manifest_cid,
         merkle_root=merkle_root,
         agent_count=unique_agents,
-        attestation_count=len(attestations),
+        attestation_count=len(entries),
         entries=entries
     )
 
 
 @app.get("/v1/manifest/{date}", response_model=ManifestResponse)
-def get_daily_manifest(date: str):
-    """Get manifest for a specific date."""
+def get_daily_manifest(
+    date: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: all entries)"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """
+    Get manifest for a specific date (stored manifests only, no generation).
+    
+    Page with `offset`/`limit`; only the blocks covering the page are
+    decoded. With `Accept: application/x-ndjson` the manifest header line
+    (without entries) is followed by one entry per line.
+    
+    Serialized pages are cached with a strong ETag. Sealed manifests are
+    served from cache as `immutable`; provisional ones are revalidated
+    against the stored manifest's version (merkle root and entry count).
+    """
     # Validate date format
     try:
         datetime.strptime(date, "%Y-%m-%d")
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date format (use YYYY-MM-DD)")
     
-    manifest = get_manifest(date)
-    if not manifest:
-        raise HTTPException(status_code=404, detail=f"No manifest found for {date}")
+    if accept and NDJSON in accept:
+        stream = iter_manifest_entries(date, offset, limit)
+        if not stream:
+            raise HTTPException(status_code=404, detail=f"No manifest found for {date}")
+        manifest, entries = stream
+        lines = itertools.chain(
+            [json.dumps(manifest) + "\n"],
+            (json.dumps(entry) + "\n" for entry in entries)
+        )
+        return StreamingResponse(lines, media_type=NDJSON)
+    
+    key = ("manifest", date, offset, limit)
+    cached = response_cache.get(key)
+    with phase("db"):
+        current = cached is not None and (cached.immutable or cached.meta == get_manifest_version(date))
+    if not current:
+        with phase("db"):
+            manifest = get_manifest_page(date, offset, limit)
+        if not manifest:
+            raise HTTPException(status_code=404, detail=f"No manifest found for {date}")
+        with phase("serialize"):
+            body = manifest_response(manifest, offset).model_dump_json().encode()
+        cached = response_cache.put(
+            key,
+            body,
+            immutable=manifest['sealed_at'] is not None,
+            meta=(manifest['merkle_root'], manifest['attestation_count'], manifest['sealed_at'])
+        )
     
-    entries = [ManifestEntry(**entry) for entry in manifest['entries']]
+    return conditional_response(cached.body, cached.etag, cached.cache_control, if_none_match)
+
+
+@app.get("/v1/manifest/{date}/proof/{fingerprint}/{seq}", response_model=InclusionProofResponse)
+def get_inclusion_proof_for(date: str, fingerprint: str, seq: int):
+    """
+    Merkle inclusion proof for one attestation in a day's tree.
     
-    return ManifestResponse(
-        date=manifest['date'],
-        manifest_cid=manifest['manifest_cid'],
-        merkle_root=manifest['merkle_root'],
-        agent_count=manifest['agent_count'],
-        attestation_count=manifest['attestation_count'],
-        entries=entries
-    )
+    The proof is relative to the day's current tree (tree_size leaves);
+    once the day has closed this is the manifest's root. Verify with
+    merkle.verify_inclusion_proof(entry, proof, merkle_root).
+    """
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format (use YYYY-MM-DD)")
+    
+    with phase("db"):
+        proof = get_inclusion_proof(date, fingerprint, seq)
+    if not proof:
+        raise HTTPException(status_code=404, detail=f"Attestation {fingerprint}/{seq} not found in {date}")
+    
+    return InclusionProofResponse(**proof)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,524 @@
+"""
+ClawdSure API Server - asyncio variant.
+
+Same routes and responses as main.py, but every handler is a coroutine:
+database calls run on db_async's reader/writer threads and signature
+checks are awaited on the verification pool, so an in-flight request
+holds no threadpool worker. A concurrency limiter caps requests in
+progress and answers 503 once the wait for a slot times out.
+
+Run with:
+    uvicorn main_async:app --port 8420
+"""
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import FastAPI, HTTPException, Query, Header, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+import db_async
+from db import close_db, lock_stats, placeholder_cid
+from models import (
+    EnrollRequest, EnrollResponse, AttestationRequest, AttestationResponse,
+    ChainResponse, AgentStatus, ManifestResponse, HealthResponse,
+    ManifestEntry, BatchAttestationRequest, BatchAttestationResponse,
+    BatchItemResult, InclusionProofResponse
+)
+from main import (
+    NDJSON, attestation_payload, chain_body,
+    batch_too_large, conditional_response, manifest_response, metrics_profile, verifier_busy
+)
+from crypto import hash_attestation
+from verifier import get_verifier, shutdown_verifier, BatchTooLarge, VerifierBusy
+from merkle import manifest_leaf
+from scheduler import seal_cutoff, seal_grace, start_scheduler, stop_scheduler
+from cache import REVALIDATE, make_etag, response_cache
+from serialize import record_json, records_json
+from metrics import manifest_build, metrics_middleware, phase, render_metrics
+
+
+# Requests allowed in progress at once, and how long a request may wait
+# for a slot before getting 503
+MAX_CONCURRENCY = int(os.environ.get("CLAWDSURE_MAX_CONCURRENCY", "512"))
+QUEUE_TIMEOUT = float(os.environ.get("CLAWDSURE_QUEUE_TIMEOUT", "5"))
+
+app = FastAPI(
+    title="ClawdSure API",
+    description="Agent attestation and transparency ledger",
+    version="0.1.0"
+)
+
+_limiter: Optional[asyncio.Semaphore] = None
+
+
+@app.on_event("startup")
+async def startup():
+    """Start DB threads, initialize database and the verification pool."""
+    global _limiter
+    _limiter = asyncio.Semaphore(MAX_CONCURRENCY)
+    db_async.configure()
+    await db_async.init_db()
+    get_verifier()
+    start_scheduler()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop manifest sealing, DB threads and verification workers."""
+    stop_scheduler()
+    db_async.close()
+    close_db()
+    shutdown_verifier()
+
+
+@app.middleware("http")
+async def limit_concurrency(request: Request, call_next):
+    """Admit at most MAX_CONCURRENCY requests; queue the rest briefly."""
+    try:
+        await asyncio.wait_for(_limiter.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        return JSONResponse(
+            {"detail": f"Server busy ({MAX_CONCURRENCY} requests in progress)"},
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
+    try:
+        return await call_next(request)
+    finally:
+        _limiter.release()
+
+
+# Registered last so it is outermost and times the limiter queue too
+app.middleware("http")(metrics_middleware)
+
+
+@app.get("/v1/health", response_model=HealthResponse)
+async def health():
+    """Health check endpoint (reads maintained counters, constant time)."""
+    stats = await db_async.get_stats()
+    return HealthResponse(
+        status="ok",
+        version="0.1.0",
+        agents_enrolled=stats["agents_enrolled"],
+        attestations_total=stats["attestations_total"],
+        db=lock_stats()
+    )
+
+
+@app.get("/v1/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics for this server process (see main.metrics)."""
+    return PlainTextResponse(render_metrics(get_verifier().stats()), media_type="text/plain; version=0.0.4")
+
+
+app.get("/v1/metrics/profile/{profile_id}", response_class=PlainTextResponse)(metrics_profile)
+
+
+@app.post("/v1/enroll", response_model=EnrollResponse)
+async def enroll(request: EnrollRequest):
+    """
+    Enroll a new agent.
+    
+    Validates genesis attestation signature and stores agent record.
+    """
+    with phase("db"):
+        existing = await db_async.get_agent(request.fingerprint)
+    if existing:
+        raise HTTPException(status_code=409, detail="Agent already enrolled")
+    
+    attestation_data = attestation_payload(request.genesis_attestation)
+    
+    try:
+        with phase("crypto"):
+            sig_valid = await get_verifier().verify_async(
+                attestation_data,
+                request.genesis_attestation.sig,
+                request.public_key_pem,
+                request.fingerprint
+            )
+    except VerifierBusy as exc:
+        raise verifier_busy(exc)
+    # MVP: warn but don't block (see main.enroll)
+    if not sig_valid:
+        logging.warning(f"Signature verification failed for {request.agent_id} — accepting for MVP")
+    
+    if request.genesis_attestation.seq not in (0, 1):
+        raise HTTPException(status_code=400, detail="Genesis attestation must have seq 0 or 1")
+    if request.genesis_attestation.prev not in ("null", "") and not request.genesis_attestation.prev.startswith("0000"):
+        raise HTTPException(status_code=400, detail="Genesis attestation must have prev=null or starting with 0000")
+    
+    enrolled_at = int(time.time())
+    with phase("db"):
+        success = await db_async.enroll_agent(request.agent_id, request.fingerprint, request.public_key_pem, enrolled_at)
+    
+    if not success:
+        raise HTTPException(status_code=500, detail="Failed to enroll agent")
+    
+    genesis = request.genesis_attestation
+    with phase("crypto"):
+        att_hash = hash_attestation(attestation_data)
+    with phase("db"):
+        await db_async.store_attestation(
+            request.fingerprint,
+            genesis.seq,
+            genesis.prev,
+            genesis.ts,
+            genesis.result,
+            genesis.critical,
+            genesis.warn,
+            genesis.info,
+            genesis.version,
+            genesis.findings,
+            genesis.sig,
+            att_hash,
+            enrolled_at
+        )
+    
+    return EnrollResponse(
+        agent_id=request.agent_id,
+        enrolled_at=enrolled_at,
+        status="active"
+    )
+
+
+@app.post("/v1/attestation", response_model=AttestationResponse)
+async def submit_attestation(request: AttestationRequest):
+    """
+    Submit an attestation.
+    
+    Validates chain integrity and signature, then stores attestation.
+    Agent lookup, sequence check and insert run in one DB transaction.
+    """
+    attestation_data = attestation_payload(request.attestation)
+    with phase("crypto"):
+        att_hash = hash_attestation(attestation_data)
+    received_at = int(time.time())
+    
+    try:
+        reservation = await get_verifier().admit_async()
+    except VerifierBusy as exc:
+        raise verifier_busy(exc)
+    
+    with reservation:
+        with phase("db"):
+            outcome = await db_async.ingest_attestation(
+                request.agent.fingerprint,
+                request.attestation.seq,
+                request.attestation.prev,
+                request.attestation.ts,
+                request.attestation.result,
+                request.attestation.critical,
+                request.attestation.warn,
+                request.attestation.info,
+                request.attestation.version,
+                request.attestation.findings,
+                request.attestation.sig,
+                att_hash,
+                received_at
+            )
+        
+        if outcome['status'] == 'unknown_agent':
+            raise HTTPException(status_code=404, detail="Agent not enrolled")
+        if outcome['status'] == 'stale_seq':
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid sequence: must be > {outcome['last_seq']}, got {request.attestation.seq}"
+            )
+        if outcome['status'] != 'stored':
+            raise HTTPException(status_code=500, detail="Failed to store attestation")
+        
+        if outcome['last_hash'] is not None and request.attestation.prev != outcome['last_hash']:
+            logging.warning(f"Prev hash mismatch for {request.agent.id} seq {request.attestation.seq} — accepting (gap sync)")
+        
+        # Best-effort, after commit (see main.submit_attestation)
+        try:
+            with phase("crypto"):
+                sig_valid = await get_verifier().verify_async(
+                    attestation_data,
+                    request.attestation.sig,
+                    outcome['agent']['public_key_pem'],
+                    request.agent.fingerprint,
+                    reservation=reservation
+                )
+        except VerifierBusy:
+            logging.warning(f"Signature check skipped for {request.agent.id} seq {request.attestation.seq} — verifier busy")
+            sig_valid = None
+        if sig_valid is False:
+            logging.warning(f"Signature verification failed for {request.agent.id} seq {request.attestation.seq} — accepting for MVP")
+        
+        return AttestationResponse(
+            received=True,
+            seq=outcome['head']['seq'],
+            manifest_pending=True,
+            hash=outcome['head']['hash']
+        )
+
+
+@app.post("/v1/attestations:batch", response_model=BatchAttestationResponse)
+async def submit_attestation_batch(request: BatchAttestationRequest):
+    """Submit an ordered batch of attestations for one agent (see main.py)."""
+    try:
+        reservation = await get_verifier().admit_async(len(request.attestations))
+    except BatchTooLarge as exc:
+        raise batch_too_large(exc)
+    except VerifierBusy as exc:
+        raise verifier_busy(exc)
+    
+    with reservation:
+        payloads = [attestation_payload(att) for att in request.attestations]
+        with phase("crypto"):
+            rows = [
+                {**data, "sig": att.sig, "hash": hash_attestation(data)}
+                for data, att in zip(payloads, request.attestations)
+            ]
+        
+        with phase("db"):
+            outcome = await db_async.ingest_attestation_batch(request.agent.fingerprint, rows, int(time.time()))
+        
+        if outcome['status'] == 'unknown_agent':
+            raise HTTPException(status_code=404, detail="Agent not enrolled")
+        if outcome['status'] != 'stored':
+            raise HTTPException(status_code=500, detail="Failed to store attestation batch")
+        
+        stored = [i for i, item in enumerate(outcome['items']) if item['status'] == 'stored']
+        try:
+            with phase("crypto"):
+                sig_results = await get_verifier().verify_many_async(
+                    [(payloads[i], request.attestations[i].sig) for i in stored],
+                    outcome['agent']['public_key_pem'],
+                    request.agent.fingerprint,
+                    reservation=reservation
+                )
+        except VerifierBusy:
+            sig_results = [None] * len(stored)
+        sig_valid = dict(zip(stored, sig_results))
+        
+        results = []
+        for i, item in enumerate(outcome['items']):
+            if item['status'] != 'stored':
+                results.append(BatchItemResult(
+                    seq=item['seq'],
+                    received=False,
+                    error="Invalid sequence: must advance the chain"
+                ))
+                continue
+            if item['prev_mismatch']:
+                logging.warning(f"Prev hash mismatch for {request.agent.id} seq {item['seq']} — accepting (gap sync)")
+            if sig_valid[i] is None:
+                logging.warning(f"Signature check skipped for {request.agent.id} seq {item['seq']} — verifier busy")
+            elif not sig_valid[i]:
+                logging.warning(f"Signature verification failed for {request.agent.id} seq {item['seq']} — accepting for MVP")
+            results.append(BatchItemResult(
+                seq=item['seq'],
+                received=True,
+                prev_mismatch=item['prev_mismatch'],
+                sig_valid=sig_valid[i]
+            ))
+        
+        head = outcome['head']
+        received = len(stored)
+        return BatchAttestationResponse(
+            received=received,
+            rejected=len(results) - received,
+            results=results,
+            head_seq=head['seq'] if head else None,
+            head_hash=head['hash'] if head else None,
+            manifest_pending=received > 0
+        )
+
+
+@app.get("/v1/agent/{fingerprint}/chain", response_model=ChainResponse)
+async def get_chain(
+    fingerprint: str,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    after: Optional[int] = Query(None, description="Keyset cursor: return attestations with seq > after"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get full attestation chain for an agent (see main.get_chain)."""
+    with phase("db"):
+        agent = await db_async.get_agent(fingerprint)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    if accept and NDJSON in accept:
+        async def lines():
+            async for att in db_async.iter_attestation_chain(fingerprint, -1 if after is None else after, raw_findings=True):
+                yield record_json(att) + b"\n"
+        return StreamingResponse(lines(), media_type=NDJSON)
+    
+    key = ("chain", fingerprint, after, offset, limit)
+    cached = response_cache.get(key)
+    if cached:
+        records, next_cursor = cached.body, cached.meta
+        with phase("db"):
+            total = await db_async.get_chain_count(fingerprint)
+    else:
+        with phase("db"):
+            attestations, total = await asyncio.gather(
+                db_async.get_attestation_chain(fingerprint, limit, offset, after_seq=after, raw_findings=True),
+                db_async.get_chain_count(fingerprint)
+            )
+        with phase("serialize"):
+            records = records_json(attestations)
+        next_cursor = attestations[-1]['seq'] if len(attestations) == limit else None
+        if next_cursor is not None:
+            response_cache.put(key, records, immutable=True, meta=next_cursor)
+    
+    with phase("serialize"):
+        body = chain_body(agent['agent_id'], fingerprint, records, total, next_cursor)
+    return conditional_response(body, make_etag(body), REVALIDATE, if_none_match)
+
+
+@app.get("/v1/agent/{fingerprint}/status", response_model=AgentStatus)
+async def get_status(fingerprint: str):
+    """Get agent status and chain health (one lookup on agent_heads)."""
+    with phase("db"):
+        agent = await db_async.get_agent_head(fingerprint)
+    if not agent:
+        raise HTTPException(status_code=404, detail="Agent not found")
+    
+    chain_length = agent['chain_length']
+    
+    if agent['last_seq'] is not None:
+        gap_hours = (int(time.time()) - agent['last_ts']) / 3600.0
+        is_valid = gap_hours < 48  # Chain breaks after 48 hours
+    else:
+        gap_hours = None
+        is_valid = chain_length == 0
+    
+    return AgentStatus(
+        agent_id=agent['agent_id'],
+        fingerprint=fingerprint,
+        enrolled_at=agent['enrolled_at'],
+        chain_length=chain_length,
+        last_ts=agent['last_ts'],
+        gap_hours=gap_hours,
+        latest_result=agent['last_result'],
+        is_valid=is_valid
+    )
+
+
+def parse_date(date: str):
+    """400 unless date is YYYY-MM-DD."""
+    try:
+        datetime.strptime(date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format (use YYYY-MM-DD)")
+
+
+@app.post("/v1/manifest/generate", response_model=ManifestResponse)
+async def generate_manifest(date: Optional[str] = None):
+    """Seal a day past its grace period or build a provisional manifest (see main.py)."""
+    now = int(time.time())
+    if not date:
+        date = datetime.fromtimestamp(now, tz=timezone.utc).strftime("%Y-%m-%d")
+    parse_date(date)
+    
+    if date < seal_cutoff(now, seal_grace()):
+        with manifest_build.time("sealed"), phase("db"):
+            manifest = await db_async.seal_manifest(date, now)
+        response_cache.invalidate_group("manifest", date)
+        if not manifest:
+            raise HTTPException(status_code=404, detail=f"No attestations found for {date}")
+        return manifest_response(manifest)
+    
+    build_start = time.perf_counter()
+    with phase("db"):
+        tree = await db_async.get_merkle_day(date)
+    if not tree:
+        raise HTTPException(status_code=404, detail=f"No attestations found for {date}")
+    
+    entries = [ManifestEntry(**manifest_leaf(att)) for att in tree['entries']]
+    merkle_root = tree['merkle_root']
+    unique_agents = len(set(entry.fingerprint for entry in entries))
+    manifest_cid = placeholder_cid(date, merkle_root)
+    
+    with phase("db"):
+        await db_async.store_manifest(
+            date,
+            merkle_root,
+            manifest_cid,
+            unique_agents,
+            len(entries),
+            [entry.model_dump() for entry in entries],
+            int(time.time())
+        )
+    manifest_build.observe(time.perf_counter() - build_start, "provisional")
+    response_cache.invalidate_group("manifest", date)
+    
+    return ManifestResponse(
+        date=date,
+        manifest_cid=manifest_cid,
+        merkle_root=merkle_root,
+        agent_count=unique_agents,
+        attestation_count=len(entries),
+        entries=entries
+    )
+
+
+@app.get("/v1/manifest/{date}", response_model=ManifestResponse)
+async def get_daily_manifest(
+    date: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: all entries)"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get manifest for a specific date, paged or as NDJSON, cached with ETags (see main.py)."""
+    parse_date(date)
+    
+    if accept and NDJSON in accept:
+        stream = await db_async.iter_manifest_entries(date, offset, limit)
+        if not stream:
+            raise HTTPException(status_code=404, detail=f"No manifest found for {date}")
+        manifest, entries = stream
+        lines = itertools.chain(
+            [json.dumps(manifest) + "\n"],
+            (json.dumps(entry) + "\n" for entry in entries)
+        )
+        return StreamingResponse(lines, media_type=NDJSON)
+    
+    key = ("manifest", date, offset, limit)
+    cached = response_cache.get(key)
+    with phase("db"):
+        current = cached is not None and (cached.immutable or cached.meta == await db_async.get_manifest_version(date))
+    if not current:
+        with phase("db"):
+            manifest = await db_async.get_manifest_page(date, offset, limit)
+        if not manifest:
+            raise HTTPException(status_code=404, detail=f"No manifest found for {date}")
+        with phase("serialize"):
+            body = manifest_response(manifest, offset).model_dump_json().encode()
+        cached = response_cache.put(
+            key,
+            body,
+            immutable=manifest['sealed_at'] is not None,
+            meta=(manifest['merkle_root'], manifest['attestation_count'], manifest['sealed_at'])
+        )
+    
+    return conditional_response(cached.body, cached.etag, cached.cache_control, if_none_match)
+
+
+@app.get("/v1/manifest/{date}/proof/{fingerprint}/{seq}", response_model=InclusionProofResponse)
+async def get_inclusion_proof_for(date: str, fingerprint: str, seq: int):
+    """Merkle inclusion proof for one attestation in a day's tree."""
+    parse_date(date)
+    
+    with phase("db"):
+        proof = await db_async.get_inclusion_proof(date, fingerprint, seq)
+    if not proof:
+        raise HTTPException(status_code=404, detail=f"Attestation {fingerprint}/{seq} not found in {date}")
+    
+    return InclusionProofResponse(**proof)
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8420)
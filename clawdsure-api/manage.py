@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+ClawdSure maintenance commands.
+
+Usage:
+    python manage.py rebuild-heads [--fingerprint FP ...]
+    python manage.py migrate-ts
+    python manage.py pack-manifests
+    python manage.py audit [--full] [--workers N] [--report audit.json] [--watch SECONDS]
+    python manage.py shards init --count N [--import] [--dir DIR]
+    python manage.py shards split INDEX | prune | status [--dir DIR]
+"""
+
+import argparse
+import json
+import os
+import time
+
+import db
+
+
+def cmd_rebuild_heads(args):
+    """Recompute agent_heads and global_counters from attestations."""
+    db.init_db()
+    count = db.rebuild_agent_heads(args.fingerprint or None)
+    stats = db.get_stats()
+    print(f"Rebuilt {count} agent heads "
+          f"({stats['agents_enrolled']} agents, {stats['attestations_total']} attestations)")
+
+
+def cmd_migrate_ts(args):
+    """Normalize timestamps of rows stored before ts_epoch/day existed."""
+    migrated = db.init_db()
+    print(f"Normalized {migrated} attestation timestamps")
+
+
+def cmd_pack_manifests(args):
+    """Rewrite legacy JSON manifest entries in the packed binary layout."""
+    db.init_db()
+    counts = db.pack_manifests()
+    print(f"Packed {counts['packed']} manifests ({counts['skipped']} with non-epoch ts left as JSON)")
+
+
+def cmd_audit(args):
+    """Verify hashes, prev links and signatures of attestations not audited yet."""
+    from audit import ChainAuditor
+
+    db.init_db()
+    auditor = ChainAuditor(workers=args.workers, mode=args.mode)
+    full = args.full
+    while True:
+        report = auditor.run(full=full)
+        full = False
+        print(f"Audited {report['rows_audited']} attestations from {report['agents_audited']} agents "
+              f"in {report['elapsed_s']}s ({report['rows_per_s']} rows/s): "
+              f"{len(report['new_findings'])} new findings, open {report['open_findings'] or 'none'}")
+        for finding in report['new_findings']:
+            print(f"  {finding['fingerprint']} seq {finding['seq']}: {finding['kind']} ({finding['detail']})")
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(report, f, indent=2)
+        if not args.watch:
+            break
+        time.sleep(args.watch)
+
+
+def cmd_shards(args):
+    """Create, split, prune or list the shards in --dir (server stopped for all but status)."""
+    import shards
+
+    if not args.dir:
+        raise SystemExit("shards: pass --dir or set CLAWDSURE_SHARD_DIR")
+    if args.action == "init":
+        if args.import_db:
+            created = shards.import_db(args.dir, db.DB_PATH, args.count)
+            print(f"Imported {db.DB_PATH} into {len(created)} shards")
+        else:
+            created = shards.init_shards(args.dir, args.count)
+            print(f"Created {len(created)} empty shards")
+    elif args.action == "split":
+        if args.index is None:
+            raise SystemExit("shards split: which shard? (see shards status)")
+        new_shard = shards.split_shard(args.dir, args.index)
+        print(f"Split shard {args.index}: keys from {new_shard['lo']:#018x} moved to {new_shard['path']}")
+    elif args.action == "prune":
+        for path, removed in shards.prune_shards(args.dir).items():
+            print(f"{path}: removed {removed} stray agents")
+    if args.action in ("init", "split", "status"):
+        shard_set = shards.ShardSet(args.dir)
+        try:
+            for shard in shard_set.status():
+                print(f"{shard['index']:3d} {shard['path']:<16} {shard['lo']:#018x}-{shard['hi'] - 1:#018x} "
+                      f"{shard['key_share']:6.1%} {shard['agents_enrolled']:8d} agents "
+                      f"{shard['attestations_total']:10d} attestations {shard['bytes'] / 1e6:9.1f} MB")
+        finally:
+            shard_set.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ClawdSure maintenance commands")
+    parser.add_argument("--db", help="Database path (default: data/clawdsure.db)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = sub.add_parser("rebuild-heads", help="Backfill/rebuild agent_heads and global counters")
+    rebuild.add_argument("--fingerprint", action="append", help="Only rebuild this agent (repeatable)")
+    rebuild.set_defaults(func=cmd_rebuild_heads)
+
+    migrate = sub.add_parser("migrate-ts", help="Fill ts_epoch/day for existing attestations")
+    migrate.set_defaults(func=cmd_migrate_ts)
+
+    pack = sub.add_parser("pack-manifests", help="Convert JSON manifest entries to the packed layout")
+    pack.set_defaults(func=cmd_pack_manifests)
+
+    audit = sub.add_parser("audit", help="Verify chains incrementally (hashes, prev links, signatures)")
+    audit.add_argument("--full", action="store_true", help="Forget checkpoints and findings; audit every row")
+    audit.add_argument("--workers", type=int, help="Pool size (default: CPU count, 0 = inline)")
+    audit.add_argument("--mode", choices=["process", "thread"], default="process")
+    audit.add_argument("--report", help="Write the JSON report to this file")
+    audit.add_argument("--watch", type=float, help="Keep running, auditing new rows every N seconds")
+    audit.set_defaults(func=cmd_audit)
+
+    shard = sub.add_parser("shards", help="Manage fingerprint-sharded storage")
+    shard.add_argument("action", choices=["init", "split", "prune", "status"])
+    shard.add_argument("index", type=int, nargs="?", help="Shard to split")
+    shard.add_argument("--dir", default=os.environ.get("CLAWDSURE_SHARD_DIR"),
+                       help="Shard directory (default: CLAWDSURE_SHARD_DIR)")
+    shard.add_argument("--count", type=int, default=4, help="Shards to create (init)")
+    shard.add_argument("--import", dest="import_db", action="store_true",
+                       help="init: shard the existing --db database instead of starting empty")
+    shard.set_defaults(func=cmd_shards)
+
+    args = parser.parse_args()
+    if args.db:
+        db.configure_db(args.db)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
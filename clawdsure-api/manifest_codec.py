@@ -0,0 +1,186 @@
+"""
+Packed binary encoding for manifest entries.
+
+Layout (little-endian):
+
+    header   magic "CSM1", flags u8, 3 pad bytes, count u32, block_size u32,
+             block count u32, dictionary length u32
+    index    (offset u32, length u32) per block, relative to the body
+    body     dictionary, then blocks
+
+The dictionary lists each distinct fingerprint and result once; entries
+refer to them by id. A block holds up to block_size entries as columns:
+fingerprint id u32[k], seq i64[k], result id u8[k], ts i64[k] (21 bytes
+per entry). With FLAG_ZSTD the dictionary and every block are compressed
+independently, so a page of entries only decodes the blocks it covers.
+"""
+import struct
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # optional: manifests are then stored uncompressed
+    zstandard = None
+
+
+MAGIC = b"CSM1"
+FLAG_ZSTD = 1
+HEADER = struct.Struct("<4sB3xIIII")
+INDEX_ENTRY = struct.Struct("<II")
+BLOCK_SIZE = 1024
+ZSTD_LEVEL = 3
+
+
+def is_packed(value: Any) -> bool:
+    """True for a packed manifest blob (legacy manifests are JSON text)."""
+    return isinstance(value, (bytes, memoryview)) and bytes(value[:4]) == MAGIC
+
+
+def _pack_strings(values: List[str]) -> bytes:
+    parts = [struct.pack("<I", len(values))]
+    for value in values:
+        raw = value.encode()
+        if len(raw) > 0xFFFF:
+            raise ValueError(f"String of {len(raw)} bytes is too long for a packed manifest")
+        parts.append(struct.pack("<H", len(raw)))
+        parts.append(raw)
+    return b"".join(parts)
+
+
+def _unpack_strings(data: bytes, pos: int):
+    (count,) = struct.unpack_from("<I", data, pos)
+    pos += 4
+    values = []
+    for _ in range(count):
+        (size,) = struct.unpack_from("<H", data, pos)
+        pos += 2
+        values.append(data[pos:pos + size].decode())
+        pos += size
+    return values, pos
+
+
+def encode_entries(
+    entries: List[Dict[str, Any]],
+    compress: Optional[bool] = None,
+    block_size: int = BLOCK_SIZE
+) -> bytes:
+    """
+    Pack manifest entries (fingerprint, seq, result, ts).
+
+    Args:
+        entries: Entries in leaf order; ts must be a unix epoch int
+        compress: zstd-compress the body (default: when zstandard is installed)
+        block_size: Entries per independently decodable block
+
+    Raises:
+        ValueError: for a non-integer ts, more than 256 distinct results, or
+            a fingerprint or result longer than 65535 bytes; such days stay
+            JSON (see db.manifest_entries_column)
+    """
+    if compress is None:
+        compress = zstandard is not None
+    if compress and zstandard is None:
+        raise RuntimeError("zstd compression requires the zstandard package")
+    compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL) if compress else None
+
+    fingerprints: Dict[str, int] = {}
+    results: Dict[str, int] = {}
+    fp_ids, seqs, result_ids, timestamps = [], [], [], []
+    for entry in entries:
+        if not isinstance(entry['ts'], int):
+            raise ValueError(f"Packed manifests need unix ts, got {entry['ts']!r}")
+        fp_ids.append(fingerprints.setdefault(entry['fingerprint'], len(fingerprints)))
+        result_ids.append(results.setdefault(entry['result'], len(results)))
+        seqs.append(entry['seq'])
+        timestamps.append(entry['ts'])
+    if len(results) > 256:
+        raise ValueError("Too many distinct results for a packed manifest")
+
+    sections = [_pack_strings(list(fingerprints)) + _pack_strings(list(results))]
+    for start in range(0, len(entries), block_size):
+        end = min(start + block_size, len(entries))
+        k = end - start
+        sections.append(
+            struct.pack(f"<{k}I", *fp_ids[start:end])
+            + struct.pack(f"<{k}q", *seqs[start:end])
+            + struct.pack(f"<{k}B", *result_ids[start:end])
+            + struct.pack(f"<{k}q", *timestamps[start:end])
+        )
+    if compressor is not None:
+        sections = [compressor.compress(section) for section in sections]
+
+    dictionary, blocks = sections[0], sections[1:]
+    index, offset = [], len(dictionary)
+    for block in blocks:
+        index.append(INDEX_ENTRY.pack(offset, len(block)))
+        offset += len(block)
+    header = HEADER.pack(
+        MAGIC, FLAG_ZSTD if compressor else 0, len(entries), block_size, len(blocks), len(dictionary)
+    )
+    return b"".join([header, *index, dictionary, *blocks])
+
+
+class PackedManifest:
+    """
+    Read access to a packed manifest without decoding all of it.
+
+    Parsing reads only the header, block index and dictionary; entries()
+    decodes just the blocks a page touches.
+    """
+
+    def __init__(self, blob: bytes):
+        magic, flags, self.count, self.block_size, blocks, dict_len = HEADER.unpack_from(blob, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a packed manifest")
+        self._blob = memoryview(blob)
+        self._decompressor = None
+        if flags & FLAG_ZSTD:
+            if zstandard is None:
+                raise RuntimeError("Manifest is zstd-compressed; install the zstandard package")
+            self._decompressor = zstandard.ZstdDecompressor()
+        self._index = [
+            INDEX_ENTRY.unpack_from(blob, HEADER.size + i * INDEX_ENTRY.size) for i in range(blocks)
+        ]
+        self._body = HEADER.size + blocks * INDEX_ENTRY.size
+        dictionary = self._section(0, dict_len)
+        self.fingerprints, pos = _unpack_strings(dictionary, 0)
+        self.results, _ = _unpack_strings(dictionary, pos)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _section(self, offset: int, length: int) -> bytes:
+        raw = self._blob[self._body + offset:self._body + offset + length]
+        if self._decompressor is not None:
+            return self._decompressor.decompress(raw)
+        return bytes(raw)
+
+    def _block(self, number: int) -> List[Dict[str, Any]]:
+        data = self._section(*self._index[number])
+        k = min(self.block_size, self.count - number * self.block_size)
+        fp_ids = struct.unpack_from(f"<{k}I", data, 0)
+        seqs = struct.unpack_from(f"<{k}q", data, 4 * k)
+        result_ids = struct.unpack_from(f"<{k}B", data, 12 * k)
+        timestamps = struct.unpack_from(f"<{k}q", data, 13 * k)
+        fingerprints, results = self.fingerprints, self.results
+        return [
+            {"fingerprint": fingerprints[f], "seq": s, "result": results[r], "ts": t}
+            for f, s, r, t in zip(fp_ids, seqs, result_ids, timestamps)
+        ]
+
+    def entries(self, offset: int = 0, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield entries [offset, offset + limit) in leaf order, one block at a time."""
+        end = self.count if limit is None else min(self.count, offset + limit)
+        position = offset
+        while position < end:
+            number = position // self.block_size
+            block = self._block(number)
+            start = position - number * self.block_size
+            stop = min(len(block), end - number * self.block_size)
+            yield from block[start:stop]
+            position = number * self.block_size + stop
+
+
+def decode_entries(blob: bytes) -> List[Dict[str, Any]]:
+    """All entries of a packed manifest."""
+    return list(PackedManifest(blob).entries())
@@ -1,7 +1,34 @@
 """Simple binary merkle tree implementation."""
 import hashlib
 import json
-from typing import List
+from typing import Callable, List, Tuple
+
+
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+
+def manifest_leaf(attestation: dict) -> dict:
+    """Fields of an attestation that go into a manifest leaf."""
+    return {
+        "fingerprint": attestation['fingerprint'],
+        "seq": attestation['seq'],
+        "result": attestation['result'],
+        "ts": attestation['ts']
+    }
+
+
+def leaf_digest(attestation: dict) -> bytes:
+    """
+    Compute SHA-256 digest of attestation (canonical JSON).
+    
+    Args:
+        attestation: Attestation dict
+    
+    Returns:
+        Raw 32-byte digest
+    """
+    canonical_json = json.dumps(attestation, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical_json.encode()).digest()
 
 
 def compute_leaf_hash(attestation: dict) -> str:
@@ -14,29 +41,30 @@ def compute_leaf_hash(attestation: dict) -> str:
     Returns:
         Hex-encoded hash
     """
-    canonical_json = json.dumps(attestation, sort_keys=True, separators=(',', ':'))
-    return hashlib.sha256(canonical_json.encode()).hexdigest()
+    return leaf_digest(attestation).hex()
 
 
-def hash_pair(left: str, right: str) -> str:
+def hash_pair(left: bytes, right: bytes) -> bytes:
     """
     Hash two nodes together.
     
     Args:
-        left: Left node hash (hex)
-        right: Right node hash (hex)
+        left: Left node digest (raw bytes)
+        right: Right node digest (raw bytes)
     
     Returns:
-        Combined hash (hex)
+        Combined digest (raw bytes)
     """
-    combined = left + right
-    return hashlib.sha256(combined.encode()).hexdigest()
+    return hashlib.sha256(left + right).digest()
 
 
 def build_merkle_tree(leaves: List[str]) -> str:
     """
     Build a binary merkle tree from leaf hashes.
     
+    Built bottom-up one level at a time. If a level has an odd number of
+    nodes, the last one is paired with itself.
+    
     Args:
         leaves: List of hex-encoded leaf hashes
     
@@ -44,23 +72,138 @@ def build_merkle_tree(leaves: List[str]) -> str:
         Root hash (hex)
     """
     if not leaves:
-        return hashlib.sha256(b"").hexdigest()
+        return EMPTY_ROOT.hex()
+    
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        if len(level) % 2 == 1:
+            level.append(level[-1])
+        level = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level), 2)]
+    return level[0].hex()
+
+
+def tree_levels(leaves: List[bytes]) -> List[List[bytes]]:
+    """
+    Every level of the tree build_merkle_tree would build, leaves first.
+    
+    For serving inclusion paths from memory: pass
+    `lambda level, idx: levels[level][idx]` as inclusion_path's get_node.
+    
+    Args:
+        leaves: Leaf digests (raw bytes)
+    
+    Returns:
+        Levels from leaves to root; [[EMPTY_ROOT]] for no leaves
+    """
+    if not leaves:
+        return [[EMPTY_ROOT]]
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        padded = level + [level[-1]] if len(level) % 2 == 1 else level
+        levels.append([hash_pair(padded[i], padded[i + 1]) for i in range(0, len(padded), 2)])
+    return levels
+
+
+def append_leaf(
+    leaf: bytes,
+    index: int,
+    get_node: Callable[[int, int], bytes]
+) -> List[Tuple[int, int, bytes]]:
+    """
+    Compute the nodes that change when a leaf is appended to a tree.
     
-    if len(leaves) == 1:
-        return leaves[0]
+    The tree follows build_merkle_tree: the new leaf at `index` becomes the
+    last leaf, and only its ancestors change, so appending touches one node
+    per level (O(log n)). At each level the node is the rightmost one, so
+    its only possible sibling is on the left.
     
-    # If odd number of leaves, duplicate the last one
-    if len(leaves) % 2 == 1:
-        leaves = leaves + [leaves[-1]]
+    Args:
+        leaf: Leaf digest (raw bytes)
+        index: Position of the new leaf (current leaf count)
+        get_node: Callback (level, idx) -> stored digest, used for left siblings
     
-    # Build next level
-    next_level = []
-    for i in range(0, len(leaves), 2):
-        parent_hash = hash_pair(leaves[i], leaves[i + 1])
-        next_level.append(parent_hash)
+    Returns:
+        (level, idx, digest) for every node to write, leaf first, root last
+    """
+    updates = [(0, index, leaf)]
+    node, idx, level = leaf, index, 0
+    width = index + 1
+    while width > 1:
+        if idx % 2 == 1:
+            node = hash_pair(get_node(level, idx - 1), node)
+        else:
+            node = hash_pair(node, node)
+        idx //= 2
+        level += 1
+        width = (width + 1) // 2
+        updates.append((level, idx, node))
+    return updates
+
+
+def inclusion_path(
+    index: int,
+    width: int,
+    get_node: Callable[[int, int], bytes]
+) -> List[Tuple[bytes, bool]]:
+    """
+    Audit path for the leaf at `index` in a tree of `width` leaves.
+    
+    Reads one sibling per level from stored nodes, so the path has
+    ceil(log2(width)) steps. Where a node has no right sibling it was paired
+    with itself, and the node itself is returned as the sibling.
     
-    # Recurse
-    return build_merkle_tree(next_level)
+    Args:
+        index: Leaf position
+        width: Number of leaves in the tree
+        get_node: Callback (level, idx) -> stored digest
+    
+    Returns:
+        (sibling digest, sibling_is_left) pairs from leaf level to root
+    """
+    path = []
+    idx, level = index, 0
+    while width > 1:
+        if idx % 2 == 1:
+            path.append((get_node(level, idx - 1), True))
+        elif idx + 1 < width:
+            path.append((get_node(level, idx + 1), False))
+        else:
+            path.append((get_node(level, idx), False))
+        idx //= 2
+        level += 1
+        width = (width + 1) // 2
+    return path
+
+
+def verify_inclusion_proof(entry: dict, proof: List[dict], merkle_root: str) -> bool:
+    """
+    Check that a manifest entry is included under a merkle root.
+    
+    Client-side counterpart of GET /v1/manifest/{date}/proof/{fingerprint}/{seq};
+    needs only hashlib and json.
+    
+    Args:
+        entry: Manifest entry with fingerprint, seq, result, ts
+        proof: Steps as returned by the API: {"hash": hex, "position": "left"|"right"}
+        merkle_root: Expected root (hex)
+    
+    Returns:
+        True if hashing the entry up the path reproduces the root
+    """
+    try:
+        node = leaf_digest(manifest_leaf(entry))
+        for step in proof:
+            sibling = bytes.fromhex(step['hash'])
+            if step['position'] == 'left':
+                node = hash_pair(sibling, node)
+            elif step['position'] == 'right':
+                node = hash_pair(node, sibling)
+            else:
+                return False
+        return node.hex() == merkle_root
+    except (KeyError, TypeError, ValueError):
+        return False
 
 
 def compute_merkle_root(attestations: List[dict]) -> str:
@@ -0,0 +1,292 @@
+"""
+Request metrics and opt-in profiling for ClawdSure.
+
+metrics_middleware times every request into per-route latency histograms
+and splits it into phases: handlers wrap their database, signature and
+serialization work in `with phase(...)`, and whatever is left (validation,
+FastAPI's response_model encoding, middleware) is counted as "other".
+render_metrics() writes these, plus the process's existing counters
+(signature outcomes, SQLite lock waits, caches, verifier queue), in the
+Prometheus text exposition format for GET /v1/metrics.
+
+With CLAWDSURE_PROFILING=1 a request carrying `X-ClawdSure-Profile: 1` is
+sampled by SamplingProfiler while it runs. The response gets a
+Server-Timing header with its phase breakdown and an
+X-ClawdSure-Profile-Id whose collapsed stacks (flamegraph.pl format) are
+kept in memory for GET /v1/metrics/profile/{id}.
+"""
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from cache import response_cache
+from crypto import public_key_cache_stats, signature_stats
+from db import lock_stats
+
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROFILE_HEADER = "X-ClawdSure-Profile"
+PROFILING = os.environ.get("CLAWDSURE_PROFILING", "0").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL = float(os.environ.get("CLAWDSURE_PROFILE_INTERVAL_MS", "1")) / 1000
+MAX_PROFILES = 32
+
+# crypto outcome -> reported outcome
+SIGNATURE_OUTCOMES = {
+    "canonical_valid": "canonical",
+    "fallback_valid": "fallback",
+    "canonical_invalid": "failed",
+    "fallback_invalid": "failed",
+    "bad_key": "failed",
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics)."""
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...], buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the with-block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        for labels, values in series:
+            pairs = list(zip(self.labels, labels))
+            for bound, count in zip(self.buckets, values):
+                lines.append(f"{self.name}_bucket{_labels(pairs, le=f'{bound:g}')} {count}")
+            lines.append(f"{self.name}_bucket{_labels(pairs, le='+Inf')} {values[-2]}")
+            lines.append(f"{self.name}_count{_labels(pairs)} {values[-2]}")
+            lines.append(f"{self.name}_sum{_labels(pairs)} {values[-1]:.6f}")
+        return lines
+
+
+def _labels(pairs: Iterable[Tuple[str, str]], **extra: str) -> str:
+    items = [*pairs, *extra.items()]
+    if not items:
+        return ""
+    return "{" + ",".join(
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"') + '"' for name, value in items
+    ) + "}"
+
+
+def _metric(name: str, kind: str, help: str, samples: Iterable[Tuple[dict, float]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{_labels(labels.items())} {value:g}" for labels, value in samples)
+    return lines
+
+
+request_latency = Histogram(
+    "clawdsure_request_duration_seconds", "Request latency by route, method and status.",
+    ("route", "method", "status")
+)
+phase_latency = Histogram(
+    "clawdsure_request_phase_seconds", "Time per request spent in db, crypto, serialize and other work.",
+    ("route", "phase")
+)
+manifest_build = Histogram(
+    "clawdsure_manifest_build_seconds", "Manifest build duration (provisional or sealed).",
+    ("kind",)
+)
+
+
+class RequestTimer:
+    """Phase durations accumulated by one request."""
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+
+_current: ContextVar[Optional[RequestTimer]] = ContextVar("clawdsure_request_timer", default=None)
+
+
+@contextmanager
+def phase(name: str):
+    """Attribute the with-block's wall time to a phase of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timer = _current.get()
+        if timer is not None:
+            timer.add(name, time.perf_counter() - start)
+
+
+# Leaf frames of threads that are parked, not working
+_IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("thread.py", "_worker"),
+}
+
+
+class SamplingProfiler:
+    """
+    Samples the Python stacks of every other thread at a fixed interval.
+
+    Stacks are process-wide, so concurrent requests show up in each
+    other's profiles; profile on a quiet server or a reproduction.
+    Parked threads (lock waits, idle pool workers, the event loop's
+    select) are skipped.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            code = frame.f_code
+            if ident == me or (os.path.basename(code.co_filename), code.co_name) in _IDLE_FRAMES:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return collapsed stacks, most frequent first."""
+        self._stop.set()
+        self._thread.join()
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+_profiles: "OrderedDict[str, str]" = OrderedDict()
+_profiles_lock = threading.Lock()
+
+
+def get_profile(profile_id: str) -> Optional[str]:
+    """Collapsed stacks of a recent profiled request, if still kept."""
+    with _profiles_lock:
+        return _profiles.get(profile_id)
+
+
+def _keep_profile(stacks: str) -> str:
+    profile_id = uuid.uuid4().hex[:16]
+    with _profiles_lock:
+        _profiles[profile_id] = stacks
+        while len(_profiles) > MAX_PROFILES:
+            _profiles.popitem(last=False)
+    return profile_id
+
+
+async def metrics_middleware(request, call_next):
+    """Time the request, record per-phase durations, and profile it if asked."""
+    timer = RequestTimer()
+    token = _current.set(timer)
+    profiler = None
+    if PROFILING and request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        profiler = SamplingProfiler()
+        profiler.start()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        _current.reset(token)
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        request_latency.observe(elapsed, path, request.method, str(status))
+        for name, seconds in timer.phases.items():
+            phase_latency.observe(seconds, path, name)
+        other = max(0.0, elapsed - sum(timer.phases.values()))
+        phase_latency.observe(other, path, "other")
+        stacks = profiler.stop() if profiler else None
+
+    if profiler:
+        timings = [*timer.phases.items(), ("other", other), ("total", elapsed)]
+        response.headers["Server-Timing"] = ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in timings)
+        response.headers["X-ClawdSure-Profile-Id"] = _keep_profile(stacks)
+    return response
+
+
+def render_metrics(verifier_stats: Optional[dict] = None) -> str:
+    """
+    All metrics in the Prometheus text format.
+
+    Reads in-process counters only (no database queries), so scraping is
+    cheap; counters are per server process.
+    """
+    lines = request_latency.render() + phase_latency.render() + manifest_build.render()
+
+    outcomes = dict.fromkeys(("canonical", "fallback", "failed"), 0)
+    for outcome, count in signature_stats().items():
+        outcomes[SIGNATURE_OUTCOMES[outcome]] += count
+    lines += _metric(
+        "clawdsure_signature_verifications_total", "counter",
+        "Signature checks: valid via canonical mode, valid via legacy fallback, or failed.",
+        (({"outcome": outcome}, count) for outcome, count in outcomes.items())
+    )
+
+    locks = lock_stats()
+    lines += _metric("clawdsure_db_write_transactions_total", "counter",
+                     "SQLite write transactions started.", [({}, locks["write_transactions"])])
+    lines += _metric("clawdsure_db_lock_waits_total", "counter",
+                     "Write transactions that waited for the SQLite write lock.", [({}, locks["lock_waits"])])
+    lines += _metric("clawdsure_db_lock_wait_seconds_total", "counter",
+                     "Time spent waiting for the SQLite write lock.", [({}, locks["lock_wait_ms"] / 1000)])
+    lines += _metric("clawdsure_db_lock_timeouts_total", "counter",
+                     "Write transactions that gave up on a locked database.", [({}, locks["lock_timeouts"])])
+
+    for name, stats in (("response_cache", response_cache.stats()), ("public_key_cache", public_key_cache_stats())):
+        lines += _metric(f"clawdsure_{name}_hits_total", "counter", f"{name} hits.", [({}, stats["hits"])])
+        lines += _metric(f"clawdsure_{name}_misses_total", "counter", f"{name} misses.", [({}, stats["misses"])])
+        lines += _metric(f"clawdsure_{name}_evictions_total", "counter", f"{name} evictions.", [({}, stats["evictions"])])
+
+    if verifier_stats:
+        lines += _metric("clawdsure_verifier_queue_depth", "gauge",
+                         "Verification jobs queued or running.", [({}, verifier_stats["queue_depth"])])
+        lines += _metric("clawdsure_verifier_rejected_total", "counter",
+                         "Requests refused because the verification queue was full.", [({}, verifier_stats["rejected"])])
+    return "\n".join(lines) + "\n"
@@ -1,6 +1,6 @@
 """Pydantic models for ClawdSure API."""
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any, Union
+from typing import Optional, List, Any, Union, Dict
 
 
 class AgentInfo(BaseModel):
@@ -57,6 +57,32 @@ class AttestationResponse(BaseModel):
     received: bool
     seq: int
     manifest_pending: bool
+    hash: Optional[str] = None  # new chain head hash
+
+
+class BatchAttestationRequest(BaseModel):
+    """POST /v1/attestations:batch payload — ordered attestations for one agent."""
+    agent: AgentInfo
+    attestations: List[AttestationData] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchItemResult(BaseModel):
+    """Per-attestation outcome in a batch submission."""
+    seq: int
+    received: bool
+    error: Optional[str] = None
+    prev_mismatch: bool = False
+    sig_valid: Optional[bool] = None
+
+
+class BatchAttestationResponse(BaseModel):
+    """POST /v1/attestations:batch response."""
+    received: int
+    rejected: int
+    results: List[BatchItemResult]
+    head_seq: Optional[int] = None
+    head_hash: Optional[str] = None
+    manifest_pending: bool
 
 
 class AttestationRecord(BaseModel):
@@ -80,6 +106,7 @@ class ChainResponse(BaseModel):
     fingerprint: str
     attestations: List[AttestationRecord]
     total: int
+    next_cursor: Optional[int] = None  # pass as ?after= for the next page
 
 
 class AgentStatus(BaseModel):
@@ -110,6 +137,25 @@ class ManifestResponse(BaseModel):
     agent_count: int
     attestation_count: int
     entries: List[ManifestEntry]
+    sealed_at: Optional[int] = None  # None while the day is still open
+    next_offset: Optional[int] = None  # pass as ?offset= for the next page
+
+
+class MerkleProofStep(BaseModel):
+    """One sibling on a merkle audit path."""
+    hash: str
+    position: str  # "left" or "right" of the running hash
+
+
+class InclusionProofResponse(BaseModel):
+    """GET /v1/manifest/{date}/proof/{fingerprint}/{seq} response."""
+    date: str
+    entry: ManifestEntry
+    leaf_index: int
+    leaf_hash: str
+    tree_size: int
+    merkle_root: str
+    proof: List[MerkleProofStep]
 
 
 class HealthResponse(BaseModel):
@@ -118,3 +164,4 @@ class HealthResponse(BaseModel):
     version: str
     agents_enrolled: int
     attestations_total: int
+    db: Optional[Dict[str, Any]] = None  # write-lock counters for this server process
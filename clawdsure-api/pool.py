@@ -0,0 +1,113 @@
+"""Per-thread SQLite connection pool for ClawdSure."""
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+# Applied to every new connection. WAL lets readers run while a writer
+# commits, and synchronous=NORMAL only risks the last commits on power loss
+# (never corruption) in WAL mode.
+DEFAULT_PRAGMAS: Dict[str, Any] = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,       # KiB, ~16 MB page cache per connection
+    "mmap_size": 268435456,     # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+}
+
+# Compiled statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+
+class ConnectionPool:
+    """
+    Hands out one long-lived connection per thread.
+
+    FastAPI runs sync handlers on a fixed worker threadpool, so keeping a
+    connection per thread avoids reconnecting on every query while never
+    sharing a connection between threads. Nested checkouts on the same
+    thread reuse the connection; only the outermost checkout rolls back a
+    transaction that was left open.
+
+    With persistent=False every checkout opens and closes its own
+    connection, which is the pre-pool behaviour (used by bench_db.py).
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        pragmas: Optional[Dict[str, Any]] = None,
+        persistent: bool = True,
+        cached_statements: int = STATEMENT_CACHE_SIZE
+    ):
+        self.path = Path(path)
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.persistent = persistent
+        self.cached_statements = cached_statements
+        self.connections_opened = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open: List[sqlite3.Connection] = []
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a new connection and apply pragmas."""
+        # check_same_thread=False only so close_all() may run from another
+        # thread; each connection is still used by a single thread.
+        conn = sqlite3.connect(
+            self.path,
+            cached_statements=self.cached_statements,
+            check_same_thread=False
+        )
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        with self._lock:
+            self.connections_opened += 1
+            if self.persistent:
+                self._open.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Check out this thread's connection."""
+        local = self._local
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            local.conn = conn
+            local.depth = 0
+        local.depth += 1
+        try:
+            yield conn
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                if conn.in_transaction:
+                    conn.rollback()
+                if not self.persistent:
+                    conn.close()
+                    local.conn = None
+
+    def close_all(self):
+        """Close every pooled connection (e.g. on shutdown)."""
+        with self._lock:
+            conns, self._open = self._open, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        # Threads holding a closed connection reconnect on next checkout
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool counters for diagnostics."""
+        with self._lock:
+            return {
+                "path": str(self.path),
+                "persistent": self.persistent,
+                "open_connections": len(self._open),
+                "connections_opened": self.connections_opened,
+            }
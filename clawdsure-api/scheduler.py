@@ -0,0 +1,108 @@
+"""Background manifest sealing for ClawdSure."""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from cache import response_cache
+from db import get_unsealed_days, seal_manifest
+from metrics import manifest_build
+
+
+def seal_grace() -> int:
+    """CLAWDSURE_SEAL_GRACE: seconds after midnight UTC to wait for stragglers."""
+    return int(os.environ.get("CLAWDSURE_SEAL_GRACE", "900"))
+
+
+def seal_cutoff(now: int, grace: int) -> str:
+    """First day (YYYY-MM-DD) that may not be sealed yet: earlier days ended `grace` seconds ago."""
+    return datetime.fromtimestamp(now - grace, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class ManifestScheduler:
+    """
+    Seals each UTC day once it has closed.
+
+    A daemon thread wakes every `interval` seconds and seals every day that
+    ended at least `grace` seconds ago and has no sealed manifest yet. Each
+    day's merkle tree is already maintained as attestations arrive, so
+    sealing is one index-only read plus one insert, never a rehash; it also
+    catches up on days missed while the server was down.
+
+    Sealing is idempotent, so several server processes may run a scheduler
+    against the same database.
+    """
+
+    def __init__(self, interval: float = 60.0, grace: int = 900):
+        self.interval = interval
+        self.grace = grace
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def seal_closed_days(self, now: Optional[int] = None) -> List[str]:
+        """Seal every closed day that is not sealed yet. Returns the days sealed."""
+        now = int(time.time()) if now is None else now
+        sealed = []
+        for day in get_unsealed_days(seal_cutoff(now, self.grace)):
+            start = time.perf_counter()
+            manifest = seal_manifest(day, now)
+            manifest_build.observe(time.perf_counter() - start, "sealed")
+            response_cache.invalidate_group("manifest", day)
+            if manifest:
+                sealed.append(day)
+                logging.info(
+                    f"Sealed manifest {day}: {manifest['attestation_count']} attestations, "
+                    f"root {manifest['merkle_root'][:16]} ({time.perf_counter() - start:.3f}s)"
+                )
+        return sealed
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.seal_closed_days()
+            except Exception:
+                logging.exception("Manifest sealing failed; retrying next interval")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the sealing thread (no-op if running)."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="manifest-sealer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the sealing thread, waiting for a seal in progress."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+
+_scheduler: Optional[ManifestScheduler] = None
+
+
+def start_scheduler() -> Optional[ManifestScheduler]:
+    """
+    Start the shared scheduler from env: CLAWDSURE_SEAL_INTERVAL (seconds,
+    0 disables) and CLAWDSURE_SEAL_GRACE (seconds after midnight UTC to wait
+    for stragglers).
+    """
+    global _scheduler
+    interval = float(os.environ.get("CLAWDSURE_SEAL_INTERVAL", "60"))
+    if interval <= 0:
+        return None
+    if _scheduler is None:
+        _scheduler = ManifestScheduler(interval, seal_grace())
+        _scheduler.start()
+    return _scheduler
+
+
+def stop_scheduler():
+    """Stop the shared scheduler, if running."""
+    global _scheduler
+    if _scheduler is not None:
+        _scheduler.stop()
+        _scheduler = None
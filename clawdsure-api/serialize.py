@@ -0,0 +1,71 @@
+"""
+Fast JSON serialization for chain reads.
+
+Chain rows come straight from SQLite (db.get_attestation_chain with
+raw_findings=True) and are written as AttestationRecord JSON without
+building Pydantic models. `findings` is already JSON text in the database,
+so it is spliced in as-is instead of being parsed and re-encoded.
+
+Uses orjson (>= 3.9, for orjson.Fragment) when installed, otherwise a
+fixed template over the stdlib's C string encoder.
+"""
+import json
+from typing import Iterable, Mapping
+
+try:
+    import orjson
+    if not hasattr(orjson, "Fragment"):
+        orjson = None
+except ImportError:  # optional: falls back to the stdlib template below
+    orjson = None
+
+
+_encode_str = json.encoder.encode_basestring
+
+_RECORD_TEMPLATE = (
+    '{"seq":%d,"prev":%s,"ts":%s,"result":%s,"critical":%d,"warn":%d,"info":%d,'
+    '"version":%s,"findings":%s,"sig":%s,"hash":%s}'
+)
+
+
+def _value(value) -> str:
+    """ts may be a unix int or an ISO string."""
+    return _encode_str(value) if isinstance(value, str) else str(int(value))
+
+
+def _orjson_record(row: Mapping) -> dict:
+    return {
+        "seq": row['seq'],
+        "prev": row['prev'],
+        "ts": row['ts'],
+        "result": row['result'],
+        "critical": row['critical'],
+        "warn": row['warn'],
+        "info": row['info'],
+        "version": row['version'],
+        "findings": orjson.Fragment(row['findings']),
+        "sig": row['sig'],
+        "hash": row['hash'],
+    }
+
+
+def _stdlib_record(row: Mapping) -> str:
+    return _RECORD_TEMPLATE % (
+        row['seq'], _encode_str(row['prev']), _value(row['ts']), _encode_str(row['result']),
+        row['critical'], row['warn'], row['info'], _encode_str(row['version']),
+        row['findings'], _encode_str(row['sig']), _encode_str(row['hash'])
+    )
+
+
+def record_json(row: Mapping) -> bytes:
+    """One AttestationRecord as JSON."""
+    if orjson is not None:
+        return orjson.dumps(_orjson_record(row))
+    return _stdlib_record(row).encode()
+
+
+def records_json(rows: Iterable[Mapping]) -> bytes:
+    """JSON array of AttestationRecord objects."""
+    if orjson is not None:
+        return orjson.dumps([_orjson_record(row) for row in rows])
+    return ("[" + ",".join(_stdlib_record(row) for row in rows) + "]").encode()
@@ -0,0 +1,517 @@
+"""
+Fingerprint-sharded storage for ClawdSure.
+
+With CLAWDSURE_SHARD_DIR set, agents are spread over several SQLite files
+so writes for different agents no longer queue on one database lock. An
+agent's shard is picked by the first 8 bytes of sha256(fingerprint); each
+shard owns a contiguous range [lo, hi) of that 64-bit key space. The map
+lives in shards.json in the shard directory:
+
+    {"shards": [{"path": "shard-000.db", "lo": 0, "hi": 9223372036854775808}, ...]}
+
+Every shard has the full schema. Per-agent queries run on the agent's
+shard (db._per_agent); day-wide and global queries are answered by
+ShardSet, which merges the shards' results. DB_PATH keeps only the
+manifests, so sealed manifests stay where they were.
+
+A sharded day's merkle tree is built over the day's leaves from every
+shard sorted by (ts, fingerprint, seq) (leaf_order), so roots and proofs
+don't depend on how agents are spread, and anyone can rebuild the root
+from a manifest's entries. New attestations carry the latest ts, so the
+merged tree (MergedDay) grows at its right edge and is updated
+incrementally rather than rebuilt. Each shard still records the seal (an
+empty manifest where it had no attestations) so late arrivals are rerouted
+as before.
+
+Shards are split offline (manage.py shards split, server stopped): the
+upper half of a shard's key range is copied to a new file, the map is
+replaced atomically, then the moved agents are pruned from the old file.
+Pruning is repeatable, so an interrupted split is finished with
+manage.py shards prune.
+"""
+import bisect
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import db
+from merkle import EMPTY_ROOT, hash_pair, inclusion_path, leaf_digest, manifest_leaf, tree_levels
+from pool import ConnectionPool
+
+
+MAP_FILE = "shards.json"
+KEY_SPACE = 1 << 64
+MERGED_DAYS_CACHED = 4
+
+# Tables holding per-agent rows; merkle trees and counters are rebuilt after a move
+AGENT_TABLES = ("agents", "attestations", "agent_heads", "audit_checkpoints", "audit_findings")
+
+
+def shard_key(fingerprint: str) -> int:
+    """Position of an agent in the 64-bit shard key space."""
+    return int.from_bytes(hashlib.sha256(fingerprint.encode()).digest()[:8], "big")
+
+
+def leaf_order(entry: Dict[str, Any]) -> tuple:
+    """Sort key of a leaf in a sharded day's tree."""
+    return (entry["ts"], entry["fingerprint"], entry["seq"])
+
+
+class MergedDay:
+    """
+    One day's tree over every shard's leaves, in leaf_order, kept in memory.
+
+    add() inserts leaves the shards appended since the last look and
+    rehashes only nodes right of the first insertion point: a leaf with
+    the day's latest ts costs O(log n), like the shards' own trees. A
+    backdated leaf (catch-up sync, late arrival rerouted from a sealed
+    day) rehashes the k leaves after it, O(k + log n).
+    """
+
+    def __init__(self, shard_count: int):
+        self.counts = [0] * shard_count  # leaves read from each shard
+        self.keys: List[tuple] = []
+        self.entries: List[Dict[str, Any]] = []
+        self.levels: List[List[bytes]] = [[]]
+        self._ts: Dict[tuple, int] = {}  # (fingerprint, seq) -> ts, to find a leaf's key
+
+    @property
+    def root(self) -> bytes:
+        return self.levels[-1][0] if self.entries else EMPTY_ROOT
+
+    def index_of(self, fingerprint: str, seq: int) -> Optional[int]:
+        ts = self._ts.get((fingerprint, seq))
+        if ts is None:
+            return None
+        return bisect.bisect_left(self.keys, (ts, fingerprint, seq))
+
+    def add(self, entries: List[Dict[str, Any]]):
+        if not entries:
+            return
+        first = len(self.keys)
+        for entry in sorted(entries, key=leaf_order):
+            key = leaf_order(entry)
+            i = bisect.bisect_left(self.keys, key)
+            self.keys.insert(i, key)
+            self.entries.insert(i, entry)
+            self.levels[0].insert(i, leaf_digest(manifest_leaf(entry)))
+            self._ts[(entry["fingerprint"], entry["seq"])] = entry["ts"]
+            first = min(first, i)
+        self._rehash(first)
+
+    def _rehash(self, start: int):
+        """Recompute every node covering leaves from `start` on (same shape as tree_levels)."""
+        levels, level = self.levels, 0
+        while len(levels[level]) > 1:
+            nodes = levels[level]
+            start -= start % 2
+            if level + 1 == len(levels):
+                levels.append([])
+            parents = levels[level + 1]
+            del parents[start // 2:]
+            for i in range(start, len(nodes), 2):
+                parents.append(hash_pair(nodes[i], nodes[i + 1] if i + 1 < len(nodes) else nodes[i]))
+            start //= 2
+            level += 1
+        del levels[level + 1:]
+
+
+def load_map(directory: Path) -> List[Dict[str, Any]]:
+    """Shard entries (path, lo, hi) in key order."""
+    path = Path(directory) / MAP_FILE
+    if not path.exists():
+        raise FileNotFoundError(f"{path} not found (create it with: python manage.py shards init)")
+    with open(path) as f:
+        shards = json.load(f)["shards"]
+    if not shards or shards[0]["lo"] != 0 or shards[-1]["hi"] != KEY_SPACE or any(
+        a["hi"] != b["lo"] for a, b in zip(shards, shards[1:])
+    ):
+        raise ValueError(f"{path}: shard ranges must cover the key space without gaps")
+    return shards
+
+
+def save_map(directory: Path, shards: List[Dict[str, Any]]):
+    """Replace shards.json atomically; this is the commit point of a split."""
+    path = Path(directory) / MAP_FILE
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"shards": shards}, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class ShardSet:
+    """One connection pool per shard, plus the merge layer for queries spanning agents."""
+
+    def __init__(self, directory: Path, **pool_options):
+        self.directory = Path(directory)
+        self.shards = load_map(self.directory)
+        self.pools = [ConnectionPool(self.directory / shard["path"], **pool_options) for shard in self.shards]
+        self._starts = [shard["lo"] for shard in self.shards]
+        self._merged: "OrderedDict[str, MergedDay]" = OrderedDict()
+        self._merged_lock = threading.Lock()
+
+    def index_for(self, fingerprint: str) -> int:
+        return bisect.bisect_right(self._starts, shard_key(fingerprint)) - 1
+
+    def pool_for(self, fingerprint: str) -> ConnectionPool:
+        return self.pools[self.index_for(fingerprint)]
+
+    def close(self):
+        for pool in self.pools:
+            pool.close_all()
+
+    def _each(self, fn, *args, **kwargs) -> list:
+        """fn's result on every shard, in shard order."""
+        results = []
+        for pool in self.pools:
+            with db.bind_pool(pool):
+                results.append(fn(*args, **kwargs))
+        return results
+
+    def _by_shard(self, items, fingerprint) -> Dict[int, list]:
+        groups: Dict[int, list] = {}
+        for item in items:
+            groups.setdefault(self.index_for(fingerprint(item)), []).append(item)
+        return groups
+
+    def init_db(self) -> int:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return sum(self._each(db.init_db))
+
+    def rebuild_agent_heads(self, fingerprints: Optional[List[str]] = None) -> int:
+        if fingerprints is None:
+            return sum(self._each(db.rebuild_agent_heads))
+        count = 0
+        for index, group in self._by_shard(fingerprints, lambda fp: fp).items():
+            with db.bind_pool(self.pools[index]):
+                count += db.rebuild_agent_heads(group)
+        return count
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = self._each(db.get_stats)
+        return {key: sum(shard[key] for shard in stats) for key in ("agents_enrolled", "attestations_total")}
+
+    def get_attestations_by_date(self, date: str) -> List[Dict[str, Any]]:
+        rows = [row for shard in self._each(db.get_attestations_by_date, date) for row in shard]
+        rows.sort(key=lambda row: row['ts_epoch'])
+        return rows
+
+    def _merged_day(self, date: str, read):
+        """
+        read(MergedDay) for a day across shards, None if no shard has the day.
+
+        Only leaves the shards appended since the last call are read and
+        merged in. A few days are kept; read runs under the lock, so it
+        sees a consistent tree.
+        """
+        counts = [(root or {}).get("leaf_count", 0) for root in self._each(db.get_merkle_root, date)]
+        if not any(counts):
+            return None
+        with self._merged_lock:
+            day = self._merged.get(date)
+            if day is None or any(count < seen for count, seen in zip(counts, day.counts)):
+                # First look, or a shard's tree was rebuilt: start over
+                day = MergedDay(len(self.pools))
+            self._merged[date] = day
+            self._merged.move_to_end(date)
+            while len(self._merged) > MERGED_DAYS_CACHED:
+                self._merged.popitem(last=False)
+
+            new = []
+            for index, (count, seen) in enumerate(zip(counts, day.counts)):
+                if count > seen:
+                    with db.bind_pool(self.pools[index]):
+                        leaves = db.get_merkle_leaves(date, seen)
+                    day.counts[index] = seen + len(leaves)
+                    new.extend(leaves)
+            day.add(new)
+            return read(day)
+
+    def get_merkle_day(self, date: str) -> Optional[Dict[str, Any]]:
+        return self._merged_day(date, lambda day: {
+            "date": date, "merkle_root": day.root.hex(), "leaf_count": len(day.entries),
+            "entries": list(day.entries)
+        })
+
+    def get_merkle_root(self, date: str) -> Optional[Dict[str, Any]]:
+        return self._merged_day(date, lambda day: {
+            "date": date, "leaf_count": len(day.entries), "merkle_root": day.root.hex()
+        })
+
+    def get_inclusion_proof(self, date: str, fingerprint: str, seq: int) -> Optional[Dict[str, Any]]:
+        def proof(day: MergedDay) -> Optional[Dict[str, Any]]:
+            leaf_index = day.index_of(fingerprint, seq)
+            if leaf_index is None:
+                return None
+            levels = day.levels
+            path = inclusion_path(leaf_index, len(day.entries), lambda level, idx: levels[level][idx])
+            return {
+                "date": date,
+                "entry": manifest_leaf(day.entries[leaf_index]),
+                "leaf_index": leaf_index,
+                "leaf_hash": levels[0][leaf_index].hex(),
+                "tree_size": len(day.entries),
+                "merkle_root": day.root.hex(),
+                "proof": [
+                    {"hash": sibling.hex(), "position": "left" if is_left else "right"}
+                    for sibling, is_left in path
+                ]
+            }
+
+        return self._merged_day(date, proof)
+
+    def seal_manifest(self, date: str, sealed_at: int) -> Optional[Dict[str, Any]]:
+        """
+        Seal the day on every shard, then store the merged manifest in DB_PATH.
+
+        Each shard freezes its own tree under its write lock; the merged
+        manifest is built from the frozen trees, so it is final even if
+        sealing stops halfway and is retried.
+        """
+        version = db.get_manifest_version(date)
+        if version is not None and version[2] is not None:
+            return db.get_manifest(date)
+        if self._merged_day(date, lambda day: day) is None:
+            return None
+        sealed = self._each(db.seal_manifest, date, sealed_at, empty_ok=True)
+        entries = sorted(
+            (manifest_leaf(entry) for manifest in sealed for entry in manifest["entries"]),
+            key=leaf_order
+        )
+        root = tree_levels([leaf_digest(entry) for entry in entries])[-1][0].hex()
+        db.store_manifest(
+            date, root, db.placeholder_cid(date, root), len({entry["fingerprint"] for entry in entries}),
+            len(entries), entries, sealed_at, sealed_at=sealed_at
+        )
+        return db.get_manifest(date)
+
+    def get_unsealed_days(self, before: str) -> List[str]:
+        # A day counts as sealed once the merged manifest is stored, not when each shard is
+        days = set()
+        for pool in self.pools:
+            with db.bind_pool(pool), db.get_db() as conn:
+                days.update(row[0] for row in conn.execute("SELECT day FROM merkle_trees WHERE day < ?", (before,)))
+        with db.get_db() as conn:
+            days.difference_update(row[0] for row in conn.execute(
+                "SELECT date FROM manifests WHERE sealed_at IS NOT NULL AND date < ?", (before,)
+            ))
+        return sorted(days)
+
+    def get_audit_targets(self) -> List[Dict[str, Any]]:
+        targets = [target for shard in self._each(db.get_audit_targets) for target in shard]
+        targets.sort(key=lambda target: target['fingerprint'])
+        return targets
+
+    def save_audit_progress(self, checkpoints: List[tuple], findings: List[Dict[str, Any]], audited_at: int):
+        checkpoints_by_shard = self._by_shard(checkpoints, lambda checkpoint: checkpoint[0])
+        findings_by_shard = self._by_shard(findings, lambda finding: finding['fingerprint'])
+        for index in sorted(set(checkpoints_by_shard) | set(findings_by_shard)):
+            with db.bind_pool(self.pools[index]):
+                db.save_audit_progress(
+                    checkpoints_by_shard.get(index, []), findings_by_shard.get(index, []), audited_at
+                )
+
+    def get_audit_findings(self) -> List[Dict[str, Any]]:
+        findings = [finding for shard in self._each(db.get_audit_findings) for finding in shard]
+        findings.sort(key=lambda finding: (finding['fingerprint'], finding['seq'], finding['kind']))
+        return findings
+
+    def reset_audit(self):
+        self._each(db.reset_audit)
+
+    def status(self) -> List[Dict[str, Any]]:
+        """Per-shard key range, counts and file size."""
+        return [
+            {
+                "index": index,
+                "path": shard["path"],
+                "lo": shard["lo"],
+                "hi": shard["hi"],
+                "key_share": (shard["hi"] - shard["lo"]) / KEY_SPACE,
+                **stats,
+                "bytes": os.path.getsize(self.directory / shard["path"]),
+            }
+            for index, (shard, stats) in enumerate(zip(self.shards, self._each(db.get_stats)))
+        ]
+
+
+def _shard_path(shards: List[Dict[str, Any]]) -> str:
+    taken = {shard["path"] for shard in shards}
+    number = len(shards)
+    while f"shard-{number:03d}.db" in taken:
+        number += 1
+    return f"shard-{number:03d}.db"
+
+
+def _init_file(path: Path):
+    pool = ConnectionPool(path)
+    try:
+        with db.bind_pool(pool):
+            db.init_db()
+    finally:
+        pool.close_all()
+
+
+def _rebuild_derived(conn: sqlite3.Connection):
+    """Merkle trees, agent heads and counters of a shard whose agents changed."""
+    cursor = conn.cursor()
+    db._reset_merkle(cursor)
+    conn.commit()
+    db._backfill_merkle(conn)
+    db._rebuild_heads(conn)
+    conn.commit()
+
+
+def init_shards(directory: Path, count: int) -> List[Dict[str, Any]]:
+    """Create `count` empty shards with equal key ranges."""
+    directory = Path(directory)
+    if (directory / MAP_FILE).exists():
+        raise FileExistsError(f"{directory / MAP_FILE} already exists")
+    directory.mkdir(parents=True, exist_ok=True)
+    bounds = [KEY_SPACE * i // count for i in range(count + 1)]
+    shards = [{"path": f"shard-{i:03d}.db", "lo": bounds[i], "hi": bounds[i + 1]} for i in range(count)]
+    for shard in shards:
+        _init_file(directory / shard["path"])
+    save_map(directory, shards)
+    return shards
+
+
+def import_db(directory: Path, source: Path, count: int) -> List[Dict[str, Any]]:
+    """
+    Shard an existing database: copy it into one shard, then split the
+    widest shard until there are `count`.
+
+    The source is left as it is; pointed at by CLAWDSURE_DB_PATH it keeps
+    serving the manifests.
+    """
+    directory = Path(directory)
+    if (directory / MAP_FILE).exists():
+        raise FileExistsError(f"{directory / MAP_FILE} already exists")
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / "shard-000.db"
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(target)
+    try:
+        src.backup(dst)
+    finally:
+        dst.close()
+        src.close()
+    _init_file(target)
+    save_map(directory, [{"path": target.name, "lo": 0, "hi": KEY_SPACE}])
+    while len(load_map(directory)) < count:
+        shards = load_map(directory)
+        widest = max(range(len(shards)), key=lambda i: shards[i]["hi"] - shards[i]["lo"])
+        split_shard(directory, widest)
+    return load_map(directory)
+
+
+def _copy_rows(conn: sqlite3.Connection, table: str):
+    """Copy the moving agents' rows of `table` from main to the attached target."""
+    columns = ", ".join(row[1] for row in conn.execute(f"PRAGMA target.table_info({table})"))
+    conn.execute(
+        f"""INSERT OR REPLACE INTO target.{table} ({columns})
+            SELECT {columns} FROM main.{table} WHERE fingerprint IN (SELECT fingerprint FROM temp.moving)"""
+    )
+
+
+def split_shard(directory: Path, index: int) -> Dict[str, Any]:
+    """
+    Move the upper half of a shard's key range to a new shard file.
+
+    Run with the server stopped. Rows are copied (attestation ids kept),
+    the new file's trees and counters are rebuilt, the map is saved, and
+    only then is the old shard pruned.
+
+    Returns:
+        The new shard's map entry
+    """
+    directory = Path(directory)
+    shards = load_map(directory)
+    shard = shards[index]
+    if shard["hi"] - shard["lo"] < 2:
+        raise ValueError(f"Shard {index} cannot be split further")
+    mid = (shard["lo"] + shard["hi"]) // 2
+    new_shard = {"path": _shard_path(shards), "lo": mid, "hi": shard["hi"]}
+    target = directory / new_shard["path"]
+    if target.exists():
+        raise FileExistsError(f"{target} exists but is not in {MAP_FILE}")
+    _init_file(target)
+
+    conn = sqlite3.connect(directory / shard["path"])
+    try:
+        conn.execute("ATTACH DATABASE ? AS target", (str(target),))
+        fingerprints = {row[0] for row in conn.execute(
+            "SELECT fingerprint FROM agents UNION SELECT DISTINCT fingerprint FROM attestations"
+        )}
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("CREATE TEMP TABLE moving (fingerprint TEXT PRIMARY KEY)")
+        conn.executemany(
+            "INSERT INTO temp.moving (fingerprint) VALUES (?)",
+            [(fp,) for fp in fingerprints if shard_key(fp) >= mid]
+        )
+        for table in AGENT_TABLES:
+            _copy_rows(conn, table)
+        # Seal markers, so late arrivals keep being rerouted on the new shard
+        columns = ", ".join(row[1] for row in conn.execute("PRAGMA target.table_info(manifests)"))
+        conn.execute(
+            f"INSERT OR IGNORE INTO target.manifests ({columns}) SELECT {columns} FROM main.manifests "
+            "WHERE sealed_at IS NOT NULL"
+        )
+        conn.commit()
+        conn.execute("DETACH DATABASE target")
+    finally:
+        conn.close()
+
+    conn = sqlite3.connect(target)
+    conn.row_factory = sqlite3.Row
+    try:
+        _rebuild_derived(conn)
+    finally:
+        conn.close()
+
+    shard["hi"] = mid
+    shards.insert(index + 1, new_shard)
+    save_map(directory, shards)
+    prune_shard(directory, index)
+    return new_shard
+
+
+def prune_shard(directory: Path, index: int) -> int:
+    """
+    Delete rows of agents outside a shard's key range (left behind by a split).
+
+    Returns:
+        Number of agents removed
+    """
+    directory = Path(directory)
+    shard = load_map(directory)[index]
+    conn = sqlite3.connect(directory / shard["path"])
+    conn.row_factory = sqlite3.Row
+    try:
+        fingerprints = {row[0] for row in conn.execute(
+            "SELECT fingerprint FROM agents UNION SELECT DISTINCT fingerprint FROM attestations"
+        )}
+        stray = [(fp,) for fp in fingerprints if not shard["lo"] <= shard_key(fp) < shard["hi"]]
+        if not stray:
+            return 0
+        conn.execute("BEGIN IMMEDIATE")
+        for table in AGENT_TABLES:
+            conn.executemany(f"DELETE FROM {table} WHERE fingerprint = ?", stray)
+        conn.commit()
+        _rebuild_derived(conn)
+        return len(stray)
+    finally:
+        conn.close()
+
+
+def prune_shards(directory: Path) -> Dict[str, int]:
+    """prune_shard on every shard; finishes an interrupted split."""
+    shards = load_map(directory)
+    return {shard["path"]: prune_shard(directory, index) for index, shard in enumerate(shards)}
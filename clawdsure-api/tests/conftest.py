@@ -0,0 +1,18 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import db
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    """db pointed at an empty database for the test."""
+    original = db.DB_PATH
+    db.configure_db(tmp_path / "clawdsure.db")
+    db.init_db()
+    yield db
+    db.configure_db(original)
@@ -0,0 +1,79 @@
+"""Manifest storage: packed layout, and the JSON fallback for days it can't hold."""
+from datetime import datetime, timezone
+
+from manifest_codec import is_packed
+
+DAY = "2026-03-02"
+TS = int(datetime(2026, 3, 2, 12, tzinfo=timezone.utc).timestamp())
+
+
+def _attest(db, fingerprint, result, seq=1):
+    db.enroll_agent(f"agent-{fingerprint}", fingerprint, "pem", TS)
+    assert db.store_attestation(fingerprint, seq, "0" * 64, TS, result, 0, 0, 0, "1", [], "sig",
+                                f"{fingerprint}-{seq}".ljust(64, "0"), TS)
+
+
+def _stored_entries(db, date):
+    with db.get_db() as conn:
+        return conn.execute("SELECT entries FROM manifests WHERE date = ?", (date,)).fetchone()[0]
+
+
+def test_seal_packs_entries(fresh_db):
+    for i in range(10):
+        _attest(fresh_db, f"fp{i:04d}", "PASS" if i % 2 else "FAIL")
+    manifest = fresh_db.seal_manifest(DAY, TS + 86400)
+    assert manifest['attestation_count'] == 10
+    assert is_packed(_stored_entries(fresh_db, DAY))
+
+
+def test_seal_falls_back_to_json_past_256_results(fresh_db):
+    for i in range(300):
+        _attest(fresh_db, f"fp{i:04d}", f"result-{i}")
+    manifest = fresh_db.seal_manifest(DAY, TS + 86400)
+    assert manifest is not None and manifest['sealed_at'] == TS + 86400
+    assert {entry['result'] for entry in manifest['entries']} == {f"result-{i}" for i in range(300)}
+    assert isinstance(_stored_entries(fresh_db, DAY), str)
+
+    page = fresh_db.get_manifest_page(DAY, offset=250, limit=20)
+    assert [entry['seq'] for entry in page['entries']] == [1] * 20
+    assert fresh_db.get_manifest(DAY)['merkle_root'] == manifest['merkle_root']
+
+
+def test_store_manifest_falls_back_to_json(fresh_db):
+    entries = [{"fingerprint": f"fp{i}", "seq": 1, "result": f"r{i}", "ts": TS} for i in range(257)]
+    assert fresh_db.store_manifest(DAY, "00" * 32, "cid", 257, 257, entries, TS)
+    assert fresh_db.get_manifest(DAY)['entries'] == entries
+
+    long_fp = [{"fingerprint": "f" * 70000, "seq": 1, "result": "PASS", "ts": TS}]
+    assert fresh_db.store_manifest("2026-03-03", "00" * 32, "cid", 1, 1, long_fp, TS)
+    assert fresh_db.get_manifest("2026-03-03")['entries'] == long_fp
+
+
+def test_generate_waits_for_the_seal_grace_period(fresh_db, monkeypatch):
+    import main
+
+    _attest(fresh_db, "fp0001", "PASS")
+    midnight = int(datetime(2026, 3, 3, tzinfo=timezone.utc).timestamp())
+    monkeypatch.setenv("CLAWDSURE_SEAL_GRACE", "900")
+
+    monkeypatch.setattr(main.time, "time", lambda: midnight + 60)
+    assert main.generate_manifest(DAY).sealed_at is None
+    assert fresh_db.get_manifest(DAY)['sealed_at'] is None
+
+    monkeypatch.setattr(main.time, "time", lambda: midnight + 900)
+    assert main.generate_manifest(DAY).sealed_at == midnight + 900
+
+
+def test_provisional_cache_follows_content_within_a_second(fresh_db):
+    import main
+
+    entries = [{"fingerprint": "fp1", "seq": 1, "result": "PASS", "ts": TS}]
+    fresh_db.store_manifest(DAY, "11" * 32, "cid", 1, 1, entries, TS)
+    first = main.get_daily_manifest(DAY, offset=0, limit=None, accept=None, if_none_match=None)
+
+    # Regenerated in the same second with another leaf
+    entries.append({"fingerprint": "fp2", "seq": 1, "result": "PASS", "ts": TS})
+    fresh_db.store_manifest(DAY, "22" * 32, "cid", 2, 2, entries, TS)
+    second = main.get_daily_manifest(DAY, offset=0, limit=None, accept=None, if_none_match=first.headers["etag"])
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
@@ -0,0 +1,68 @@
+"""Shard merge layer: the merged day tree stays equal to a full rebuild as it grows."""
+import random
+
+import pytest
+
+import db
+from merkle import leaf_digest, manifest_leaf, tree_levels, verify_inclusion_proof
+from shards import MergedDay, init_shards, leaf_order
+
+TS = 1772452800  # 2026-03-02 12:00 UTC
+DAY = "2026-03-02"
+
+
+def _full_levels(entries):
+    return tree_levels([leaf_digest(manifest_leaf(entry)) for entry in sorted(entries, key=leaf_order)])
+
+
+def test_merged_day_matches_rebuild():
+    rng = random.Random(7)
+    day, entries = MergedDay(1), []
+    for step in range(60):
+        # Mostly new leaves at the right edge, sometimes backdated ones
+        ts = TS + step * 10 if rng.random() < 0.8 else TS + rng.randrange(step * 10 + 1)
+        batch = [{"fingerprint": f"fp{step}-{i}", "seq": 1, "result": "PASS", "ts": ts} for i in range(rng.randrange(1, 4))]
+        entries += batch
+        day.add(batch)
+        assert day.levels == _full_levels(entries)
+
+
+@pytest.fixture
+def sharded(tmp_path):
+    original = db.DB_PATH
+    db.configure_db(tmp_path / "manifests.db")
+    db.init_db()
+    init_shards(tmp_path / "shards", 3)
+    shards = db.configure_shards(tmp_path / "shards")
+    shards.init_db()
+    yield shards
+    db.configure_shards(None)
+    db.configure_db(original)
+
+
+def _attest(fingerprint, seq, ts):
+    assert db.store_attestation(fingerprint, seq, "0" * 64, ts, "PASS", 0, 0, 0, "1", [], "sig",
+                                f"{fingerprint}-{seq}".ljust(64, "0"), ts)
+
+
+def test_sharded_root_and_proofs_follow_writes(sharded):
+    agents = [f"agent{i:02d}" for i in range(12)]
+    for agent in agents:
+        db.enroll_agent(agent, agent, "pem", TS)
+    written = []
+    for seq in range(1, 4):
+        for i, agent in enumerate(agents):
+            ts = TS + seq * 100 + i if (seq, i) != (3, 5) else TS  # one backdated leaf
+            _attest(agent, seq, ts)
+            written.append({"fingerprint": agent, "seq": seq, "result": "PASS", "ts": ts})
+            root = db.get_merkle_root(DAY)
+            assert root["leaf_count"] == len(written)
+            assert root["merkle_root"] == _full_levels(written)[-1][0].hex()
+
+    for entry in written:
+        proof = db.get_inclusion_proof(DAY, entry["fingerprint"], entry["seq"])
+        assert verify_inclusion_proof(proof["entry"], proof["proof"], root["merkle_root"])
+
+    manifest = db.seal_manifest(DAY, TS + 86400)
+    assert manifest["merkle_root"] == root["merkle_root"]
+    assert manifest["entries"] == sorted(written, key=leaf_order)
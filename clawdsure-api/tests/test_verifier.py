@@ -0,0 +1,99 @@
+"""Verifier admission: slots reserved before commit are held until the verify runs."""
+import asyncio
+import time
+
+import pytest
+
+from bench_async import attestation, signed
+from crypto import invalidate_public_key, public_key_cache_stats, signature_stats, verify_attestation_signature
+from test_client import generate_key_pair
+from verifier import CHUNK_SIZE, BatchTooLarge, VerificationService, VerifierBusy
+
+
+def _signed(private_key, seq):
+    data = attestation(seq, "0" * 64)
+    return data, signed({"key": private_key}, data)["sig"]
+
+
+@pytest.fixture
+def service():
+    service = VerificationService(workers=1, mode="thread", max_pending=2, timeout=0.05)
+    yield service
+    service.shutdown()
+
+
+def test_admit_holds_slots_until_released(service):
+    private_key, pem = generate_key_pair()
+    with service.admit() as first, service.admit():
+        # Both slots are reserved: a third request is turned away at admission...
+        with pytest.raises(VerifierBusy):
+            service.admit()
+        # ...while the admitted ones still verify on the slots they hold
+        assert service.verify(*_signed(private_key, 1), pem, reservation=first)
+    with service.admit():
+        pass
+    assert service.stats()["rejected"] == 1
+
+
+def test_batch_reservation_covers_every_chunk(service):
+    private_key, pem = generate_key_pair()
+    items = [_signed(private_key, seq) for seq in range(CHUNK_SIZE + 1)]
+    with service.admit(len(items)) as reservation:
+        assert reservation.slots == 2
+        assert service.verify_many(items, pem, reservation=reservation) == [True] * len(items)
+        assert reservation.slots == 0
+
+
+def test_process_mode_parses_keys_in_parent():
+    private_key, pem = generate_key_pair()
+    before = public_key_cache_stats()
+    service = VerificationService(workers=2, mode="process")
+    try:
+        for seq in range(3):
+            assert service.verify(*_signed(private_key, seq), pem, fingerprint="fp-process")
+        assert service.verify_many([_signed(private_key, 9)], "not a key") == [False]
+    finally:
+        service.shutdown()
+    after = public_key_cache_stats()
+    assert after["misses"] - before["misses"] == 2
+    assert after["hits"] - before["hits"] == 2
+    assert invalidate_public_key("fp-process")
+
+
+def test_single_signature_helper_records_outcome():
+    private_key, pem = generate_key_pair()
+    data, sig = _signed(private_key, 1)
+    before = signature_stats()["canonical_valid"]
+    assert verify_attestation_signature(data, sig, pem)
+    assert not verify_attestation_signature({**data, "seq": 2}, sig, pem)
+    assert signature_stats()["canonical_valid"] == before + 1
+
+
+def test_batch_larger_than_the_queue_is_rejected_up_front(service):
+    with pytest.raises(BatchTooLarge):
+        service.admit(2 * CHUNK_SIZE + 1)
+    with service.admit(2 * CHUNK_SIZE) as reservation:
+        assert reservation.slots == 2
+
+
+def test_admit_async_wakes_when_a_slot_is_freed():
+    service = VerificationService(workers=1, mode="thread", max_pending=1, timeout=2.0)
+
+    async def scenario():
+        held = service.admit()
+        asyncio.get_running_loop().call_later(0.05, held.release)
+        start = time.monotonic()
+        with await service.admit_async():
+            waited = time.monotonic() - start
+        service.timeout = 0.05
+        with pytest.raises(VerifierBusy):
+            with service.admit():
+                await service.admit_async()
+        return waited
+
+    try:
+        waited = asyncio.run(scenario())
+    finally:
+        service.shutdown()
+    assert 0.04 <= waited < 1.0
+    assert service.stats()["rejected"] == 1
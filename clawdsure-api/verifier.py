@@ -0,0 +1,379 @@
+"""Signature verification worker pool for ClawdSure."""
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from crypto import (
+    VALID_OUTCOMES, parse_public_key, public_key_der, record_signature_outcome,
+    verify_der_outcomes, verify_key_outcomes, verify_signature_outcomes
+)
+
+
+# Items per job when a batch is split across workers. Larger chunks amortise
+# pickling the key in process mode; smaller ones spread work across cores.
+CHUNK_SIZE = 32
+
+
+class VerifierBusy(Exception):
+    """Raised when the verification queue is full and the wait timed out."""
+
+
+class BatchTooLarge(Exception):
+    """Raised by admit() when a batch needs more queue slots than the queue holds."""
+
+
+class Reservation:
+    """
+    Queue slots held from admission until verification jobs run on them.
+
+    Each job queued on the reservation takes one slot, which is released
+    when the job finishes; slots left unused are released on exit.
+    """
+
+    def __init__(self, service: "VerificationService", slots: int):
+        self._service = service
+        self._lock = threading.Lock()
+        self.slots = slots
+
+    def take(self) -> bool:
+        """Hand one held slot to a job (False if none are left)."""
+        with self._lock:
+            if self.slots == 0:
+                return False
+            self.slots -= 1
+            return True
+
+    def release(self):
+        with self._lock:
+            slots, self.slots = self.slots, 0
+        self._service._free(slots)
+
+    def __enter__(self) -> "Reservation":
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class VerificationService:
+    """
+    Runs ECDSA verification on a thread or process pool.
+
+    Endpoints block on the returned futures, so the request thread just
+    waits while the CPU work runs on the pool. mode="process" spreads
+    verification across cores; mode="thread" avoids process start-up and
+    pickling; workers=0 verifies inline on the calling thread.
+
+    Keys are always parsed in this process through crypto's PublicKeyCache
+    (so its metrics and invalidation cover every mode); process workers
+    receive the parsed key as DER.
+
+    At most max_pending jobs may be queued or running. Further submits wait
+    up to `timeout` seconds for a slot and then raise VerifierBusy, so a
+    burst pushes back on clients instead of growing an unbounded queue.
+    The *_async methods do the same from coroutines without blocking the
+    event loop: they sleep until a slot is freed (or the timeout passes)
+    instead of polling.
+
+    Handlers that commit before verifying take a Reservation with admit()
+    first, so the post-commit verify runs on slots already held and cannot
+    be turned away.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        mode: str = "thread",
+        max_pending: int = 1024,
+        timeout: float = 5.0
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown verifier mode: {mode}")
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.mode = mode
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._rejected = 0
+        self._waiters = set()  # (loop, asyncio.Event) of coroutines waiting for a slot
+        self._executor = None
+        if self.workers > 0:
+            pool_cls = ProcessPoolExecutor if mode == "process" else ThreadPoolExecutor
+            self._executor = pool_cls(max_workers=self.workers)
+
+    def _reject(self):
+        with self._lock:
+            self._rejected += 1
+        raise VerifierBusy(f"Verification queue full ({self.max_pending} pending)")
+
+    def _acquire(self, count: int = 1):
+        """Take `count` queue slots, waiting up to `timeout` seconds in total."""
+        deadline = time.monotonic() + self.timeout
+        for taken in range(count):
+            if not self._slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+                self._free(taken)
+                self._reject()
+
+    async def _acquire_async(self, count: int = 1):
+        """
+        Take `count` queue slots without blocking the event loop.
+        
+        Slots are shared with threads, so the coroutine registers an event
+        that _free() sets (thread-safely) and sleeps on it between attempts.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        waiter = (loop, asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        taken = 0
+        try:
+            while taken < count:
+                # Clear before trying, so a slot freed after a failed try still wakes us
+                waiter[1].clear()
+                if self._slots.acquire(blocking=False):
+                    taken += 1
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            self._free(taken)
+            raise
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+        if taken < count:
+            self._free(taken)
+            self._reject()
+
+    def _free(self, count: int = 1):
+        """Return `count` queue slots and wake coroutines waiting for one."""
+        for _ in range(count):
+            self._slots.release()
+        if count and self._waiters:
+            with self._lock:
+                waiters = list(self._waiters)
+            for loop, event in waiters:
+                loop.call_soon_threadsafe(event.set)
+
+    def _job_key(self, public_key_pem: str, fingerprint: Optional[str]):
+        """The agent's key as jobs take it: parsed for threads, DER for processes."""
+        public_key = parse_public_key(public_key_pem, fingerprint)
+        return public_key_der(public_key) if self.mode == "process" else public_key
+
+    def _queue(self, items: List[Tuple[dict, str]], job_key) -> Future:
+        """Queue one job on a slot the caller already holds."""
+        verify = verify_der_outcomes if self.mode == "process" else verify_key_outcomes
+        with self._lock:
+            self._pending += 1
+            self._submitted += 1
+        try:
+            future = self._executor.submit(verify, items, job_key)
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _submit(self, items: List[Tuple[dict, str]], job_key, reservation: Optional[Reservation]) -> Future:
+        """Queue one job on a reserved slot, or wait for a free one if the queue is full."""
+        if reservation is None or not reservation.take():
+            self._acquire()
+        return self._queue(items, job_key)
+
+    @staticmethod
+    def jobs_for(count: int) -> int:
+        """Jobs (queue slots) verifying `count` signatures takes."""
+        return max(1, -(-count // CHUNK_SIZE))
+
+    def _admission(self, count: int) -> int:
+        """Slots admit() must reserve for `count` signatures."""
+        slots = self.jobs_for(count)
+        if slots > self.max_pending:
+            raise BatchTooLarge(
+                f"{count} signatures need {slots} verification jobs; the queue holds {self.max_pending} "
+                f"(at most {self.max_pending * CHUNK_SIZE} signatures per request)"
+            )
+        return slots
+
+    def admit(self, count: int = 1) -> Reservation:
+        """
+        Reserve queue slots for verifying `count` signatures later.
+        
+        Lets a handler apply backpressure before doing work it cannot undo
+        (e.g. committing an attestation whose signature is checked later):
+        pass the reservation to verify()/verify_many() and release it (use
+        it as a context manager) when done.
+        
+        Raises:
+            BatchTooLarge: if `count` needs more slots than max_pending, so
+                it could never be admitted
+            VerifierBusy: if the slots aren't free within `timeout`
+        """
+        if self._executor is None:
+            return Reservation(self, 0)
+        slots = self._admission(count)
+        self._acquire(slots)
+        return Reservation(self, slots)
+
+    async def admit_async(self, count: int = 1) -> Reservation:
+        """admit() for coroutines."""
+        if self._executor is None:
+            return Reservation(self, 0)
+        slots = self._admission(count)
+        await self._acquire_async(slots)
+        return Reservation(self, slots)
+
+    def _release(self, _future):
+        with self._lock:
+            self._pending -= 1
+        self._free()
+
+    def verify_many(
+        self,
+        items: List[Tuple[dict, str]],
+        public_key_pem: str,
+        fingerprint: Optional[str] = None,
+        reservation: Optional[Reservation] = None
+    ) -> List[bool]:
+        """Verify (attestation_data, signature_b64) pairs from one agent, on reserved slots if given."""
+        if not items:
+            return []
+        if self._executor is None:
+            outcomes = verify_signature_outcomes(items, public_key_pem, fingerprint)
+        else:
+            job_key = self._job_key(public_key_pem, fingerprint)
+            futures = [
+                self._submit(items[i:i + CHUNK_SIZE], job_key, reservation)
+                for i in range(0, len(items), CHUNK_SIZE)
+            ]
+            outcomes = [outcome for future in futures for outcome in future.result()]
+        for outcome in outcomes:
+            record_signature_outcome(outcome)
+        return [outcome in VALID_OUTCOMES for outcome in outcomes]
+
+    def verify(
+        self,
+        attestation_data: dict,
+        signature_b64: str,
+        public_key_pem: str,
+        fingerprint: Optional[str] = None,
+        reservation: Optional[Reservation] = None
+    ) -> bool:
+        """Verify a single attestation signature."""
+        return self.verify_many([(attestation_data, signature_b64)], public_key_pem, fingerprint, reservation)[0]
+
+    async def verify_many_async(
+        self,
+        items: List[Tuple[dict, str]],
+        public_key_pem: str,
+        fingerprint: Optional[str] = None,
+        reservation: Optional[Reservation] = None
+    ) -> List[bool]:
+        """verify_many() for coroutines: awaits the pool instead of blocking."""
+        if not items:
+            return []
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            # Inline mode would run ECDSA on the event loop thread
+            outcomes = await loop.run_in_executor(
+                None, verify_signature_outcomes, items, public_key_pem, fingerprint
+            )
+        else:
+            job_key = self._job_key(public_key_pem, fingerprint)
+            futures = []
+            for i in range(0, len(items), CHUNK_SIZE):
+                if reservation is None or not reservation.take():
+                    await self._acquire_async()
+                job = self._queue(items[i:i + CHUNK_SIZE], job_key)
+                futures.append(asyncio.wrap_future(job, loop=loop))
+            outcomes = [outcome for chunk in await asyncio.gather(*futures) for outcome in chunk]
+        for outcome in outcomes:
+            record_signature_outcome(outcome)
+        return [outcome in VALID_OUTCOMES for outcome in outcomes]
+
+    async def verify_async(
+        self,
+        attestation_data: dict,
+        signature_b64: str,
+        public_key_pem: str,
+        fingerprint: Optional[str] = None,
+        reservation: Optional[Reservation] = None
+    ) -> bool:
+        """verify() for coroutines."""
+        results = await self.verify_many_async(
+            [(attestation_data, signature_b64)], public_key_pem, fingerprint, reservation
+        )
+        return results[0]
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and counters."""
+        with self._lock:
+            return {
+                "mode": self.mode if self._executor else "inline",
+                "workers": self.workers,
+                "queue_depth": self._pending,
+                "max_pending": self.max_pending,
+                "submitted": self._submitted,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self):
+        """Stop the worker pool after in-flight jobs finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+_verifier: Optional[VerificationService] = None
+_verifier_lock = threading.Lock()
+
+
+def configure_verifier(**options) -> VerificationService:
+    """Replace the shared verification service (see VerificationService)."""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is not None:
+            _verifier.shutdown()
+        _verifier = VerificationService(**options)
+        return _verifier
+
+
+def get_verifier() -> VerificationService:
+    """
+    Shared verification service, created on first use from env:
+    CLAWDSURE_VERIFY_MODE (thread|process), CLAWDSURE_VERIFY_WORKERS,
+    CLAWDSURE_VERIFY_QUEUE (max pending jobs).
+    """
+    global _verifier
+    if _verifier is None:
+        workers = os.environ.get("CLAWDSURE_VERIFY_WORKERS")
+        options = {
+            "mode": os.environ.get("CLAWDSURE_VERIFY_MODE", "thread"),
+            "workers": int(workers) if workers else None,
+            "max_pending": int(os.environ.get("CLAWDSURE_VERIFY_QUEUE", "1024")),
+        }
+        with _verifier_lock:
+            if _verifier is None:
+                _verifier = VerificationService(**options)
+    return _verifier
+
+
+def shutdown_verifier():
+    """Stop the shared verification service, if running."""
+    global _verifier
+    with _verifier_lock:
+        if _verifier is not None:
+            _verifier.shutdown()
+            _verifier = None
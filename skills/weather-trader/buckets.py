@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Temperature bucket ladders for Polymarket weather markets.
+
+A market's buckets are labels like "56-57°F", "55°F or below" and
+"72°F or higher" (Gamma groupItemTitle), or the "56-57", "<=55", ">=72"
+keys the trading/ scripts log. BucketLadder parses them once into sorted,
+inclusive whole-degree intervals (the tails open-ended), so finding the
+bucket for a temperature is a bisect instead of re-parsing every label.
+
+Markets resolve on whole degrees, so temperatures are rounded before
+lookup. A ladder whose labels don't say °F or °C has no unit, and
+temperatures are looked up as given. Stdlib only, so the curl-based trading scripts can import it too.
+"""
+
+import math
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TAIL_OFFSET = 1.0  # degrees past a tail's threshold assumed for its midpoint
+
+_NUM = r"(-?\d+)\s*(?:°\s*)?([FC])?"
+_BELOW = re.compile(rf"^(?:<=\s*{_NUM}|{_NUM}\s*or\s+(?:below|lower|less))$", re.I)
+_ABOVE = re.compile(rf"^(?:>=\s*{_NUM}|{_NUM}\s*or\s+(?:higher|above|more))$", re.I)
+_RANGE = re.compile(rf"^{_NUM}\s*(?:-|–|to)\s*{_NUM}$", re.I)
+_EXACT = re.compile(rf"^{_NUM}$", re.I)
+
+
+@dataclass(frozen=True)
+class Bucket:
+    label: str
+    lo: float      # lowest whole degree in the bucket (-inf for "or below")
+    hi: float      # highest whole degree in the bucket (inf for "or higher")
+    price: float
+
+    @property
+    def midpoint(self) -> float:
+        """Representative temperature; tails sit TAIL_OFFSET past their threshold."""
+        if math.isinf(self.lo):
+            return self.hi - TAIL_OFFSET
+        if math.isinf(self.hi):
+            return self.lo + TAIL_OFFSET
+        return (self.lo + self.hi) / 2
+
+    def distance(self, temp: float) -> float:
+        """Degrees from temp to the nearest edge of the bucket (0 if inside)."""
+        return max(self.lo - temp, temp - self.hi, 0.0)
+
+
+def parse_bucket(label: str) -> Optional[Tuple[float, float, Optional[str]]]:
+    """
+    Parse a bucket label.
+
+    Returns:
+        (lo, hi, unit) with unit "fahrenheit"/"celsius" if the label says,
+        else None for unit; None if the label isn't a temperature bucket
+    """
+    text = label.strip()
+    for pattern, bounds in (
+        (_BELOW, lambda a: (-math.inf, a)),
+        (_ABOVE, lambda a: (a, math.inf)),
+    ):
+        match = pattern.match(text)
+        if match:
+            groups = [g for g in match.groups() if g is not None]
+            return (*bounds(float(groups[0])), _unit(groups[1:]))
+    match = _RANGE.match(text)
+    if match:
+        lo, lo_unit, hi, hi_unit = match.groups()
+        return float(lo), float(hi), _unit([lo_unit, hi_unit])
+    match = _EXACT.match(text)
+    if match:
+        value, unit = match.groups()
+        return float(value), float(value), _unit([unit])
+    return None
+
+
+def _unit(letters: Iterable[Optional[str]]) -> Optional[str]:
+    for letter in letters:
+        if letter:
+            return "celsius" if letter.upper() == "C" else "fahrenheit"
+    return None
+
+
+def convert(temp: float, from_unit: str, to_unit: str) -> float:
+    if from_unit == to_unit:
+        return temp
+    if to_unit == "celsius":
+        return (temp - 32) * 5 / 9
+    return temp * 9 / 5 + 32
+
+
+class BucketLadder:
+    """
+    A market's buckets as sorted, non-overlapping whole-degree intervals.
+
+    Labels that don't parse are kept in `unparsed` and never matched.
+    """
+
+    def __init__(self, buckets: Iterable[Bucket], unit: Optional[str] = None, unparsed: Iterable[str] = ()):
+        self.buckets: List[Bucket] = sorted(buckets, key=lambda b: (b.lo, b.hi))
+        self.unit = unit
+        self.unparsed = list(unparsed)
+        self._los = [b.lo for b in self.buckets]
+
+    @classmethod
+    def from_buckets(cls, prices: Dict[str, float], unit: Optional[str] = None) -> "BucketLadder":
+        """
+        Build a ladder from {label: price}.
+
+        Args:
+            prices: Market buckets (Market.buckets, or extract_buckets() in trading/)
+            unit: Temperature unit; default is the unit the labels give, else None
+                (unknown: temperatures are not converted)
+        """
+        buckets, unparsed, units = [], [], set()
+        for label, price in prices.items():
+            parsed = parse_bucket(label)
+            if parsed is None:
+                unparsed.append(label)
+                continue
+            lo, hi, label_unit = parsed
+            buckets.append(Bucket(label, lo, hi, price))
+            if label_unit:
+                units.add(label_unit)
+        if unit is None:
+            unit = units.pop() if len(units) == 1 else None
+        return cls(buckets, unit, unparsed)
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def __iter__(self):
+        return iter(self.buckets)
+
+    def _whole(self, temp: float, unit: Optional[str]) -> int:
+        if unit and self.unit:
+            temp = convert(temp, unit, self.unit)
+        return round(temp)
+
+    def _index(self, degrees: int) -> int:
+        i = bisect_right(self._los, degrees) - 1
+        if i >= 0 and degrees <= self.buckets[i].hi:
+            return i
+        return -1
+
+    def lookup(self, temp: float, unit: Optional[str] = None) -> Optional[Bucket]:
+        """
+        Bucket the temperature resolves into, or None if it falls outside the ladder.
+
+        Args:
+            temp: Temperature (rounded to whole degrees)
+            unit: Unit of temp if it may differ from the ladder's (converted first,
+                unless the ladder's unit is unknown)
+        """
+        i = self._index(self._whole(temp, unit))
+        return self.buckets[i] if i >= 0 else None
+
+    def lookup_many(self, temps: Iterable[float], unit: Optional[str] = None) -> List[Optional[Bucket]]:
+        """
+        lookup() for a whole array of temperatures, in input order.
+
+        Sorts the temperatures and walks them up the ladder in one pass,
+        instead of a bisect per temperature.
+        """
+        degrees = [self._whole(temp, unit) for temp in temps]
+        found: List[Optional[Bucket]] = [None] * len(degrees)
+        i = 0
+        for k in sorted(range(len(degrees)), key=degrees.__getitem__):
+            while i < len(self.buckets) and self.buckets[i].hi < degrees[k]:
+                i += 1
+            if i == len(self.buckets):
+                break
+            if self.buckets[i].lo <= degrees[k]:
+                found[k] = self.buckets[i]
+        return found
+
+    def nearest(self, temp: float, unit: Optional[str] = None) -> Optional[Bucket]:
+        """Bucket containing the temperature, else the closest one (None if the ladder is empty)."""
+        if not self.buckets:
+            return None
+        degrees = self._whole(temp, unit)
+        i = bisect_right(self._los, degrees) - 1
+        # Only the buckets either side of the bisect point can be closest
+        candidates = self.buckets[max(i, 0):i + 2]
+        return min(candidates, key=lambda b: b.distance(degrees))
+
+    def implied_temp(self) -> Optional[float]:
+        """Probability-weighted midpoint of the ladder (None if nothing is priced)."""
+        total = sum(b.price for b in self.buckets)
+        if total == 0:
+            return None
+        return sum(b.midpoint * b.price for b in self.buckets) / total
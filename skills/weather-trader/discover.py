@@ -7,12 +7,28 @@ Use SLUG-BASED queries instead:
   gamma-api.polymarket.com/events?slug=highest-temperature-in-{city}-on-{month}-{day}-{year}
 
 This is the fix that makes discovery work.
+
+discover_markets() looks up every (city, date, slug variant) at once on a
+bounded thread pool sharing one keep-alive session, so a scan takes about
+as long as its slowest lookup instead of the sum of all of them.
+
+slug_cache (slug_cache.json) remembers which variant resolves for each
+city and which slugs came back empty, so later scans ask for one slug per
+market instead of every variant.
 """
 
+import json
+import os
 import requests
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
+
+from buckets import BucketLadder
 
 # City slug mappings
 CITY_SLUGS = {
@@ -34,6 +50,15 @@ CITY_SLUG_VARIANTS = {
 
 GAMMA_API = "https://gamma-api.polymarket.com"
 
+# Concurrent discovery
+MAX_WORKERS = 16       # lookups in flight across all hosts
+PER_HOST_LIMIT = 8     # lookups in flight per host (be polite to Gamma)
+REQUEST_TIMEOUT = 10
+
+# Slug resolution cache
+SLUG_CACHE_FILE = os.path.join(os.path.dirname(__file__), "slug_cache.json")
+MISS_TTL = 3600  # seconds before a slug that came back empty is tried again
+
 
 @dataclass
 class Market:
@@ -46,6 +71,11 @@ class Market:
     liquidity: float
     end_date: str
     active: bool
+    ladder: BucketLadder = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Parse the bucket labels once; signals look temperatures up in the ladder
+        self.ladder = BucketLadder.from_buckets(self.buckets)
     
     def get_price(self, bucket: str) -> Optional[float]:
         """Get price for a specific temperature bucket."""
@@ -86,87 +116,316 @@ def build_slug(city: str, date: datetime) -> str:
     return f"highest-temperature-in-{city_slug}-on-{month}-{day}-{year}"
 
 
-def get_market(city: str, date: datetime) -> Optional[Market]:
+def variant_slugs(city: str, date: datetime) -> List[Tuple[str, str]]:
+    """(city variant, event slug) pairs for a city and date, in CITY_SLUG_VARIANTS order."""
+    variants = CITY_SLUG_VARIANTS.get(city, [CITY_SLUGS.get(city, city)])
+    return [(variant, build_slug(variant, date)) for variant in variants]
+
+
+class SlugCache:
     """
-    Fetch a specific weather market by city and date.
+    Which slug variant resolves for each city, and which slugs are empty.
+    
+    Stored as JSON so every run (scan, trade, the discover/signals modules)
+    shares it. Resolved variants are kept until they stop resolving; empty
+    slugs are skipped for miss_ttl seconds, since markets for later dates
+    appear over time. Network errors are not cached.
+    
+    hit() and miss() only change memory; save() writes them out, once per
+    run (find_markets does it when its lookups are done).
     """
-    # Try different slug variants
-    variants = CITY_SLUG_VARIANTS.get(city, [city])
     
-    for city_variant in variants:
-        slug = build_slug(city_variant, date) if city_variant != city else build_slug(city, date)
+    def __init__(self, path: str = SLUG_CACHE_FILE, miss_ttl: float = MISS_TTL):
+        self.path = path
+        self.miss_ttl = miss_ttl
+        self._data: Optional[Dict] = None
+        self._resolved: Dict[str, str] = {}               # city -> variant, since the last save
+        self._misses: Dict[str, Optional[float]] = {}     # slug -> skip until (None: resolved again)
+        self._lock = threading.Lock()
+    
+    def _load(self) -> Dict:
+        if self._data is None:
+            self._data = self._read()
+        return self._data
+    
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        data.setdefault("resolved", {})
+        data.setdefault("misses", {})
+        return data
+    
+    def plan(self, city: str, date: datetime) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
+        """
+        Split a market's (variant, slug) pairs into what to request first
+        and what to fall back to if that comes back empty.
         
-        # Override slug building for variants
-        if city_variant != CITY_SLUGS.get(city, city):
-            month = date.strftime("%B").lower()
-            day = date.day
-            year = date.year
-            slug = f"highest-temperature-in-{city_variant}-on-{month}-{day}-{year}"
+        With a known variant, only its slug goes first; otherwise all of
+        them do. Slugs that recently came back empty are left out.
+        """
+        now = time.time()
+        with self._lock:
+            data = self._load()
+            pairs = [(v, slug) for v, slug in variant_slugs(city, date) if data["misses"].get(slug, 0) <= now]
+            known = data["resolved"].get(city)
+        first = [pair for pair in pairs if pair[0] == known]
+        if not first:
+            return pairs, []
+        return first, [pair for pair in pairs if pair[0] != known]
+    
+    def hit(self, city: str, variant: str, slug: str):
+        with self._lock:
+            data = self._load()
+            data["misses"].pop(slug, None)
+            data["resolved"][city] = variant
+            self._resolved[city] = variant
+            self._misses[slug] = None
+    
+    def miss(self, slug: str):
+        with self._lock:
+            until = time.time() + self.miss_ttl
+            self._load()["misses"][slug] = until
+            self._misses[slug] = until
+    
+    def save(self):
+        """
+        Merge our changes into the file and drop expired misses.
         
-        url = f"{GAMMA_API}/events?slug={slug}"
+        Re-reads the file first, so what other processes wrote since we
+        loaded it is kept; our own hits and misses win where both changed.
+        """
+        with self._lock:
+            if not self._resolved and not self._misses:
+                return
+            data = self._read()
+            data["resolved"].update(self._resolved)
+            for slug, until in self._misses.items():
+                if until is None:
+                    data["misses"].pop(slug, None)
+                else:
+                    data["misses"][slug] = until
+            now = time.time()
+            data["misses"] = {slug: until for slug, until in data["misses"].items() if until > now}
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp, self.path)
+            self._data = data
+            self._resolved = {}
+            self._misses = {}
+    
+    def clear(self):
+        with self._lock:
+            self._data = {"resolved": {}, "misses": {}}
+            self._resolved = {}
+            self._misses = {}
+            if os.path.exists(self.path):
+                os.remove(self.path)
+    
+    def summary(self) -> Dict:
+        """Resolved variants and the empty slugs still being skipped."""
+        now = time.time()
+        with self._lock:
+            data = self._load()
+            return {
+                "resolved": dict(data["resolved"]),
+                "misses": {slug: int(until - now) for slug, until in data["misses"].items() if until > now}
+            }
+
+
+slug_cache = SlugCache()
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session, with a connection pool as big as the worker pool."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _session_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(PER_HOST_LIMIT)
+        return _host_slots[host]
+
+
+def fetch_event(slug: str) -> Optional[Dict]:
+    """
+    Fetch one Gamma event by slug.
+    
+    Returns:
+        The event, or None if no event has that slug
+    
+    Raises:
+        requests.RequestException on network or HTTP errors
+    """
+    url = f"{GAMMA_API}/events?slug={slug}"
+    with _host_slot(url):
+        resp = get_session().get(url, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    data = resp.json()
+    return data[0] if data else None
+
+
+def parse_market(event: Dict, slug: str, city: str, date: datetime) -> Optional[Market]:
+    """Build a Market from a Gamma event; None if it has no temperature buckets."""
+    buckets = {}
+    for m in event.get("markets", []):
+        title = m.get("groupItemTitle", "")
+        prices = m.get("outcomePrices", "[]")
         
+        # Parse prices (JSON string)
         try:
-            resp = requests.get(url, timeout=10)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            if not data:
-                continue
-            
-            event = data[0]
-            
-            # Parse markets (temperature buckets)
-            buckets = {}
-            markets = event.get("markets", [])
-            
-            for m in markets:
-                title = m.get("groupItemTitle", "")
-                prices = m.get("outcomePrices", "[]")
-                
-                # Parse prices (JSON string)
-                try:
-                    import json
-                    price_list = json.loads(prices)
-                    yes_price = float(price_list[0]) if price_list else 0
-                except:
-                    yes_price = 0
-                
-                if title:
-                    buckets[title] = yes_price
-            
-            if buckets:
-                return Market(
-                    slug=slug,
-                    title=event.get("title", ""),
-                    city=city,
-                    date=date.strftime("%Y-%m-%d"),
-                    buckets=buckets,
-                    volume=event.get("volume", 0),
-                    liquidity=event.get("liquidity", 0),
-                    end_date=event.get("endDate", ""),
-                    active=not event.get("closed", False)
-                )
-                
-        except Exception as e:
-            continue
+            price_list = json.loads(prices)
+            yes_price = float(price_list[0]) if price_list else 0
+        except (TypeError, ValueError, IndexError):
+            yes_price = 0
+        
+        if title:
+            buckets[title] = yes_price
     
+    if not buckets:
+        return None
+    return Market(
+        slug=slug,
+        title=event.get("title", ""),
+        city=city,
+        date=date.strftime("%Y-%m-%d"),
+        buckets=buckets,
+        volume=event.get("volume", 0),
+        liquidity=event.get("liquidity", 0),
+        end_date=event.get("endDate", ""),
+        active=not event.get("closed", False)
+    )
+
+
+def _lookup(
+    variant: str,
+    slug: str,
+    city: str,
+    date: datetime,
+    found: Optional[threading.Event] = None
+) -> Optional[Market]:
+    """Fetch and parse one slug variant (recorded in slug_cache); skipped once another variant has won."""
+    if found is not None and found.is_set():
+        return None
+    try:
+        event = fetch_event(slug)
+    except (requests.RequestException, ValueError):
+        return None
+    market = parse_market(event, slug, city, date) if event else None
+    if market:
+        slug_cache.hit(city, variant, slug)
+    else:
+        slug_cache.miss(slug)
+    return market
+
+
+def get_market(city: str, date: datetime) -> Optional[Market]:
+    """
+    Fetch a specific weather market by city and date.
+    
+    Tries the variant that resolved last time first, then the others in order.
+    What it learns stays in slug_cache until slug_cache.save().
+    """
+    first, rest = slug_cache.plan(city, date)
+    for variant, slug in first + rest:
+        market = _lookup(variant, slug, city, date)
+        if market:
+            return market
     return None
 
 
-def discover_markets(days_ahead: int = 2) -> List[Market]:
+def find_markets(
+    targets: Iterable[Tuple[str, datetime]],
+    max_workers: int = MAX_WORKERS
+) -> Dict[Tuple[str, str], Market]:
     """
-    Discover all active weather markets for the next N days.
+    Look up many (city, date) markets concurrently.
+    
+    All targets are requested at once. A target whose variant is known
+    from slug_cache gets one request, and its other variants only if that
+    comes back empty; otherwise every variant is requested and the first
+    to return a market wins, cancelling the rest (dropped if still
+    queued, skipped if not yet started). slug_cache is saved once, after
+    the last lookup.
+    
+    Returns:
+        {(city, "YYYY-MM-DD"): Market} for the targets that have a market
     """
-    markets = []
+    found: Dict[Tuple[str, str], Market] = {}
+    won: Dict[Tuple[str, str], threading.Event] = {}
+    fallback: Dict[Tuple[str, str], list] = {}
+    pending = {}
+    
+    def submit(key, pairs, city, date):
+        for variant, slug in pairs:
+            pending[pool.submit(_lookup, variant, slug, city, date, won[key])] = (key, city, date)
     
-    for days in range(0, days_ahead + 1):
-        target_date = datetime.now() + timedelta(days=days)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="discover") as pool:
+        for city, date in targets:
+            key = (city, date.strftime("%Y-%m-%d"))
+            if key in won:
+                continue
+            won[key] = threading.Event()
+            first, fallback[key] = slug_cache.plan(city, date)
+            submit(key, first, city, date)
         
-        for city in CITY_SLUGS:
-            market = get_market(city, target_date)
-            if market and market.active:
-                markets.append(market)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, city, date = pending.pop(future)
+                market = future.result()
+                if won[key].is_set():
+                    continue
+                if market is None:
+                    # Known variant came back empty: try the others
+                    if fallback[key] and not any(k == key for k, _, _ in pending.values()):
+                        pairs, fallback[key] = fallback[key], []
+                        submit(key, pairs, city, date)
+                    continue
+                won[key].set()
+                found[key] = market
+                for other in [f for f, (k, _, _) in pending.items() if k == key]:
+                    if other.cancel():
+                        del pending[other]
+    slug_cache.save()
+    return found
+
+
+def discover_markets(days_ahead: int = 2) -> List[Market]:
+    """
+    Discover all active weather markets for the next N days.
+    """
+    now = datetime.now()
+    targets = [
+        (city, now + timedelta(days=days))
+        for days in range(0, days_ahead + 1)
+        for city in CITY_SLUGS
+    ]
+    found = find_markets(targets)
     
+    # Same order as the targets: by day, then city
+    markets = []
+    for city, date in targets:
+        market = found.get((city, date.strftime("%Y-%m-%d")))
+        if market and market.active:
+            markets.append(market)
     return markets
 
 
@@ -175,7 +434,9 @@ def get_market_for_forecast(city: str, date_str: str) -> Optional[Market]:
     Get market matching a forecast's city and date.
     """
     date = datetime.strptime(date_str, "%Y-%m-%d")
-    return get_market(city, date)
+    market = get_market(city, date)
+    slug_cache.save()
+    return market
 
 
 if __name__ == "__main__":
@@ -188,6 +449,7 @@ if __name__ == "__main__":
     
     print(f"Looking for NYC market for {tomorrow.strftime('%Y-%m-%d')}...")
     market = get_market("nyc", tomorrow)
+    slug_cache.save()
     
     if market:
         print(f"\n✅ Found: {market.title}")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+On-disk forecast cache shared by the weather-trader skill and the trading scripts.
+
+Entries are keyed by (source, city, target date) and hold whatever the
+caller stores (e.g. {"high": 58.0, "low": 41.0}) plus:
+
+  fetched_at  when we downloaded it (unix seconds)
+  issued_at   when the provider produced it: its own timestamp if it sends
+              one (weather.gov updateTime), else the model run in effect
+  expires_at  when the provider's next model run should be available
+
+Upstream models only update a few times a day, so an entry stays fresh
+until the next run lands instead of for a fixed TTL. MODEL_RUNS sets
+each source's cadence.
+
+The cache lives in forecast_cache.json next to this file (override with
+WEATHER_FORECAST_CACHE). Stdlib only, so the curl-based trading scripts
+can import it too.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+CACHE_FILE = os.environ.get(
+    "WEATHER_FORECAST_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "forecast_cache.json")
+)
+KEEP_EXPIRED = 86400  # seconds an expired entry is kept (for issued_at history) before pruning
+
+
+@dataclass
+class ModelRuns:
+    """Runs every cycle_hours from 00Z, each available delay_hours after its nominal time."""
+    cycle_hours: float
+    delay_hours: float
+
+    def latest_run(self, at: float) -> float:
+        """Nominal time of the newest run available at `at`."""
+        cycle, delay = self.cycle_hours * 3600, self.delay_hours * 3600
+        return ((at - delay) // cycle) * cycle
+
+    def next_available(self, at: float) -> float:
+        """When the run after the one available at `at` becomes available."""
+        return self.latest_run(at) + self.cycle_hours * 3600 + self.delay_hours * 3600
+
+
+MODEL_RUNS = {
+    # GFS/ECMWF-driven blend: 00/06/12/18Z runs, about 4h until Open-Meteo serves them
+    "open-meteo": ModelRuns(cycle_hours=6, delay_hours=4),
+    # NWS gridpoint forecasts follow the hourly NBM plus forecaster updates
+    "weather.gov": ModelRuns(cycle_hours=1, delay_hours=0.5),
+}
+DEFAULT_RUNS = ModelRuns(cycle_hours=1, delay_hours=0)
+
+
+def parse_issue_time(value: Optional[str]) -> Optional[float]:
+    """ISO 8601 timestamp (e.g. weather.gov updateTime) -> unix seconds."""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class ForecastCache:
+    """Forecast entries by (source, city, date), fresh until the source's next model run."""
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._changed: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(source: str, city: str, date: str) -> str:
+        return f"{source}|{city}|{date}"
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, source: str, city: str, date: str) -> Optional[Dict]:
+        """Fresh entry (value fields plus fetched_at/issued_at/expires_at), or None."""
+        with self._lock:
+            entry = self._load().get(self._key(source, city, date))
+        if entry is None or entry["expires_at"] <= time.time():
+            return None
+        return entry
+
+    def get_many(self, source: str, city: str, dates: Iterable[str]) -> Optional[Dict[str, Dict]]:
+        """Fresh entries for all of `dates`, or None if any is missing or stale."""
+        entries = {}
+        for date in dates:
+            entry = self.get(source, city, date)
+            if entry is None:
+                return None
+            entries[date] = entry
+        return entries
+
+    def get_from(self, source: str, city: str, first_date: str) -> Dict[str, Dict]:
+        """Fresh entries dated first_date or later, in date order."""
+        prefix = self._key(source, city, "")
+        now = time.time()
+        with self._lock:
+            found = {
+                key[len(prefix):]: entry for key, entry in self._load().items()
+                if key.startswith(prefix) and key[len(prefix):] >= first_date and entry["expires_at"] > now
+            }
+        return dict(sorted(found.items()))
+
+    def put(
+        self,
+        source: str,
+        city: str,
+        date: str,
+        value: Dict,
+        issued_at: Optional[float] = None,
+        fetched_at: Optional[float] = None
+    ) -> Dict:
+        """Store a forecast just fetched; expiry follows MODEL_RUNS[source]."""
+        runs = MODEL_RUNS.get(source, DEFAULT_RUNS)
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        entry = dict(value)
+        entry["fetched_at"] = fetched_at
+        entry["issued_at"] = runs.latest_run(fetched_at) if issued_at is None else issued_at
+        entry["expires_at"] = runs.next_available(fetched_at)
+        key = self._key(source, city, date)
+        with self._lock:
+            self._load()[key] = entry
+            self._changed[key] = entry
+        return entry
+
+    def save(self):
+        """
+        Merge our new entries into the file and drop long-expired ones.
+
+        Re-reads the file first, so entries other processes wrote since we
+        loaded it are kept (the newer fetch wins per key).
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            entries = self._read()
+            for key, entry in self._changed.items():
+                if key not in entries or entries[key]["fetched_at"] <= entry["fetched_at"]:
+                    entries[key] = entry
+            cutoff = time.time() - KEEP_EXPIRED
+            entries = {key: entry for key, entry in entries.items() if entry["expires_at"] > cutoff}
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump(entries, f, indent=1, sort_keys=True)
+            os.replace(tmp, self.path)
+            self._entries = entries
+            self._changed = {}
+
+    def read_through(
+        self,
+        source: str,
+        city: str,
+        fetch: Callable[[], Tuple[Dict[str, Dict], Optional[float]]],
+        dates: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict]:
+        """
+        Cached entries for (source, city), fetching only when they are stale.
+
+        Args:
+            fetch: Downloads the forecast: returns ({date: value}, issued_at or None);
+                an empty dict means the fetch failed (nothing is cached)
+            dates: Dates needed; None takes whatever the last fetch covered from
+                today on
+
+        Returns:
+            {date: entry}; empty if nothing is cached and the fetch failed
+        """
+        if dates is not None:
+            dates = list(dates)
+            cached = self.get_many(source, city, dates)
+        else:
+            cached = self.get_from(source, city, datetime.now().strftime("%Y-%m-%d")) or None
+        if cached is not None:
+            return cached
+
+        values, issued_at = fetch()
+        if not values:
+            return {}
+        fetched_at = time.time()
+        entries = {
+            date: self.put(source, city, date, value, issued_at=issued_at, fetched_at=fetched_at)
+            for date, value in values.items()
+        }
+        self.save()
+        if dates is not None:
+            return {date: entries[date] for date in dates if date in entries}
+        return dict(sorted(entries.items()))
+
+
+forecast_cache = ForecastCache()
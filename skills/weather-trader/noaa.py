@@ -2,13 +2,26 @@
 """
 Fetch weather forecasts from Open-Meteo API.
 Free, no API key required.
+
+get_forecast_table() fetches every city over a range of days in one
+request per temperature unit (Open-Meteo takes comma-separated
+coordinates and a date range), falling back to per-city get_forecast()
+calls if the batch fails.
+
+Both read through forecast_cache (source "open-meteo"), so forecasts are
+only downloaded again once a newer model run is out.
 """
 
 import requests
 from datetime import datetime, timedelta
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from dataclasses import dataclass
 
+from forecast_cache import forecast_cache
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+SOURCE = "open-meteo"
+
 # City configurations
 CITIES = {
     "nyc": {
@@ -78,6 +91,36 @@ class Forecast:
         }
 
 
+def forecast_confidence(days_out: int) -> float:
+    """
+    Confidence decreases with forecast horizon.
+    Day 0: 0.92, Day 1: 0.90, Day 2: 0.85, Day 3: 0.75, Day 4+: 0.65
+    """
+    confidence_map = {0: 0.92, 1: 0.90, 2: 0.85, 3: 0.75}
+    return confidence_map.get(days_out, 0.65)
+
+
+def days_out(date_str: str) -> int:
+    """
+    Whole days from now to the start of a target date, the horizon
+    forecast_confidence() is keyed by (tomorrow is day 0).
+    """
+    return (datetime.strptime(date_str, "%Y-%m-%d") - datetime.now()).days
+
+
+def _make_forecast(city: str, date_str: str, entry: Dict, confidence: float) -> Forecast:
+    config = CITIES[city]
+    return Forecast(
+        city=city,
+        city_name=config["name"],
+        date=date_str,
+        high_temp=entry["high"],
+        low_temp=entry["low"],
+        unit=config["unit"],
+        confidence=confidence
+    )
+
+
 def get_forecast(city: str, date: Optional[str] = None, days_ahead: int = 1) -> Optional[Forecast]:
     """
     Get forecast for a city on a specific date.
@@ -103,19 +146,12 @@ def get_forecast(city: str, date: Optional[str] = None, days_ahead: int = 1) ->
         target_date = datetime.now() + timedelta(days=days_ahead)
     
     date_str = target_date.strftime("%Y-%m-%d")
-    
-    # Calculate days from now for confidence adjustment
-    days_out = (target_date - datetime.now()).days
-    
-    # Confidence decreases with forecast horizon
-    # Day 0-1: 0.90, Day 2: 0.85, Day 3: 0.75, Day 4+: 0.65
-    confidence_map = {0: 0.92, 1: 0.90, 2: 0.85, 3: 0.75}
-    confidence = confidence_map.get(days_out, 0.65)
+    confidence = forecast_confidence(days_out(date_str))
     
     # Build API URL
     temp_unit = "fahrenheit" if config["unit"] == "fahrenheit" else "celsius"
     url = (
-        f"https://api.open-meteo.com/v1/forecast"
+        f"{OPEN_METEO_URL}"
         f"?latitude={config['lat']}"
         f"&longitude={config['lon']}"
         f"&daily=temperature_2m_max,temperature_2m_min"
@@ -125,42 +161,141 @@ def get_forecast(city: str, date: Optional[str] = None, days_ahead: int = 1) ->
         f"&end_date={date_str}"
     )
     
-    try:
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        data = resp.json()
-        
-        daily = data.get("daily", {})
-        highs = daily.get("temperature_2m_max", [])
-        lows = daily.get("temperature_2m_min", [])
-        
-        if not highs or not lows:
-            print(f"No forecast data for {city} on {date_str}")
-            return None
+    def fetch():
+        try:
+            resp = requests.get(url, timeout=10)
+            resp.raise_for_status()
+            data = resp.json()
+            
+            daily = data.get("daily", {})
+            highs = daily.get("temperature_2m_max", [])
+            lows = daily.get("temperature_2m_min", [])
+            
+            if not highs or not lows:
+                print(f"No forecast data for {city} on {date_str}")
+                return {}, None
+            
+            return {date_str: {"high": highs[0], "low": lows[0]}}, None
+            
+        except Exception as e:
+            print(f"Error fetching forecast for {city}: {e}")
+            return {}, None
+    
+    entry = forecast_cache.read_through(SOURCE, city, fetch, [date_str]).get(date_str)
+    if entry is None:
+        return None
+    return _make_forecast(city, date_str, entry, confidence)
+
+
+def _fetch_batch(cities: List[str], start: datetime, end: datetime) -> Dict[Tuple[str, str], Dict]:
+    """
+    One Open-Meteo request for several cities (sharing a unit) over a date range.
+    
+    Returns:
+        {(city, date): {"high", "low"}}
+    
+    Raises:
+        requests.RequestException, ValueError, KeyError on a failed or malformed response
+    """
+    configs = [CITIES[city] for city in cities]
+    url = (
+        f"{OPEN_METEO_URL}"
+        f"?latitude={','.join(str(c['lat']) for c in configs)}"
+        f"&longitude={','.join(str(c['lon']) for c in configs)}"
+        f"&daily=temperature_2m_max,temperature_2m_min"
+        f"&temperature_unit={configs[0]['unit']}"
+        f"&timezone={','.join(c['timezone'] for c in configs)}"
+        f"&start_date={start.strftime('%Y-%m-%d')}"
+        f"&end_date={end.strftime('%Y-%m-%d')}"
+    )
+    resp = requests.get(url, timeout=10)
+    resp.raise_for_status()
+    data = resp.json()
+    
+    # A single location comes back as an object, several as a list in request order
+    locations = data if isinstance(data, list) else [data]
+    if len(locations) != len(cities):
+        raise ValueError(f"expected {len(cities)} locations, got {len(locations)}")
+    
+    values = {}
+    for city, location in zip(cities, locations):
+        daily = location["daily"]
+        for date_str, high, low in zip(daily["time"], daily["temperature_2m_max"], daily["temperature_2m_min"]):
+            if high is not None and low is not None:
+                values[(city, date_str)] = {"high": high, "low": low}
+    return values
+
+
+def get_forecast_table(
+    days_ahead: int = 2,
+    start_days: int = 0,
+    cities: Optional[Iterable[str]] = None
+) -> Dict[Tuple[str, str], Forecast]:
+    """
+    Forecasts for cities over a range of days, batched.
+    
+    Args:
+        days_ahead: Last day of the range (days from today)
+        start_days: First day of the range (days from today)
+        cities: City keys (default: all CITIES)
+    
+    Returns:
+        {(city, "YYYY-MM-DD"): Forecast}, ordered by date, then city
+    """
+    cities = list(cities or CITIES)
+    now = datetime.now()
+    start, end = now + timedelta(days=start_days), now + timedelta(days=days_ahead)
+    
+    # One request per temperature unit: Open-Meteo takes a single unit per call
+    by_unit: Dict[str, List[str]] = {}
+    for city in cities:
+        by_unit.setdefault(CITIES[city]["unit"], []).append(city)
+    
+    dates = [(start + timedelta(days=days)).strftime("%Y-%m-%d") for days in range(days_ahead - start_days + 1)]
+    
+    table = {}
+    for unit_cities in by_unit.values():
+        # Only go to Open-Meteo if some city's forecast is missing or from an older model run
+        cached = {city: forecast_cache.get_many(SOURCE, city, dates) for city in unit_cities}
+        if all(entries is not None for entries in cached.values()):
+            for city, entries in cached.items():
+                for date_str, entry in entries.items():
+                    table[(city, date_str)] = _make_forecast(
+                        city, date_str, entry, forecast_confidence(days_out(date_str))
+                    )
+            continue
         
-        return Forecast(
-            city=city,
-            city_name=config["name"],
-            date=date_str,
-            high_temp=highs[0],
-            low_temp=lows[0],
-            unit=config["unit"],
-            confidence=confidence
-        )
+        try:
+            batch = _fetch_batch(unit_cities, start, end)
+        except (requests.RequestException, ValueError, KeyError, TypeError) as e:
+            print(f"Batch forecast failed for {', '.join(unit_cities)} ({e}); fetching per city")
+            for city in unit_cities:
+                for days in range(start_days, days_ahead + 1):
+                    forecast = get_forecast(city, days_ahead=days)
+                    if forecast:
+                        table[(city, forecast.date)] = forecast
+            continue
         
-    except Exception as e:
-        print(f"Error fetching forecast for {city}: {e}")
-        return None
+        for (city, date_str), value in batch.items():
+            entry = forecast_cache.put(SOURCE, city, date_str, value)
+            if date_str in dates:
+                table[(city, date_str)] = _make_forecast(
+                    city, date_str, entry, forecast_confidence(days_out(date_str))
+                )
+        forecast_cache.save()
+    
+    return {
+        (city, date): table[(city, date)]
+        for date in dates
+        for city in cities
+        if (city, date) in table
+    }
 
 
 def get_all_forecasts(days_ahead: int = 1) -> Dict[str, Forecast]:
     """Get forecasts for all supported cities."""
-    forecasts = {}
-    for city in CITIES:
-        forecast = get_forecast(city, days_ahead=days_ahead)
-        if forecast:
-            forecasts[city] = forecast
-    return forecasts
+    table = get_forecast_table(days_ahead=days_ahead, start_days=days_ahead)
+    return {city: forecast for (city, _), forecast in table.items()}
 
 
 if __name__ == "__main__":
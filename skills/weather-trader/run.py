@@ -10,6 +10,7 @@ Commands:
   resolve --index N --won/--lost - Settle a trade
   demo                    - Test with simulated markets
   reset [--balance N]     - Reset portfolio
+  slugs [--clear]         - Show or clear the market slug cache
 """
 
 import argparse
@@ -179,6 +180,24 @@ def cmd_reset(args):
     reset_portfolio(initial_balance=balance)
 
 
+def cmd_slugs(args):
+    """Show or clear the slug resolution cache shared by scan/trade."""
+    from discover import slug_cache
+    
+    if args.clear:
+        slug_cache.clear()
+        print("Slug cache cleared")
+        return
+    
+    summary = slug_cache.summary()
+    print("\n🔗 Resolved slug variants:")
+    for city, variant in sorted(summary["resolved"].items()):
+        print(f"   {city}: {variant}")
+    print(f"\n🚫 Empty slugs skipped ({len(summary['misses'])}):")
+    for slug, seconds in sorted(summary["misses"].items()):
+        print(f"   {slug} ({seconds // 60} min left)")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Weather Trader - Polymarket weather arbitrage")
     subparsers = parser.add_subparsers(dest="command", help="Commands")
@@ -214,6 +233,10 @@ def main():
     p_reset = subparsers.add_parser("reset", help="Reset portfolio")
     p_reset.add_argument("--balance", "-b", type=float, default=100.0, help="Initial balance (default: 100)")
     
+    # slugs
+    p_slugs = subparsers.add_parser("slugs", help="Show or clear the market slug cache")
+    p_slugs.add_argument("--clear", action="store_true", help="Forget resolved variants and empty slugs")
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -228,6 +251,7 @@ def main():
         "resolve": cmd_resolve,
         "demo": cmd_demo,
         "reset": cmd_reset,
+        "slugs": cmd_slugs,
     }
     
     commands[args.command](args)
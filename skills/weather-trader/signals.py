@@ -4,7 +4,7 @@ Signal generation: compare forecast to market odds, find edge.
 
 The core logic:
 1. Get NOAA/Open-Meteo forecast for city/date
-2. Find which bucket the forecast falls into
+2. Find which bucket the forecast falls into (the market's BucketLadder)
 3. Check market price for that bucket
 4. If market price < expected (based on forecast confidence), that's edge
 
@@ -16,7 +16,8 @@ Example:
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from typing import Dict, List, Optional
 from noaa import Forecast
 from discover import Market
 
@@ -55,84 +56,6 @@ class Signal:
         }
 
 
-def find_bucket(temp: float, buckets: Dict[str, float], unit: str = "fahrenheit") -> Tuple[str, float]:
-    """
-    Find which market bucket a temperature falls into.
-    
-    Returns: (bucket_name, current_price)
-    """
-    temp_int = int(round(temp))
-    unit_char = "F" if unit == "fahrenheit" else "C"
-    
-    for bucket_name, price in buckets.items():
-        # Parse bucket ranges
-        name_lower = bucket_name.lower().replace("°", "").replace("f", "").replace("c", "")
-        
-        # Handle "X or below" format
-        if "or below" in bucket_name.lower() or "below" in bucket_name.lower():
-            try:
-                threshold = int(''.join(filter(str.isdigit, bucket_name.split()[0])))
-                if temp_int <= threshold:
-                    return bucket_name, price
-            except:
-                pass
-        
-        # Handle "X or higher" / "X or above" format  
-        elif "or higher" in bucket_name.lower() or "or above" in bucket_name.lower():
-            try:
-                threshold = int(''.join(filter(str.isdigit, bucket_name.split()[0])))
-                if temp_int >= threshold:
-                    return bucket_name, price
-            except:
-                pass
-        
-        # Handle "X-Y" range format (e.g., "56-57°F")
-        elif "-" in name_lower:
-            try:
-                parts = name_lower.replace(" ", "").split("-")
-                low = int(''.join(filter(str.isdigit, parts[0])))
-                high = int(''.join(filter(str.isdigit, parts[1])))
-                if low <= temp_int <= high:
-                    return bucket_name, price
-            except:
-                pass
-        
-        # Handle exact match (e.g., "57°F")
-        else:
-            try:
-                bucket_temp = int(''.join(filter(str.isdigit, bucket_name)))
-                if temp_int == bucket_temp:
-                    return bucket_name, price
-            except:
-                pass
-    
-    # If no match found, return closest bucket
-    return _find_closest_bucket(temp_int, buckets)
-
-
-def _find_closest_bucket(temp: int, buckets: Dict[str, float]) -> Tuple[str, float]:
-    """Find the closest bucket when exact match fails."""
-    best_bucket = None
-    best_price = 0
-    best_diff = float('inf')
-    
-    for bucket_name, price in buckets.items():
-        try:
-            # Extract any number from bucket name
-            nums = [int(s) for s in bucket_name.replace("-", " ").split() if s.isdigit()]
-            if nums:
-                bucket_mid = sum(nums) / len(nums)
-                diff = abs(temp - bucket_mid)
-                if diff < best_diff:
-                    best_diff = diff
-                    best_bucket = bucket_name
-                    best_price = price
-        except:
-            pass
-    
-    return best_bucket or list(buckets.keys())[0], best_price
-
-
 def generate_signal(forecast: Forecast, market: Market, edge_threshold: float = 0.15) -> Signal:
     """
     Generate a trading signal by comparing forecast to market.
@@ -145,12 +68,13 @@ def generate_signal(forecast: Forecast, market: Market, edge_threshold: float =
     Returns:
         Signal object with trade recommendation
     """
-    # Find the bucket our forecast falls into
-    bucket_name, market_price = find_bucket(
-        forecast.high_temp, 
-        market.buckets,
-        forecast.unit
-    )
+    # Find the bucket our forecast falls into (or the closest one)
+    bucket = market.ladder.nearest(forecast.high_temp, forecast.unit)
+    if bucket:
+        bucket_name, market_price = bucket.label, bucket.price
+    else:
+        # No parseable buckets: nothing to price against
+        bucket_name, market_price = next(iter(market.buckets)), 0.0
     
     # Expected price based on forecast confidence
     # If forecast says it'll be in this bucket, fair price ≈ confidence
@@ -186,20 +110,23 @@ def scan_for_signals(days_ahead: int = 2, edge_threshold: float = 0.15) -> List[
     """
     Scan all available markets for trading signals.
     """
-    from noaa import get_all_forecasts
-    from discover import discover_markets, get_market_for_forecast
+    from noaa import get_forecast_table
+    from discover import find_markets
     
-    signals = []
+    # Every city over the whole horizon, batched
+    forecasts = list(get_forecast_table(days_ahead=days_ahead).values())
+    
+    # Look up every forecast's market concurrently
+    markets = find_markets(
+        (forecast.city, datetime.strptime(forecast.date, "%Y-%m-%d")) for forecast in forecasts
+    )
     
-    for days in range(0, days_ahead + 1):
-        forecasts = get_all_forecasts(days_ahead=days)
-        
-        for city, forecast in forecasts.items():
-            market = get_market_for_forecast(city, forecast.date)
-            
-            if market and market.active:
-                signal = generate_signal(forecast, market, edge_threshold)
-                signals.append(signal)
+    signals = []
+    for forecast in forecasts:
+        market = markets.get((forecast.city, forecast.date))
+        if market and market.active:
+            signal = generate_signal(forecast, market, edge_threshold)
+            signals.append(signal)
     
     return signals
 
@@ -0,0 +1,43 @@
+from buckets import BucketLadder
+from discover import Market
+from noaa import Forecast
+from signals import generate_signal
+
+
+CELSIUS_LABELS = {"13 or below": 0.1, "14-15": 0.3, "16-17": 0.4, "18 or higher": 0.2}
+
+
+def test_unitless_labels_are_not_converted():
+    ladder = BucketLadder.from_buckets(CELSIUS_LABELS)
+    assert ladder.unit is None
+    assert ladder.nearest(15.0, "celsius").label == "14-15"
+    assert ladder.lookup(17.2, "celsius").label == "16-17"
+
+
+def test_labelled_units_still_convert():
+    ladder = BucketLadder.from_buckets({"56-57°F": 0.5, "58-59°F": 0.5})
+    assert ladder.unit == "fahrenheit"
+    assert ladder.lookup(14.0, "celsius").label == "56-57°F"
+
+
+def test_celsius_city_signal_uses_the_forecast_bucket():
+    market = Market(
+        slug="highest-temperature-in-london-on-february-8-2026",
+        title="Highest temperature in London on February 8?",
+        city="london",
+        date="2026-02-08",
+        buckets=CELSIUS_LABELS,
+        volume=0,
+        liquidity=0,
+        end_date="",
+        active=True,
+    )
+    forecast = Forecast(
+        city="london",
+        city_name="London",
+        date="2026-02-08",
+        high_temp=15.0,
+        low_temp=8.0,
+        unit="celsius",
+    )
+    assert generate_signal(forecast, market).bucket == "14-15"
@@ -0,0 +1,35 @@
+import json
+from datetime import datetime
+
+from discover import SlugCache, variant_slugs
+
+
+def test_slug_cache_save_merges_concurrent_writers(tmp_path):
+    path = str(tmp_path / "slug_cache.json")
+    date = datetime(2026, 2, 8)
+    (nyc_variant, nyc_slug), = variant_slugs("nyc", date)[:1]
+    (london_variant, london_slug), = variant_slugs("london", date)[:1]
+
+    first, second = SlugCache(path), SlugCache(path)
+    first.plan("nyc", date)
+    second.plan("london", date)
+
+    first.miss(london_slug)
+    first.hit("nyc", nyc_variant, nyc_slug)
+    first.save()
+    # second loaded the file before first saved; its save must keep first's writes
+    second.hit("london", london_variant, london_slug)
+    second.save()
+
+    with open(path) as f:
+        data = json.load(f)
+    assert data["resolved"] == {"nyc": nyc_variant, "london": london_variant}
+    assert london_slug not in data["misses"]
+
+
+def test_slug_cache_save_without_changes_leaves_file_alone(tmp_path):
+    path = tmp_path / "slug_cache.json"
+    cache = SlugCache(str(path))
+    cache.plan("nyc", datetime(2026, 2, 8))
+    cache.save()
+    assert not path.exists()
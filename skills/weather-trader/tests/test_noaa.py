@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+
+import noaa
+from forecast_cache import ForecastCache
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def open_meteo(url, timeout=None, batch=True):
+    """Open-Meteo stand-in: 60/45°F every day for every location."""
+    query = {key: values[0] for key, values in parse_qs(urlparse(url).query).items()}
+    latitudes = query["latitude"].split(",")
+    if len(latitudes) > 1 and not batch:
+        raise requests.ConnectionError("batch unavailable")
+    start = datetime.strptime(query["start_date"], "%Y-%m-%d")
+    end = datetime.strptime(query["end_date"], "%Y-%m-%d")
+    times = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((end - start).days + 1)]
+    location = {"daily": {
+        "time": times,
+        "temperature_2m_max": [60.0] * len(times),
+        "temperature_2m_min": [45.0] * len(times),
+    }}
+    return FakeResponse([location] * len(latitudes) if len(latitudes) > 1 else location)
+
+
+def confidences(table):
+    return {key: forecast.confidence for key, forecast in table.items()}
+
+
+@pytest.mark.parametrize("start_days", [0, 1])
+def test_batch_and_fallback_confidence_match(monkeypatch, tmp_path, start_days):
+    cities = ["nyc", "atlanta"]
+
+    monkeypatch.setattr(noaa, "forecast_cache", ForecastCache(str(tmp_path / "batch.json")))
+    monkeypatch.setattr(noaa.requests, "get", open_meteo)
+    batched = noaa.get_forecast_table(days_ahead=3, start_days=start_days, cities=cities)
+
+    monkeypatch.setattr(noaa, "forecast_cache", ForecastCache(str(tmp_path / "fallback.json")))
+    monkeypatch.setattr(noaa.requests, "get", lambda url, timeout=None: open_meteo(url, timeout, batch=False))
+    fallback = noaa.get_forecast_table(days_ahead=3, start_days=start_days, cities=cities)
+
+    assert len(batched) == len(cities) * (4 - start_days)
+    assert confidences(batched) == confidences(fallback)
+
+    # Same horizon mapping as a single get_forecast() call: tomorrow is 0.92
+    tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+    assert batched[("nyc", tomorrow)].confidence == 0.92
+    assert noaa.get_forecast("nyc", days_ahead=1).confidence == 0.92
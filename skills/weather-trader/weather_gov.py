@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+weather.gov forecast for KLGA, the station the NYC markets resolve on.
+
+Used by the trading/ scripts (gap_alert, tracker, intraday_monitor). Reads
+through forecast_cache, so weather.gov is only hit once per forecast
+update however many of them run. Stdlib only (curl), like those scripts.
+"""
+
+import json
+import subprocess
+from typing import Dict, Optional, Tuple
+
+from forecast_cache import forecast_cache, parse_issue_time
+
+SOURCE = "weather.gov"
+KLGA_POINT = "40.7772,-73.8726"
+USER_AGENT = "clawdine-weather-trader"
+
+
+def _get_json(url: str) -> Optional[Dict]:
+    r = subprocess.run(
+        ["curl", "-s", "-H", f"User-Agent: {USER_AGENT}", url],
+        capture_output=True, text=True
+    )
+    try:
+        return json.loads(r.stdout)
+    except json.JSONDecodeError:
+        return None
+
+
+def download_klga_forecast() -> Tuple[Dict[str, Dict], Optional[float]]:
+    """
+    Fetch the KLGA daytime periods from weather.gov.
+
+    Returns:
+        ({date: {"high", "name", "detail"}}, updateTime as unix seconds);
+        ({}, None) if either request fails
+    """
+    # Step 1: Get forecast URL for KLGA coordinates
+    points = _get_json(f"https://api.weather.gov/points/{KLGA_POINT}")
+    try:
+        forecast_url = points["properties"]["forecast"]
+    except (TypeError, KeyError):
+        print("ERROR: Failed to get forecast URL from weather.gov")
+        return {}, None
+
+    # Step 2: Get forecast periods
+    fc = _get_json(forecast_url)
+    if fc is None:
+        print("ERROR: Failed to parse forecast data")
+        return {}, None
+
+    # Daytime periods (isDaytime=True) by date; name/detail kept for the intraday monitor
+    values = {}
+    for period in fc.get("properties", {}).get("periods", []):
+        if period.get("isDaytime"):
+            temp = period["temperature"]
+            if period.get("temperatureUnit", "F") == "C":
+                temp = temp * 9 / 5 + 32
+            values[period["startTime"][:10]] = {
+                "high": temp,
+                "name": period.get("name"),
+                "detail": period.get("detailedForecast"),
+            }
+    return values, parse_issue_time(fc.get("properties", {}).get("updateTime"))
+
+
+def get_klga_forecast() -> Dict[str, Dict]:
+    """KLGA daytime forecasts from today on, {date: entry} in date order, via the forecast cache."""
+    return forecast_cache.read_through(SOURCE, "nyc", download_klga_forecast)
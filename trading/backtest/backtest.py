@@ -14,6 +14,8 @@ import subprocess
 from datetime import datetime
 from pathlib import Path
 
+from weather_skill import BucketLadder
+
 BACKTEST_DIR = Path(__file__).parent
 PRICE_LOG = BACKTEST_DIR / "price_log.jsonl"
 BET_SIZE = 50  # dollars per trade
@@ -72,42 +74,10 @@ def get_resolution(date_str):
     return None
 
 
-def parse_bucket_midpoint(bucket_str):
-    """Convert bucket like '18-19' or '>=36' or '<=15' to midpoint"""
-    if ">=" in bucket_str:
-        val = float(bucket_str.replace(">=", ""))
-        return val + 1  # assume 1°F above threshold
-    elif "<=" in bucket_str:
-        val = float(bucket_str.replace("<=", ""))
-        return val - 1
-    elif "-" in bucket_str:
-        lo, hi = bucket_str.split("-")
-        return (float(lo) + float(hi)) / 2
-    return None
-
-
-def implied_temp(buckets):
-    """Calculate probability-weighted implied temperature"""
-    total_prob = sum(buckets.values())
-    if total_prob == 0:
-        return None
-    weighted = sum(parse_bucket_midpoint(b) * p for b, p in buckets.items()
-                   if parse_bucket_midpoint(b) is not None)
-    return weighted / total_prob
-
-
-def find_best_bucket(buckets, target_temp):
-    """Find the bucket closest to target temperature"""
-    best = None
-    best_dist = float("inf")
-    for b in buckets:
-        mid = parse_bucket_midpoint(b)
-        if mid is not None:
-            dist = abs(mid - target_temp)
-            if dist < best_dist:
-                best_dist = dist
-                best = b
-    return best
+def find_best_bucket(ladder, target_temp):
+    """Find the bucket (key) the target temperature falls into, or the closest one"""
+    bucket = ladder.nearest(target_temp)
+    return bucket.label if bucket else None
 
 
 def resolution_matches_bucket(resolution_question, bucket_str):
@@ -166,8 +136,9 @@ def run_backtest():
     for date in dates:
         snap = by_date[date]
         buckets = snap["market_buckets"]
+        ladder = BucketLadder.from_buckets(buckets)
         forecast = snap["forecast_high_f"]
-        mkt_implied = implied_temp(buckets)
+        mkt_implied = ladder.implied_temp()
         actual = actuals.get(date)
 
         # Get resolution
@@ -187,13 +158,13 @@ def run_backtest():
 
         # Show all buckets
         print(f"  Buckets: ", end="")
-        for b, p in sorted(buckets.items(), key=lambda x: parse_bucket_midpoint(x[0]) or 0):
-            print(f"{b}={p:.1%} ", end="")
+        for b in ladder:
+            print(f"{b.label}={b.price:.1%} ", end="")
         print()
 
         # Simulate trade if gap >= 3°F
         if gap >= 3 and resolution:
-            target_bucket = find_best_bucket(buckets, forecast)
+            target_bucket = find_best_bucket(ladder, forecast)
             entry_price = buckets.get(target_bucket, 0)
 
             won = resolution_matches_bucket(resolution, target_bucket)
@@ -209,7 +180,7 @@ def run_backtest():
             print(f"  🎯 TRADE: YES on {target_bucket} @ {entry_price:.1%}")
             print(f"  {'✅ WIN' if won else '❌ LOSS'}: ${pnl:+,.0f}")
         elif gap >= 3:
-            print(f"  📋 Would trade {find_best_bucket(buckets, forecast)} — awaiting resolution")
+            print(f"  📋 Would trade {find_best_bucket(ladder, forecast)} — awaiting resolution")
         else:
             print(f"  ⏸️  No trade (gap < 3°F)")
 
@@ -228,7 +199,7 @@ def run_backtest():
     for date in dates:
         snap = by_date[date]
         forecast = snap["forecast_high_f"]
-        mkt_implied = implied_temp(snap["market_buckets"])
+        mkt_implied = BucketLadder.from_buckets(snap["market_buckets"]).implied_temp()
         actual = actuals.get(date)
         if actual and mkt_implied:
             forecast_err = abs(forecast - actual)
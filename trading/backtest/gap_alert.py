@@ -11,49 +11,17 @@ import subprocess
 import sys
 from datetime import datetime, timedelta
 
+from weather_skill import get_klga_forecast
+
 ALERT_THRESHOLD_F = 3.0
 
 
 def fetch_noaa_forecast():
     """Get NOAA forecast for KLGA from weather.gov API.
-    Returns dict of {date_str: high_temp_F}"""
-    # Step 1: Get forecast URL for KLGA coordinates
-    points_url = "https://api.weather.gov/points/40.7772,-73.8726"
-    r = subprocess.run(
-        ["curl", "-s", "-H", "User-Agent: clawdine-weather-trader", points_url],
-        capture_output=True, text=True
-    )
-    try:
-        points = json.loads(r.stdout)
-        forecast_url = points["properties"]["forecast"]
-    except (json.JSONDecodeError, KeyError):
-        print("ERROR: Failed to get forecast URL from weather.gov")
-        return {}
-
-    # Step 2: Get forecast periods
-    r = subprocess.run(
-        ["curl", "-s", "-H", "User-Agent: clawdine-weather-trader", forecast_url],
-        capture_output=True, text=True
-    )
-    try:
-        fc = json.loads(r.stdout)
-    except json.JSONDecodeError:
-        print("ERROR: Failed to parse forecast data")
-        return {}
-
-    # Extract daytime highs (isDaytime=True periods)
-    result = {}
-    for period in fc.get("properties", {}).get("periods", []):
-        if period.get("isDaytime"):
-            # Parse the date from startTime (e.g. "2026-02-10T07:00:00-05:00")
-            start = period["startTime"]
-            date_str = start[:10]  # YYYY-MM-DD
-            temp = period["temperature"]
-            unit = period.get("temperatureUnit", "F")
-            if unit == "C":
-                temp = temp * 9 / 5 + 32
-            result[date_str] = temp
-    return result
+    Read through the shared forecast cache, so weather.gov is only hit
+    once per forecast update. Returns dict of {date_str: high_temp_F}"""
+    entries = get_klga_forecast()
+    return {date_str: entry["high"] for date_str, entry in entries.items()}
 
 
 def fetch_market(date_str):
@@ -11,43 +11,16 @@ import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from weather_skill import get_klga_forecast
+
 TRACKER_FILE = Path(__file__).parent / "price_log.jsonl"
 
 
 def fetch_noaa_forecast():
-    """Get NOAA KLGA forecast from weather.gov API.
+    """Get NOAA KLGA forecast from weather.gov API, via the shared forecast cache.
     Returns dict of {iso_date: high_temp_F}"""
-    points_url = "https://api.weather.gov/points/40.7772,-73.8726"
-    r = subprocess.run(
-        ["curl", "-s", "-H", "User-Agent: clawdine-weather-trader", points_url],
-        capture_output=True, text=True
-    )
-    try:
-        points = json.loads(r.stdout)
-        forecast_url = points["properties"]["forecast"]
-    except (json.JSONDecodeError, KeyError):
-        print("ERROR: Failed to get NOAA forecast URL")
-        return {}
-
-    r = subprocess.run(
-        ["curl", "-s", "-H", "User-Agent: clawdine-weather-trader", forecast_url],
-        capture_output=True, text=True
-    )
-    try:
-        fc = json.loads(r.stdout)
-    except json.JSONDecodeError:
-        print("ERROR: Failed to parse NOAA forecast")
-        return {}
-
-    result = {}
-    for period in fc.get("properties", {}).get("periods", []):
-        if period.get("isDaytime"):
-            date_str = period["startTime"][:10]
-            temp = period["temperature"]
-            if period.get("temperatureUnit", "F") == "C":
-                temp = temp * 9 / 5 + 32
-            result[date_str] = temp
-    return result
+    entries = get_klga_forecast()
+    return {date_str: entry["high"] for date_str, entry in entries.items()}
 
 
 def fetch_market_prices(date_str):
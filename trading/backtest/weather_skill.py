@@ -0,0 +1 @@
+../weather_skill.py
\ No newline at end of file
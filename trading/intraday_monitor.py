@@ -13,6 +13,8 @@ import sys
 from datetime import datetime, timezone
 from pathlib import Path
 
+from weather_skill import BucketLadder, get_klga_forecast
+
 WORKSPACE = Path.home() / ".openclaw/workspace"
 LOG_FILE = WORKSPACE / "trading/intraday_log.jsonl"
 STATS_FILE = WORKSPACE / "trading/weather_paper_stats.json"
@@ -44,33 +46,10 @@ def get_klga_observations_today():
 
 
 def get_noaa_forecast_today():
-    """Get NOAA forecast high for today"""
-    url = "https://api.weather.gov/points/40.7772,-73.8726"
-    r = subprocess.run(
-        ["curl", "-s", "-H", "User-Agent: clawdine-weather-trader", url],
-        capture_output=True, text=True
-    )
-    try:
-        points = json.loads(r.stdout)
-        fc_url = points["properties"]["forecast"]
-    except (json.JSONDecodeError, KeyError):
-        return None
-
-    r2 = subprocess.run(
-        ["curl", "-s", "-H", "User-Agent: clawdine-weather-trader", fc_url],
-        capture_output=True, text=True
-    )
-    try:
-        fc = json.loads(r2.stdout)
-        for period in fc["properties"]["periods"]:
-            if period.get("isDaytime"):
-                return {
-                    "high": period["temperature"],
-                    "name": period["name"],
-                    "detail": period["detailedForecast"]
-                }
-    except (json.JSONDecodeError, KeyError):
-        return None
+    """Get NOAA forecast high for today (first daytime period), via the shared forecast cache"""
+    entries = get_klga_forecast()
+    for entry in entries.values():
+        return {"high": entry["high"], "name": entry["name"], "detail": entry["detail"]}
     return None
 
 
@@ -156,23 +135,10 @@ def estimate_peak(temps):
     }
 
 
-def find_bucket_for_temp(buckets, temp):
-    """Find which bucket a temperature falls into"""
-    rounded = round(temp)
-    for key in buckets:
-        if "-" in key and not key.startswith(">=") and not key.startswith("<="):
-            lo, hi = key.split("-")
-            if int(lo) <= rounded <= int(hi):
-                return key
-        elif key.startswith(">="):
-            threshold = int(key[2:])
-            if rounded >= threshold:
-                return key
-        elif key.startswith("<="):
-            threshold = int(key[2:])
-            if rounded <= threshold:
-                return key
-    return None
+def find_bucket_for_temp(ladder, temp):
+    """Find which bucket (key) a temperature falls into, given a BucketLadder"""
+    bucket = ladder.lookup(temp)
+    return bucket.label if bucket else None
 
 
 def main():
@@ -184,6 +150,7 @@ def main():
     forecast = get_noaa_forecast_today()
     event = get_today_market()
     buckets = extract_buckets(event)
+    ladder = BucketLadder.from_buckets(buckets)
 
     if not temps:
         print("No observations yet today")
@@ -204,17 +171,16 @@ def main():
         print("\nNo market data available")
         return 0
 
+    est_bucket = find_bucket_for_temp(ladder, peak_est["estimate"]) if peak_est else None
+
     print(f"\nMarket buckets:")
     for b, p in sorted(buckets.items(), key=lambda x: -x[1]):
         if p >= 0.01:
-            marker = ""
-            if peak_est and find_bucket_for_temp(buckets, peak_est["estimate"]) == b:
-                marker = " ← EST. PEAK"
+            marker = " ← EST. PEAK" if b == est_bucket else ""
             print(f"  {b}: {p:.1%}{marker}")
 
     # Identify opportunity
     if peak_est and peak_est["confidence"] in ("medium", "high"):
-        est_bucket = find_bucket_for_temp(buckets, peak_est["estimate"])
         if est_bucket:
             est_price = buckets.get(est_bucket, 0)
             # Market favored bucket
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+The weather-trader skill modules the trading scripts share.
+
+Puts skills/weather-trader on the import path once and re-exports what the
+scripts use, so they `from weather_skill import ...` instead of each
+working out the path. trading/backtest/weather_skill.py is a symlink to
+this file, so scripts in either directory import it the same way.
+"""
+
+import sys
+from pathlib import Path
+
+SKILL_DIR = Path(__file__).resolve().parents[1] / "skills" / "weather-trader"
+if str(SKILL_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILL_DIR))
+
+from buckets import BucketLadder
+from weather_gov import get_klga_forecast
+
+__all__ = ["BucketLadder", "get_klga_forecast"]